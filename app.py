@@ -1,13 +1,33 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Request, render_template, request, jsonify, Response, stream_with_context
 import os
 import requests
-import PyPDF2
-from docx import Document
+import httpx
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 import io
-import json
+import multiprocessing
 import re
+import time
+import asyncio
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from tokens import TokenBudget, UsageTracker
+from transport import AsyncProviderTransport, ProviderTransport
+from cache import ResultCache, make_cache_key, normalize_text
+from extraction import (ExtractionCache, ExtractionLimitError, ExtractionPool, UploadBusyError,
+                        UploadMemoryBudget, UploadSpool, decode_text, read_upload)
+from failover import FailoverCaller, ProviderError
+from normalization import TextNormalizer
+from reasoning import ReasoningFilter
+from resilience import GuardRegistry, ProviderUnavailableError
+from resume_parser import ResumeParser, compact_resume, prescore_match
+from scrubbing import ResponseScrubber
+from sections import extract_match, split_sections
+from singleflight import SingleFlight
+from sniffing import UploadRejectedError, UploadSniffer
+from streaming import SectionTracker, format_sse, iter_provider_deltas
+from structured import (OutputModeStats, StructuredOutputError, apply_structured_output, load_envelope,
+                        structured_output_mode, structured_request_overhead, tool_input, validate_analysis)
 
 # Load environment variables
 load_dotenv()
@@ -29,6 +49,79 @@ except ImportError:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
 
+    # File Extraction Settings
+    EXTRACTION_WORKERS = 2
+    PDF_PAGES_PER_TASK = 4
+    PDF_PARALLEL_MIN_PAGES = 8
+    MAX_RESUME_PAGES = 30
+    MAX_EXTRACTED_CHARS = 100000
+    EXTRACTION_TIMEOUT = 20
+    EXTRACTION_CPU_LIMIT = 15
+    EXTRACTION_MEMORY_LIMIT = 512 * 1024 * 1024
+    PDF_BACKEND = "auto"
+    DOCX_EXTRACTOR = "xml"
+    UPLOAD_SPOOL_THRESHOLD = 1024 * 1024
+    UPLOAD_MEMORY_LIMIT = 32 * 1024 * 1024
+    SNIFF_SCAN_BYTES = 2 * 1024 * 1024
+    CHARSET_SAMPLE_BYTES = 64 * 1024
+    EXTRACTION_CACHE_SIZE = 128
+    EXTRACTION_CACHE_TTL = 7 * 24 * 60 * 60
+    EXTRACTION_CACHE_DIR = os.getenv('EXTRACTION_CACHE_DIR', '')
+
+    # Token Budget Settings
+    CONTEXT_TOKEN_BUDGET = 16000
+    MIN_RESPONSE_TOKENS = 1500
+    MAX_JOB_DESCRIPTION_CHARS = 10000
+    MAX_RESUME_CHARS = 15000
+
+    # Text Normalization Settings
+    TEXT_NORMALIZATION_RULES = ["ligatures", "repeated_lines", "dehyphenation", "bullets", "whitespace"]
+
+    # Resume Parsing Settings
+    STRUCTURED_RESUME_PROMPT = True
+    LOCAL_MATCH_PRESCORE = True
+
+    # Response Cleaning Settings
+    SCRUB_PHRASES = {}
+    RETURN_REASONING = False
+
+    # Structured Output Settings
+    STRUCTURED_OUTPUT = "off"
+
+    # Prompt Caching Settings
+    PROMPT_CACHING_ENABLED = True
+
+    # HTTP Transport Settings
+    HTTP_POOL_SIZE = 16
+    HTTP_CONNECT_TIMEOUT = 5
+    HTTP_READ_TIMEOUT = 120
+    HTTP_WARM_CONNECTIONS = True
+    ASYNC_POOL_SIZE = 200
+
+    # Analysis Cache Settings
+    ANALYSIS_CACHE_ENABLED = True
+    ANALYSIS_CACHE_SIZE = 256
+    ANALYSIS_CACHE_TTL = 24 * 60 * 60
+    ANALYSIS_CACHE_DIR = os.getenv('ANALYSIS_CACHE_DIR', '')
+    ANALYSIS_CACHE_DISK_BYTES = 64 * 1024 * 1024
+
+    # Provider Failover Settings
+    API_PROVIDER_CHAIN = ["perplexity"]
+    HEDGE_AFTER_SECONDS = 0
+    FAILOVER_MAX_WORKERS = 32
+
+    # Circuit Breaker & Concurrency Settings
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_RESET_TIMEOUT = 30
+    CONCURRENCY_INITIAL_LIMIT = 8
+    CONCURRENCY_MIN_LIMIT = 1
+    CONCURRENCY_MAX_LIMIT = 64
+
+    # Fan-out Settings
+    ANALYSIS_FANOUT = False
+    FANOUT_MAX_WORKERS = 24
+    FANOUT_SECTION_MAX_TOKENS = {"match": 600, "suggestions": 1500, "cover_letter": 1500}
+
     # OpenAI API Settings
     OPENAI_API_KEY = ""
     OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
@@ -40,6 +133,7 @@ except ImportError:
     ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
     ANTHROPIC_DEFAULT_MODEL = "claude-3-sonnet-20240229"
     ANTHROPIC_PRO_MODEL = "claude-3-opus-20240229"
+    ANTHROPIC_API_VERSION = "2023-06-01"
 
     # Custom API Settings
     CUSTOM_API_KEY = ""
@@ -57,29 +151,140 @@ except NameError:
     # Fallback if MAX_CONTENT_LENGTH is not defined
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 
+# Shared pooled HTTP transport for all AI provider calls
+transport = ProviderTransport(
+    pool_size=HTTP_POOL_SIZE,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    read_timeout=HTTP_READ_TIMEOUT
+)
+
+# Pooled async client used by the ASGI entry point (asgi.py)
+async_transport = AsyncProviderTransport(
+    pool_size=ASYNC_POOL_SIZE,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    read_timeout=HTTP_READ_TIMEOUT
+)
+
+# Worker processes that parse uploaded PDF/DOCX files off the request thread
+extraction_pool = ExtractionPool(
+    workers=EXTRACTION_WORKERS,
+    pages_per_task=PDF_PAGES_PER_TASK,
+    parallel_min_pages=PDF_PARALLEL_MIN_PAGES,
+    max_pages=MAX_RESUME_PAGES,
+    max_chars=MAX_EXTRACTED_CHARS,
+    timeout=EXTRACTION_TIMEOUT,
+    cpu_limit=EXTRACTION_CPU_LIMIT,
+    memory_limit=EXTRACTION_MEMORY_LIMIT,
+    docx_extractor=DOCX_EXTRACTOR,
+    pdf_backend=PDF_BACKEND
+)
+
+# Caps upload bytes buffered in memory across concurrent requests
+upload_budget = UploadMemoryBudget(max_bytes=UPLOAD_MEMORY_LIMIT)
+
+class UploadRequest(Request):
+    """Spool multipart file parts as they arrive, charging the upload budget before the body is buffered"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        spool = UploadSpool(threshold=UPLOAD_SPOOL_THRESHOLD, memory_budget=upload_budget)
+        self.__dict__.setdefault('upload_spools', []).append(spool)
+        return spool
+
+    def close(self):
+        super().close()
+        # Parts abandoned mid-parse (e.g. when the budget ran out) never reach request.files
+        for spool in self.__dict__.pop('upload_spools', []):
+            spool.close()
+
+app.request_class = UploadRequest
+
+# Identifies the real file type from its bytes before any parsing
+upload_sniffer = UploadSniffer(scan_bytes=SNIFF_SCAN_BYTES)
+
+# Extracted resume text keyed by upload digest
+extraction_cache = ExtractionCache(
+    max_entries=EXTRACTION_CACHE_SIZE,
+    ttl=EXTRACTION_CACHE_TTL,
+    disk_dir=EXTRACTION_CACHE_DIR
+)
+
+# Cache of parsed analyses keyed on the normalized inputs
+analysis_cache = ResultCache(
+    max_entries=ANALYSIS_CACHE_SIZE,
+    ttl=ANALYSIS_CACHE_TTL,
+    disk_dir=ANALYSIS_CACHE_DIR,
+    max_disk_bytes=ANALYSIS_CACHE_DISK_BYTES
+) if ANALYSIS_CACHE_ENABLED else None
+
+# Worker threads for fan-out section calls
+fanout_executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+
+# Walks the provider chain with failover and latency hedging
+provider_failover = FailoverCaller(
+    ThreadPoolExecutor(max_workers=FAILOVER_MAX_WORKERS, thread_name_prefix="hedge"),
+    hedge_after=HEDGE_AFTER_SECONDS
+)
+
+# Circuit breakers and adaptive concurrency limits per provider and model
+provider_guards = GuardRegistry(
+    failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=CIRCUIT_RESET_TIMEOUT,
+    initial_limit=CONCURRENCY_INITIAL_LIMIT,
+    min_limit=CONCURRENCY_MIN_LIMIT,
+    max_limit=CONCURRENCY_MAX_LIMIT
+)
+
+# Strips extraction debris from the inputs before prompt building
+text_normalizer = TextNormalizer(rules=TEXT_NORMALIZATION_RULES)
+
+# Cuts <think> reasoning out of model output before parsing
+reasoning_filter = ReasoningFilter()
+
+# Retry rate and parse time per output mode (structured modes vs. markdown parsing)
+output_stats = OutputModeStats()
+
+# Finds the model's explanatory phrases in the cleaned sections
+response_scrubber = ResponseScrubber(phrase_lists=SCRUB_PHRASES)
+
+# Structured resume profiles, parsed once per distinct resume
+resume_parser = ResumeParser(
+    max_entries=EXTRACTION_CACHE_SIZE,
+    ttl=EXTRACTION_CACHE_TTL,
+    disk_dir=EXTRACTION_CACHE_DIR
+)
+
+# Keeps prompts inside the context budget before they reach the provider
+token_budget = TokenBudget(
+    context_budget=CONTEXT_TOKEN_BUDGET,
+    max_response_tokens=MAX_TOKENS,
+    min_response_tokens=MIN_RESPONSE_TOKENS
+)
+
+# Prompt and cached-token counts reported by the providers
+usage_tracker = UsageTracker()
+
+# Coalesces identical in-flight analyses onto one provider call
+analysis_flight = SingleFlight()
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text_from_pdf(file):
-    """Extract text from PDF file"""
+def extract_text_from_pdf(source):
+    """Extract text from PDF file contents or a spooled upload path"""
     try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        return extraction_pool.extract_pdf(source)
+    except ExtractionLimitError:
+        raise
     except Exception as e:
         raise Exception(f"Error reading PDF: {str(e)}")
 
-def extract_text_from_docx(file):
-    """Extract text from DOCX file"""
+def extract_text_from_docx(source):
+    """Extract text from DOCX file contents or a spooled upload path"""
     try:
-        doc = Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        return extraction_pool.extract_docx(source)
+    except ExtractionLimitError:
+        raise
     except Exception as e:
         raise Exception(f"Error reading DOCX: {str(e)}")
 
@@ -88,38 +293,69 @@ def extract_text_from_file(file):
     filename = file.filename.lower()
     
     if filename.endswith('.pdf'):
-        return extract_text_from_pdf(file)
+        file_type = 'pdf'
     elif filename.endswith(('.docx', '.doc')):
-        return extract_text_from_docx(file)
+        file_type = 'docx'
     elif filename.endswith('.txt'):
-        return file.read().decode('utf-8')
+        file_type = 'txt'
     else:
         raise Exception("Unsupported file type")
+    
+    # Multipart parts were already spooled and hashed while the body was parsed (see UploadRequest)
+    if isinstance(file.stream, UploadSpool):
+        spool, digest = file.stream, file.stream.hexdigest()
+    else:
+        spool, digest = read_upload(file, threshold=UPLOAD_SPOOL_THRESHOLD, memory_budget=upload_budget)
+    with spool:
+        # Route on what the bytes really are and reject hopeless files before parsing
+        with spool.open() as stream:
+            file_type = upload_sniffer.sniff(stream, spool.size, claimed_type=file_type)
+        
+        # Skip parsing for files we've seen before
+        cached = extraction_cache.get(digest, file_type)
+        if cached is not None:
+            return cached
+        
+        started = time.perf_counter()
+        if file_type == 'pdf':
+            text = extract_text_from_pdf(spool.source())
+        elif file_type == 'docx':
+            text = extract_text_from_docx(spool.source())
+        else:
+            with spool.open() as stream:
+                # Windows-1252 and UTF-16 exports decode on the first try; only a prefix is inspected
+                text = decode_text(stream, max_chars=MAX_EXTRACTED_CHARS, sample_bytes=CHARSET_SAMPLE_BYTES)
+    
+    extraction_cache.set(digest, file_type, text, time.perf_counter() - started)
+    return text
 
-def get_api_config():
+def get_api_config(provider=None):
     """Get API configuration based on the selected provider"""
-    if API_PROVIDER == "perplexity":
+    if provider is None:
+        provider = API_PROVIDER
+    
+    if provider == "perplexity":
         return {
             "api_key": PERPLEXITY_API_KEY,
             "api_url": PERPLEXITY_API_URL,
             "default_model": PERPLEXITY_DEFAULT_MODEL,
             "pro_model": PERPLEXITY_PRO_MODEL
         }
-    elif API_PROVIDER == "openai":
+    elif provider == "openai":
         return {
             "api_key": OPENAI_API_KEY,
             "api_url": OPENAI_API_URL,
             "default_model": OPENAI_DEFAULT_MODEL,
             "pro_model": OPENAI_PRO_MODEL
         }
-    elif API_PROVIDER == "anthropic":
+    elif provider == "anthropic":
         return {
             "api_key": ANTHROPIC_API_KEY,
             "api_url": ANTHROPIC_API_URL,
             "default_model": ANTHROPIC_DEFAULT_MODEL,
             "pro_model": ANTHROPIC_PRO_MODEL
         }
-    elif API_PROVIDER == "custom":
+    elif provider == "custom":
         return {
             "api_key": CUSTOM_API_KEY,
             "api_url": CUSTOM_API_URL,
@@ -127,17 +363,10 @@ def get_api_config():
             "pro_model": CUSTOM_PRO_MODEL
         }
     else:
-        raise Exception(f"Unsupported API provider: {API_PROVIDER}")
+        raise Exception(f"Unsupported API provider: {provider}")
 
-def call_ai_api(prompt, model=None):
-    """Call AI API with the given prompt and model - works with multiple providers"""
-    config = get_api_config()
-    
-    if model is None:
-        model = config["default_model"]
-    
-    # Enhanced system prompt for better cover letter generation
-    system_prompt = """You are Career Copilot, an expert career coach. You will be given a job description and a resume. Your task is to analyze both documents and provide comprehensive insights.
+# Enhanced system prompt for better cover letter generation
+SYSTEM_PROMPT = """You are Career Copilot, an expert career coach. You will be given a job description and a resume. Your task is to analyze both documents and provide comprehensive insights.
 
 CRITICAL INSTRUCTIONS:
 - You MUST provide ACTUAL content, not descriptions of what you will do
@@ -172,25 +401,146 @@ Write a complete, professional cover letter that:
 
 Do not invent skills or experiences not found in the resume. Use your reasoning capabilities to identify subtle connections between the candidate's experience and job requirements."""
 
+# System prompt for structured-output mode; the provider enforces the schema where it can
+STRUCTURED_SYSTEM_PROMPT = """You are Career Copilot, an expert career coach. You will be given a job description and a resume. Your task is to analyze both documents and provide comprehensive insights.
+
+CRITICAL INSTRUCTIONS:
+- You MUST provide ACTUAL content, not descriptions of what you will do
+- Do NOT use phrases like "I'll provide", "I'll write", "Here's what I'll do"
+- Do NOT explain your process or methodology
+
+Respond with only a JSON object, without markdown code fences or any other text, in exactly this shape:
+{"match": {"score": 75, "strengths": ["..."], "gaps": ["..."]}, "suggestions": "...", "cover_letter": "..."}
+
+- match: how well the resume matches the job; score is a number between 0-100 based on overall fit, with 2-3 key strengths and 2-3 key gaps
+- suggestions: specific, actionable advice to tailor the resume as "- " bullet lines, covering keyword optimization, quantified achievements, strategic positioning, format and structure, and skills alignment
+- cover_letter: a complete, professional cover letter starting with "Dear", paragraphs separated by blank lines, that highlights relevant experience from the resume, shows enthusiasm and ends with a strong call to action
+
+Do not invent skills or experiences not found in the resume."""
+
+# Section-specific system prompts used when the analysis fans out into parallel calls
+SECTION_PROMPT_PREAMBLE = """You are Career Copilot, an expert career coach. You will be given a job description and a resume.
+
+CRITICAL INSTRUCTIONS:
+- You MUST provide ACTUAL content, not descriptions of what you will do
+- Do NOT use phrases like "I'll provide", "I'll write", "Here's what I'll do"
+- Do NOT explain your process or methodology
+- Do not invent skills or experiences not found in the resume
+
+Respond with exactly one section, starting with its header:
+"""
+
+FANOUT_SECTIONS = [
+    ("match", "### Job Match Analysis", SECTION_PROMPT_PREAMBLE + """
+### Job Match Analysis
+Analyze how well the resume matches the job requirements and provide only a JSON object with this structure:
+{"match": {"score": 75, "strengths": ["Strong experience in required technologies", "Relevant industry experience"], "gaps": ["Limited project management experience", "Missing specific certification"]}}
+
+The score should be a number between 0-100 based on overall fit."""),
+    ("suggestions", "### Resume Enhancement Suggestions", SECTION_PROMPT_PREAMBLE + """
+### Resume Enhancement Suggestions
+Provide specific, actionable advice to tailor the resume, including:
+- Keyword optimization suggestions
+- Quantifying achievements recommendations
+- Strategic positioning advice
+- Format and structure improvements
+- Skills and experience alignment tips"""),
+    ("cover_letter", "### Generated Cover Letter", SECTION_PROMPT_PREAMBLE + """
+### Generated Cover Letter
+Write a complete, professional cover letter that:
+- Addresses the hiring manager directly
+- Demonstrates understanding of the role and company
+- Highlights relevant experience and achievements from the resume
+- Shows enthusiasm and cultural fit
+- Ends with a strong call to action
+- Is ready to send without any modifications""")
+]
+
+def get_provider_chain():
+    """Providers to try in order, skipping any that are not configured"""
+    chain = []
+    for provider in [API_PROVIDER] + list(API_PROVIDER_CHAIN):
+        if provider in chain:
+            continue
+        config = get_api_config(provider)
+        if provider == API_PROVIDER or (config["api_key"] and config["api_url"]):
+            chain.append(provider)
+    return chain
+
+def resolve_model(model, provider):
+    """Map a model of the primary provider onto the equivalent tier of another provider"""
+    if provider == API_PROVIDER:
+        return model
+    primary = get_api_config()
+    config = get_api_config(provider)
+    if model is not None and model == primary["pro_model"]:
+        return config["pro_model"]
+    return config["default_model"]
+
+def build_api_request(prompt, model=None, stream=False, system_prompt=None, max_tokens=None, provider=None,
+                      structured=False):
+    """Build the URL, headers and payload for a chat completion on the selected provider
+
+    structured asks for the analysis as JSON in the provider's STRUCTURED_OUTPUT mode.
+    """
+    if provider is None:
+        provider = API_PROVIDER
+    config = get_api_config(provider)
+    
+    if model is None:
+        model = config["default_model"]
+    
+    if system_prompt is None:
+        system_prompt = STRUCTURED_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+    
+    if max_tokens is None:
+        max_tokens = MAX_TOKENS
+
     headers = {
         "Authorization": f"Bearer {config['api_key']}",
         "Content-Type": "application/json"
     }
     
+    # Anthropic authenticates with its own headers
+    if provider == "anthropic":
+        headers["x-api-key"] = config['api_key']
+        headers["anthropic-version"] = ANTHROPIC_API_VERSION
+    
+    # The prompt is either plain text or a list of (text, cacheable) parts; cacheable
+    # parts form a stable prefix that providers can serve from their prompt cache
+    if isinstance(prompt, str):
+        prompt_parts = [(prompt, False)]
+    else:
+        prompt_parts = prompt
+    
     # Prepare data based on API provider
-    if API_PROVIDER == "anthropic":
+    if provider == "anthropic":
+        # System prompt goes in the system field so the prefix stays identical between requests
+        system_block = {"type": "text", "text": system_prompt}
+        if PROMPT_CACHING_ENABLED:
+            system_block["cache_control"] = {"type": "ephemeral"}
+        
+        content = []
+        for text, cacheable in prompt_parts:
+            block = {"type": "text", "text": text}
+            if cacheable and PROMPT_CACHING_ENABLED:
+                block["cache_control"] = {"type": "ephemeral"}
+            content.append(block)
+        
         data = {
             "model": model,
-            "max_tokens": MAX_TOKENS,
+            "max_tokens": max_tokens,
             "temperature": TEMPERATURE,
+            "system": [system_block],
             "messages": [
                 {
                     "role": "user",
-                    "content": f"{system_prompt}\n\n{prompt}"
+                    "content": content
                 }
             ]
         }
     else:
+        # OpenAI-compatible providers cache the longest repeated prefix automatically
         data = {
             "model": model,
             "messages": [
@@ -200,77 +550,243 @@ Do not invent skills or experiences not found in the resume. Use your reasoning
                 },
                 {
                     "role": "user",
-                    "content": prompt
+                    "content": "".join(text for text, _ in prompt_parts)
                 }
             ],
-            "max_tokens": MAX_TOKENS,
+            "max_tokens": max_tokens,
             "temperature": TEMPERATURE
         }
     
-    response = requests.post(config["api_url"], headers=headers, json=data)
+    if structured:
+        apply_structured_output(data, provider, structured_output_mode(provider, STRUCTURED_OUTPUT))
+    
+    if stream:
+        data["stream"] = True
+        if provider == "openai":
+            data["stream_options"] = {"include_usage": True}
+    
+    return config["api_url"], headers, data
+
+@contextmanager
+def open_ai_response(prompt, model=None, stream=False, system_prompt=None, max_tokens=None, structured=False):
+    """Send the request along the provider chain and yield (provider, response) once headers arrive"""
+    def attempt(provider):
+        provider_model = resolve_model(model, provider)
+        api_url, headers, data = build_api_request(
+            prompt,
+            provider_model,
+            stream=stream,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            provider=provider,
+            structured=structured
+        )
+        
+        # Fail fast when this provider/model is tripped or already at its concurrency limit
+        permit = provider_guards.get(provider, data["model"]).acquire()
+        
+        try:
+            response = transport.post(api_url, headers=headers, json=data, stream=True)
+        except requests.Timeout:
+            permit.release(False)
+            raise ProviderError(provider, None, f"{provider.title()} API request timed out")
+        except requests.RequestException as e:
+            permit.release(False)
+            raise ProviderError(provider, None, f"{provider.title()} API request failed: {str(e)}")
+        
+        if response.status_code != 200:
+            message = f"{provider.title()} API error: {response.status_code} - {response.text}"
+            response.close()
+            error = ProviderError(provider, response.status_code, message)
+            # Only overload and server errors count against the provider's health
+            permit.release(False if error.retryable else None)
+            raise error
+        
+        return provider, response, permit
+    
+    def discard(result):
+        result[1].close()
+        result[2].release(None)
     
-    if response.status_code != 200:
-        raise Exception(f"{API_PROVIDER.title()} API error: {response.status_code} - {response.text}")
+    provider, response, permit = provider_failover.call(get_provider_chain(), attempt, discard=discard)
+    outcome = None
+    try:
+        yield provider, response
+        outcome = True
+    except requests.RequestException:
+        outcome = False
+        raise
+    except ProviderError as e:
+        # Body read errors are converted by the caller; transport failures still count against the provider
+        outcome = False if e.retryable else None
+        raise
+    finally:
+        permit.release(outcome)
+        response.close()
+
+def call_ai_api(prompt, model=None, system_prompt=None, max_tokens=None, structured=False):
+    """Call AI API with the given prompt and model - works with multiple providers
+
+    With structured, the output mode the answering provider was asked for is added to the
+    result as 'structured_mode'.
+    """
+    with open_ai_response(prompt, model, system_prompt=system_prompt, max_tokens=max_tokens,
+                          structured=structured) as (provider, response):
+        try:
+            result = response.json()
+        except requests.RequestException as e:
+            raise ProviderError(provider, None, f"{provider.title()} API response could not be read: {str(e)}")
     
-    return response.json()
+    usage_tracker.record(provider, result.get('usage'))
+    if structured:
+        result['structured_mode'] = structured_output_mode(provider, STRUCTURED_OUTPUT)
+    return result
+
+def stream_ai_api(prompt, model=None, max_tokens=None):
+    """Call AI API with streaming enabled and yield text deltas as the model writes them"""
+    with open_ai_response(prompt, model, stream=True, max_tokens=max_tokens) as (provider, response):
+        yield from iter_provider_deltas(
+            response,
+            provider,
+            on_usage=lambda usage: usage_tracker.record(provider, usage)
+        )
+
+def get_response_text(response):
+    """Get the AI response text from either response format"""
+    if 'choices' in response:
+        return response['choices'][0]['message']['content'] or ''
+    # Anthropic content may mix text and tool_use blocks
+    return ''.join(block.get('text', '') for block in response['content'] if block.get('type', 'text') == 'text')
+
+def call_ai_api_fanout(prompt, model=None, max_tokens=None):
+    """Generate the three sections as parallel AI calls and merge them into one response text
+
+    Returns (text, partial); partial is True when a section call failed and was left out.
+    """
+    config = get_api_config()
+    if model is None:
+        model = config["default_model"]
+    
+    # The match score is small structured output, so it always uses the default model
+    futures = []
+    for section, header, section_prompt in FANOUT_SECTIONS:
+        section_model = config["default_model"] if section == "match" else model
+        futures.append((header, fanout_executor.submit(
+            call_ai_api,
+            prompt,
+            section_model,
+            system_prompt=section_prompt,
+            max_tokens=min(FANOUT_SECTION_MAX_TOKENS.get(section, MAX_TOKENS), max_tokens or MAX_TOKENS)
+        )))
+    
+    sections = []
+    errors = []
+    for header, future in futures:
+        try:
+            text = get_response_text(future.result()).strip()
+        except Exception as e:
+            errors.append(e)
+            continue
+        
+        # Make sure every section carries its header so the normal parser can split them
+        if header not in text:
+            text = f"{header}\n{text}"
+        sections.append(text)
+    
+    if not sections:
+        raise errors[0]
+    
+    return "\n\n".join(sections), bool(errors)
+
+async def acall_ai_api(prompt, model=None, system_prompt=None, max_tokens=None, structured=False):
+    """Async variant of call_ai_api on the shared httpx client (no hedging)"""
+    async def attempt(provider):
+        api_url, headers, data = build_api_request(
+            prompt,
+            resolve_model(model, provider),
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            provider=provider,
+            structured=structured
+        )
+        
+        permit = provider_guards.get(provider, data["model"]).acquire()
+        
+        try:
+            response = await async_transport.post(api_url, headers=headers, json=data)
+        except httpx.TimeoutException:
+            permit.release(False)
+            raise ProviderError(provider, None, f"{provider.title()} API request timed out")
+        except httpx.HTTPError as e:
+            permit.release(False)
+            raise ProviderError(provider, None, f"{provider.title()} API request failed: {str(e)}")
+        
+        if response.status_code != 200:
+            error = ProviderError(provider, response.status_code, f"{provider.title()} API error: {response.status_code} - {response.text}")
+            permit.release(False if error.retryable else None)
+            raise error
+        
+        permit.release(True)
+        return provider, response.json()
+    
+    provider, result = await provider_failover.acall(get_provider_chain(), attempt)
+    usage_tracker.record(provider, result.get('usage'))
+    if structured:
+        result['structured_mode'] = structured_output_mode(provider, STRUCTURED_OUTPUT)
+    return result
+
+async def acall_ai_api_fanout(prompt, model=None, max_tokens=None):
+    """Async variant of call_ai_api_fanout"""
+    config = get_api_config()
+    if model is None:
+        model = config["default_model"]
+    
+    calls = []
+    for section, header, section_prompt in FANOUT_SECTIONS:
+        section_model = config["default_model"] if section == "match" else model
+        calls.append(acall_ai_api(
+            prompt,
+            section_model,
+            system_prompt=section_prompt,
+            max_tokens=min(FANOUT_SECTION_MAX_TOKENS.get(section, MAX_TOKENS), max_tokens or MAX_TOKENS)
+        ))
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    
+    sections = []
+    errors = []
+    for (_, header, _), result in zip(FANOUT_SECTIONS, results):
+        if isinstance(result, Exception):
+            errors.append(result)
+            continue
+        
+        text = get_response_text(result).strip()
+        if header not in text:
+            text = f"{header}\n{text}"
+        sections.append(text)
+    
+    if not sections:
+        raise errors[0]
+    
+    return "\n\n".join(sections), bool(errors)
+
+def is_greeting_line(line):
+    """Where the actual cover letter starts"""
+    return line.startswith(('Dear', 'To Whom It May Concern', 'Hiring Manager'))
+
+def is_advice_line(line):
+    """Where the actual suggestions start"""
+    return line.startswith(('-', '•', '1.', '*')) or len(line) > 20  # Likely actual content
 
 def clean_cover_letter(cover_letter_text):
     """Clean and format the cover letter to ensure it's complete and professional"""
     if not cover_letter_text:
         return ""
     
-    # Remove common AI explanatory phrases
-    unwanted_phrases = [
-        "Here's a cover letter",
-        "Here is a cover letter",
-        "The cover letter should",
-        "This cover letter",
-        "I'll write a cover letter",
-        "Let me create a cover letter",
-        "Here's what the cover letter should include",
-        "The cover letter would",
-        "This is a cover letter",
-        "Below is a cover letter",
-        "I'll provide",
-        "I'll write",
-        "Here's what I'll do",
-        "I will provide",
-        "I will write",
-        "The cover letter will",
-        "This will be a cover letter"
-    ]
-    
-    cleaned_text = cover_letter_text
-    
-    # Remove unwanted phrases
-    for phrase in unwanted_phrases:
-        if phrase.lower() in cleaned_text.lower():
-            # Find the position and remove everything before the actual letter
-            pos = cleaned_text.lower().find(phrase.lower())
-            if pos != -1:
-                # Look for the start of the actual letter (usually after a colon or newline)
-                remaining = cleaned_text[pos + len(phrase):]
-                # Find the first line that looks like a greeting
-                lines = remaining.split('\n')
-                for i, line in enumerate(lines):
-                    line = line.strip()
-                    if (line.startswith('Dear') or 
-                        line.startswith('To Whom It May Concern') or
-                        line.startswith('Hiring Manager') or
-                        line.startswith('Dear Hiring Manager')):
-                        cleaned_text = '\n'.join(lines[i:])
-                        break
+    # Remove common AI explanatory phrases before the actual letter
+    cleaned_text = response_scrubber.strip_preamble('cover_letter_preamble', cover_letter_text, is_greeting_line)
     
     # Check if the text is just a description rather than actual content
-    if any(phrase in cleaned_text.lower() for phrase in [
-        "i'll provide specific, actionable advice",
-        "i'll write a complete, professional cover letter",
-        "addresses the hiring manager directly",
-        "demonstrates understanding of the role",
-        "highlights relevant experience",
-        "shows enthusiasm and cultural fit",
-        "ends with a strong call to action"
-    ]):
+    if response_scrubber.mentions('cover_letter_description', cleaned_text):
         # This is a description, not actual content - return empty to trigger regeneration
         return ""
     
@@ -297,48 +813,11 @@ def clean_resume_suggestions(suggestions_text):
     if not suggestions_text:
         return ""
 
-    # Remove common AI explanatory phrases
-    unwanted_phrases = [
-        "i'll provide specific, actionable advice",
-        "i'll write specific, actionable advice",
-        "here's what i'll do",
-        "i will provide",
-        "i will write",
-        "here's the advice",
-        "the suggestions are",
-        "i'll give you"
-    ]
-
-    cleaned_text = suggestions_text
-
-    # Remove unwanted phrases
-    for phrase in unwanted_phrases:
-        if phrase.lower() in cleaned_text.lower():
-            # Find the position and remove everything before the actual suggestions
-            pos = cleaned_text.lower().find(phrase.lower())
-            if pos != -1:
-                # Look for the start of actual suggestions (usually after a colon or newline)
-                remaining = cleaned_text[pos + len(phrase):]
-                # Find the first line that looks like actual advice
-                lines = remaining.split('\n')
-                for i, line in enumerate(lines):
-                    line = line.strip()
-                    if (line.startswith('-') or
-                        line.startswith('•') or
-                        line.startswith('1.') or
-                        line.startswith('*') or
-                        len(line) > 20):  # Likely actual content
-                        cleaned_text = '\n'.join(lines[i:])
-                        break
+    # Remove common AI explanatory phrases before the actual suggestions
+    cleaned_text = response_scrubber.strip_preamble('suggestions_preamble', suggestions_text, is_advice_line)
 
     # Check if the text is just a description rather than actual content
-    if any(phrase in cleaned_text.lower() for phrase in [
-        "i'll provide specific, actionable advice",
-        "keyword optimization suggestions",
-        "quantifying achievements recommendations",
-        "strategic positioning advice",
-        "format and structure improvements"
-    ]) and len(cleaned_text) < 300:
+    if len(cleaned_text) < 300 and response_scrubber.mentions('suggestions_description', cleaned_text):
         # This is a description, not actual content - return empty to trigger regeneration
         return ""
 
@@ -394,111 +873,184 @@ def index():
     """Serve the main index.html page"""
     return render_template('index.html')
 
-@app.route('/analyze', methods=['POST'])
-def analyze():
-    """Analyze job description and resume, return suggestions and cover letter"""
-    try:
-        job_description = ""
-        resume_text = ""
-        
-        # Get selected model (from form data or JSON)
-        config = get_api_config()
-        selected_model = None
+@app.route('/metrics')
+def metrics():
+    """Expose runtime performance counters as JSON"""
+    return jsonify({
+        'transport': transport.stats(),
+        'async_transport': async_transport.stats(),
+        'analysis_cache': analysis_cache.stats() if analysis_cache is not None else None,
+        'analysis_coalescing': analysis_flight.stats(),
+        'providers': provider_failover.stats(),
+        'provider_guards': provider_guards.stats(),
+        'normalization': text_normalizer.stats(),
+        'resume_parsing': resume_parser.stats(),
+        'reasoning': reasoning_filter.stats(),
+        'output_modes': output_stats.stats(),
+        'response_scrubbing': response_scrubber.stats(),
+        'token_budget': token_budget.stats(),
+        'token_usage': usage_tracker.stats(),
+        'extraction': extraction_pool.stats(),
+        'extraction_cache': extraction_cache.stats(),
+        'uploads': upload_budget.stats(),
+        'upload_sniffing': upload_sniffer.stats()
+    })
+
+class AnalysisInputError(Exception):
+    """Raised when the analysis request is missing or has invalid input"""
+    pass
+
+def get_analysis_inputs():
+    """Read job description, resume text and selected model from the current request"""
+    job_description = ""
+    resume_text = ""
+    
+    # Check if it's a file upload or JSON request
+    if 'resume_file' in request.files:
+        # Handle file upload
+        job_description = request.form.get('job_description', '')
+        model_choice = request.form.get('ai_model', 'default')
+        resume_file = request.files['resume_file']
         
-        # Check if it's a file upload or JSON request
-        if 'resume_file' in request.files:
-            # Handle file upload
-            job_description = request.form.get('job_description', '')
-            model_choice = request.form.get('ai_model', 'default')
-            resume_file = request.files['resume_file']
-            
-            if resume_file.filename == '':
-                return jsonify({'error': 'No resume file selected'}), 400
-            
-            if not allowed_file(resume_file.filename):
-                return jsonify({'error': 'Invalid file type. Please upload PDF, DOCX, DOC, or TXT files only.'}), 400
-            
-            # Extract text from uploaded file
-            resume_text = extract_text_from_file(resume_file)
-            
-        else:
-            # Handle JSON request (text input)
-            data = request.get_json()
-            job_description = data.get('job_description', '')
-            resume_text = data.get('resume_text', '')
-            model_choice = data.get('ai_model', 'default')
+        if resume_file.filename == '':
+            raise AnalysisInputError('No resume file selected')
         
-        # Determine which model to use
-        if model_choice == 'sonar-reasoning-pro' or model_choice == 'pro':
-            selected_model = config['pro_model']
-        else:
-            selected_model = config['default_model']
+        if not allowed_file(resume_file.filename):
+            raise AnalysisInputError('Invalid file type. Please upload PDF, DOCX, DOC, or TXT files only.')
         
-        # Validate input
-        if not job_description or not resume_text:
-            return jsonify({'error': 'Both job description and resume are required'}), 400
+        # Extract text from uploaded file
+        try:
+            resume_text = extract_text_from_file(resume_file)
+        except (ExtractionLimitError, UploadRejectedError) as e:
+            raise AnalysisInputError(str(e))
         
-        # Construct the prompt for AI API
-        user_prompt = f"""
-[JOB_DESCRIPTION]
-{job_description}
+    else:
+        # Handle JSON request (text input)
+        data = request.get_json()
+        job_description = data.get('job_description', '')
+        resume_text = data.get('resume_text', '')
+        model_choice = data.get('ai_model', 'default')
+    
+    return validate_analysis_inputs(job_description, resume_text, model_choice)
+
+def validate_analysis_inputs(job_description, resume_text, model_choice):
+    """Resolve the model choice and make sure both inputs are present"""
+    config = get_api_config()
+    
+    # Determine which model to use
+    if model_choice == 'sonar-reasoning-pro' or model_choice == 'pro':
+        selected_model = config['pro_model']
+    else:
+        selected_model = config['default_model']
+    
+    # Drop extraction debris (repeated headers, hyphenation, glyphs, whitespace) that only costs tokens
+    job_description = text_normalizer.normalize(job_description)
+    resume_text = text_normalizer.normalize(resume_text)
+    
+    # Validate input
+    if not job_description or not resume_text:
+        raise AnalysisInputError('Both job description and resume are required')
+    
+    return job_description, resume_text, selected_model
+
+def analysis_system_prompt(stream=False):
+    """The system prompt an analysis is sent with, plus any schema or tool definition, for the token budget"""
+    output_mode = analysis_output_mode(stream)
+    if output_mode == "markdown":
+        return SYSTEM_PROMPT
+    mode = structured_output_mode(API_PROVIDER, output_mode)
+    return STRUCTURED_SYSTEM_PROMPT + structured_request_overhead(API_PROVIDER, mode)
+
+def fit_inputs_to_budget(job_description, resume_text, system_prompt=SYSTEM_PROMPT):
+    """Trim the inputs to the context budget and size max_tokens from what is left"""
+    fitted, max_tokens = token_budget.fit(system_prompt, [
+        ("resume_text", resume_text, MAX_RESUME_CHARS),
+        ("job_description", job_description, MAX_JOB_DESCRIPTION_CHARS)
+    ])
+    return fitted["job_description"], fitted["resume_text"], max_tokens
 
+def prepare_prompt_inputs(job_description, resume_text, stream=False):
+    """Parse the resume once, pre-score the match locally and fit the inputs to the budget
+
+    The budget is taken against the system prompt and schema of the output mode the request uses.
+    Returns (job_description, resume_text, max_tokens, local_match).
+    """
+    local_match = None
+    if STRUCTURED_RESUME_PROMPT or LOCAL_MATCH_PRESCORE:
+        profile = resume_parser.parse(resume_text)
+        if LOCAL_MATCH_PRESCORE:
+            local_match = prescore_match(profile, resume_text, job_description)
+        if STRUCTURED_RESUME_PROMPT:
+            resume_text = compact_resume(profile, resume_text)
+    job_description, resume_text, max_tokens = fit_inputs_to_budget(job_description, resume_text,
+                                                                     analysis_system_prompt(stream))
+    return job_description, resume_text, max_tokens, local_match
+
+def build_user_prompt(job_description, resume_text):
+    """Construct the prompt for AI API as (text, cacheable) parts
+
+    The resume comes first so repeat users trying different job descriptions
+    share a cacheable prefix of system prompt + resume.
+    """
+    return [
+        (f"""
 [MY_RESUME]
 {resume_text}
-"""
-        
-        # Make API call with selected model
-        response = call_ai_api(user_prompt, selected_model)
-        
-        # Get the AI response based on API provider
-        if API_PROVIDER == "anthropic":
-            ai_response = response['content'][0]['text']
-        else:
-            ai_response = response['choices'][0]['message']['content']
-        
-        # Parse the response to separate suggestions, cover letter, and match analysis
-        suggestions = ""
-        cover_letter = ""
-        match = None
-        
-        # More robust parsing logic
-        match_section_raw = re.search(r"### Job Match Analysis(.*?)(?=### Resume Enhancement Suggestions|### Generated Cover Letter|$)", ai_response, re.DOTALL)
-        suggestions_section_raw = re.search(r"### Resume Enhancement Suggestions(.*?)(?=### Generated Cover Letter|$)", ai_response, re.DOTALL)
-        cover_letter_section_raw = re.search(r"### Generated Cover Letter(.*?)$", ai_response, re.DOTALL)
-
-        # Extract JSON from match analysis section
-        if match_section_raw:
-            match_text = match_section_raw.group(1)
-            try:
-                # A more robust regex to find a JSON object containing the 'match' key
-                json_match = re.search(r'\{\s*"match"\s*:\s*\{[^\}]*\}\s*\}', match_text, re.DOTALL)
-                if json_match:
-                    match_obj = json.loads(json_match.group(0))
-                    if isinstance(match_obj, dict) and 'match' in match_obj:
-                        match = match_obj['match']
-            except (json.JSONDecodeError, AttributeError):
-                match = None # Keep it None if parsing fails
-
-        # Extract and clean suggestions
-        if suggestions_section_raw:
-            suggestions = clean_resume_suggestions(suggestions_section_raw.group(1).strip())
-
-        # Extract and clean cover letter
-        if cover_letter_section_raw:
-            cover_letter = clean_cover_letter(cover_letter_section_raw.group(1).strip())
-
-        # Fallback if parsing fails to populate suggestions
-        if not suggestions and not cover_letter and not match:
-            suggestions = ai_response
-        
-        # Check if we got actual content or just descriptions
-        if (suggestions and any(phrase in suggestions.lower() for phrase in [
-            "i'll provide", "i'll write", "here's what i'll do", "i will provide"
-        ])) or (cover_letter and any(phrase in cover_letter.lower() for phrase in [
-            "i'll provide", "i'll write", "here's what i'll do", "i will provide"
-        ])):
-            # We got descriptions instead of actual content, try again with a more direct prompt
-            retry_prompt = f"""
+""", True),
+        (f"""
+[JOB_DESCRIPTION]
+{job_description}
+""", False)
+    ]
+
+def analysis_output_mode(stream=False):
+    """The structured output setting an analysis runs with, or "markdown" when its sections are parsed"""
+    if stream or ANALYSIS_FANOUT or STRUCTURED_OUTPUT == "off":
+        return "markdown"
+    return STRUCTURED_OUTPUT
+
+def analysis_cache_key(job_description, resume_text, model, stream=False):
+    """Content-addressed cache key for an analysis request
+
+    Streamed and markdown analyses share entries; structured ones are kept apart.
+    """
+    return make_cache_key(
+        API_PROVIDER,
+        model,
+        SYSTEM_PROMPT,
+        ANALYSIS_FANOUT,
+        analysis_output_mode(stream),
+        TEMPERATURE,
+        normalize_text(job_description),
+        normalize_text(resume_text)
+    )
+
+def cache_analysis(cache_key, result):
+    """Store a parsed analysis, skipping responses that could not be parsed"""
+    if analysis_cache is not None and (result['cover_letter'] or result['match']):
+        analysis_cache.set(cache_key, result)
+
+def parse_ai_response(ai_response):
+    """Parse the response to separate suggestions, cover letter, and match analysis"""
+    sections = split_sections(ai_response)
+    match = extract_match(sections.match) if sections.match is not None else None
+    suggestions = clean_resume_suggestions(sections.suggestions) if sections.suggestions else ""
+    cover_letter = clean_cover_letter(sections.cover_letter) if sections.cover_letter else ""
+
+    # Fallback if parsing fails to populate suggestions
+    if not suggestions and not cover_letter and not match:
+        suggestions = ai_response
+    
+    return suggestions, cover_letter, match
+
+def needs_retry(suggestions, cover_letter):
+    """Check if we got descriptions of what the model will do instead of actual content"""
+    return (response_scrubber.mentions('retry_trigger', suggestions) or
+            response_scrubber.mentions('retry_trigger', cover_letter))
+
+def build_retry_prompt(job_description, resume_text):
+    """More direct prompt used when the first response only described the content"""
+    return f"""
 Write the actual job match analysis, resume suggestions and cover letter for this job application. Do not describe what you will do - provide the actual content.
 
 Job Description: {job_description}
@@ -516,62 +1068,341 @@ Provide three sections:
 ### Generated Cover Letter
 [Write the complete cover letter here]
 """
-            try:
-                retry_response = call_ai_api(retry_prompt, selected_model)
-                if API_PROVIDER == "anthropic":
-                    retry_ai_response = retry_response['content'][0]['text']
-                else:
-                    retry_ai_response = retry_response['choices'][0]['message']['content']
-                
-                # Parse the retry response
-                if "### Job Match Analysis" in retry_ai_response:
-                    retry_parts = retry_ai_response.split("### Job Match Analysis")
-                    if len(retry_parts) > 1:
-                        retry_match_part = retry_parts[1]
-                        if "### Resume Enhancement Suggestions" in retry_match_part:
-                            retry_match_text, retry_suggestions_part = retry_match_part.split("### Resume Enhancement Suggestions", 1)
-                            
-                            # Extract JSON from match analysis section
-                            try:
-                                json_match = re.search(r'\{[\s\S]*"match"\s*:\s*\{[\s\S]*?\}[\s\S]*\}', retry_match_text)
-                                if json_match:
-                                    match_obj = json.loads(json_match.group(0))
-                                    if isinstance(match_obj, dict) and 'match' in match_obj:
-                                        match = match_obj['match']
-                            except Exception:
-                                match = None
-                            
-                            if "### Generated Cover Letter" in retry_suggestions_part:
-                                suggestions, retry_cover_letter_part = retry_suggestions_part.split("### Generated Cover Letter", 1)
-                                cover_letter = retry_cover_letter_part.strip()
-                            else:
-                                suggestions = retry_suggestions_part.strip()
-                        else:
-                            # Extract JSON from match analysis section
-                            try:
-                                json_match = re.search(r'\{[\s\S]*"match"\s*:\s*\{[\s\S]*?\}[\s\S]*\}', retry_match_part)
-                                if json_match:
-                                    match_obj = json.loads(json_match.group(0))
-                                    if isinstance(match_obj, dict) and 'match' in match_obj:
-                                        match = match_obj['match']
-                            except Exception:
-                                match = None
-                else:
-                    suggestions = retry_ai_response
-            except Exception as e:
-                # If retry fails, use original response
-                pass
+
+def parse_retry_response(retry_ai_response, suggestions, cover_letter, match):
+    """Parse the retry response, keeping earlier values for anything it does not contain"""
+    sections = split_sections(retry_ai_response)
+    if sections.match is None:
+        return retry_ai_response, cover_letter, match
+    
+    retry_match = extract_match(sections.match)
+    if retry_match is not None:
+        match = retry_match
+    if sections.suggestions is not None:
+        suggestions = sections.suggestions
+    if sections.cover_letter is not None:
+        cover_letter = sections.cover_letter
+    
+    return suggestions, cover_letter, match
+
+def build_analysis_result(cache_key, suggestions, cover_letter, match, local_match, reasoning, cacheable=True):
+    """Assemble and cache the response body for an analysis; partial results are returned but not cached"""
+    result = {
+        'suggestions': suggestions.strip(),
+        'cover_letter': cover_letter.strip(),
+        'match': match,
+        'local_match': local_match
+    }
+    if RETURN_REASONING:
+        result['reasoning'] = reasoning
+    if cacheable:
+        cache_analysis(cache_key, result)
+    return result
+
+def parse_structured_response(response):
+    """Deserialize a structured-output response into (suggestions, cover_letter, match, reasoning)
+
+    Raises StructuredOutputError when it doesn't match the analysis schema.
+    """
+    payload = tool_input(response)
+    text, reasoning = '', ''
+    if payload is None:
+        text, reasoning = reasoning_filter.strip(get_response_text(response))
+        payload = load_envelope(text)
+    suggestions, cover_letter, match = validate_analysis(payload, text)
+    parsed = clean_resume_suggestions(suggestions), clean_cover_letter(cover_letter), match, reasoning
+    if not parsed[1]:
+        # The letter was only a description or preamble, which the cleaner drops
+        raise StructuredOutputError('empty_cover_letter', text, analysis=parsed)
+    return parsed
+
+def build_structured_retry_prompt(user_prompt, error):
+    """The original prompt plus the reason the previous reply was rejected"""
+    if error.reason == 'empty_cover_letter':
+        correction = "Write the complete cover letter itself, starting with the greeting, not a description of it."
+    else:
+        correction = "Reply again with only the JSON object in the required shape."
+    return list(user_prompt) + [(f"""
+Your previous reply was rejected ({error.reason}). {correction}
+""", False)]
+
+def finish_structured_analysis(mode, parse_seconds, error, retry_response):
+    """Parse the retry after a schema violation, falling back to the markdown parser if it is still invalid"""
+    started = time.perf_counter()
+    try:
+        if retry_response is None:
+            raise error
+        parsed = parse_structured_response(retry_response)
+    except StructuredOutputError as e:
+        # Prefer a schema-valid reply over re-parsing the text as markdown
+        parsed = e.analysis or error.analysis
+        if parsed is None:
+            suggestions, cover_letter, match = parse_ai_response(e.text or error.text)
+            parsed = suggestions, cover_letter, match, ''
+    parse_seconds += time.perf_counter() - started
+    output_stats.record(mode, parse_seconds, retried=True, violation=error.reason)
+    return parsed
+
+def run_structured_analysis(user_prompt, selected_model, max_tokens):
+    """Structured-output analysis; a second call is only made when the reply breaks the schema or has no letter"""
+    response = call_ai_api(user_prompt, selected_model, max_tokens=max_tokens, structured=True)
+    mode = response.get('structured_mode')
+    started = time.perf_counter()
+    try:
+        parsed = parse_structured_response(response)
+        output_stats.record(mode, time.perf_counter() - started)
+        return parsed
+    except StructuredOutputError as e:
+        error = e
+    parse_seconds = time.perf_counter() - started
+    
+    retry_response = None
+    try:
+        retry_response = call_ai_api(build_structured_retry_prompt(user_prompt, error), selected_model,
+                                     max_tokens=max_tokens, structured=True)
+    except Exception:
+        # If retry fails, use the original response
+        pass
+    return finish_structured_analysis(mode, parse_seconds, error, retry_response)
+
+async def run_structured_analysis_async(user_prompt, selected_model, max_tokens):
+    """Async variant of run_structured_analysis"""
+    response = await acall_ai_api(user_prompt, selected_model, max_tokens=max_tokens, structured=True)
+    mode = response.get('structured_mode')
+    started = time.perf_counter()
+    try:
+        parsed = parse_structured_response(response)
+        output_stats.record(mode, time.perf_counter() - started)
+        return parsed
+    except StructuredOutputError as e:
+        error = e
+    parse_seconds = time.perf_counter() - started
+    
+    retry_response = None
+    try:
+        retry_response = await acall_ai_api(build_structured_retry_prompt(user_prompt, error), selected_model,
+                                            max_tokens=max_tokens, structured=True)
+    except Exception:
+        # If retry fails, use the original response
+        pass
+    return finish_structured_analysis(mode, parse_seconds, error, retry_response)
+
+def run_analysis(job_description, resume_text, selected_model, cache_key):
+    """Call the AI API for an analysis and parse it into suggestions, cover letter and match"""
+    job_description, resume_text, max_tokens, local_match = prepare_prompt_inputs(job_description, resume_text)
+    user_prompt = build_user_prompt(job_description, resume_text)
+    
+    # The provider returns the analysis as JSON, so there is nothing to split or re-ask for
+    if analysis_output_mode() != "markdown":
+        suggestions, cover_letter, match, reasoning = run_structured_analysis(user_prompt, selected_model, max_tokens)
+        return build_analysis_result(cache_key, suggestions, cover_letter, match, local_match, reasoning)
+    
+    # Make API call with selected model; a fan-out with a failed section is not cached
+    partial = False
+    if ANALYSIS_FANOUT:
+        ai_response, partial = call_ai_api_fanout(user_prompt, selected_model, max_tokens=max_tokens)
+    else:
+        response = call_ai_api(user_prompt, selected_model, max_tokens=max_tokens)
+        ai_response = get_response_text(response)
+    
+    # Reasoning models think out loud in <think> blocks before the answer
+    ai_response, reasoning = reasoning_filter.strip(ai_response)
+    started = time.perf_counter()
+    suggestions, cover_letter, match = parse_ai_response(ai_response)
+    parse_seconds = time.perf_counter() - started
+    retried = needs_retry(suggestions, cover_letter)
+    
+    if retried:
+        # We got descriptions instead of actual content, try again with a more direct prompt
+        retry_prompt = build_retry_prompt(job_description, resume_text)
+        try:
+            retry_response = call_ai_api(retry_prompt, selected_model, max_tokens=max_tokens)
+            retry_ai_response, _ = reasoning_filter.strip(get_response_text(retry_response))
+            started = time.perf_counter()
+            suggestions, cover_letter, match = parse_retry_response(retry_ai_response, suggestions, cover_letter, match)
+            parse_seconds += time.perf_counter() - started
+        except Exception as e:
+            # If retry fails, use original response, but don't cache what still needed a retry
+            partial = True
+    output_stats.record("markdown", parse_seconds, retried=retried)
+    
+    return build_analysis_result(cache_key, suggestions, cover_letter, match, local_match, reasoning,
+                                 cacheable=not partial)
+
+async def run_analysis_async(job_description, resume_text, selected_model, cache_key):
+    """Async variant of run_analysis for the ASGI entry point"""
+    # Extraction, scoring and token counting are CPU-bound; keep them off the event loop
+    job_description, resume_text, max_tokens, local_match = await asyncio.to_thread(
+        prepare_prompt_inputs, job_description, resume_text
+    )
+    user_prompt = build_user_prompt(job_description, resume_text)
+    
+    if analysis_output_mode() != "markdown":
+        suggestions, cover_letter, match, reasoning = await run_structured_analysis_async(
+            user_prompt, selected_model, max_tokens
+        )
+        return build_analysis_result(cache_key, suggestions, cover_letter, match, local_match, reasoning)
+    
+    partial = False
+    if ANALYSIS_FANOUT:
+        ai_response, partial = await acall_ai_api_fanout(user_prompt, selected_model, max_tokens=max_tokens)
+    else:
+        response = await acall_ai_api(user_prompt, selected_model, max_tokens=max_tokens)
+        ai_response = get_response_text(response)
+    
+    # Reasoning models think out loud in <think> blocks before the answer
+    ai_response, reasoning = reasoning_filter.strip(ai_response)
+    started = time.perf_counter()
+    suggestions, cover_letter, match = parse_ai_response(ai_response)
+    parse_seconds = time.perf_counter() - started
+    retried = needs_retry(suggestions, cover_letter)
+    
+    if retried:
+        retry_prompt = build_retry_prompt(job_description, resume_text)
+        try:
+            retry_response = await acall_ai_api(retry_prompt, selected_model, max_tokens=max_tokens)
+            retry_ai_response, _ = reasoning_filter.strip(get_response_text(retry_response))
+            started = time.perf_counter()
+            suggestions, cover_letter, match = parse_retry_response(retry_ai_response, suggestions, cover_letter, match)
+            parse_seconds += time.perf_counter() - started
+        except Exception as e:
+            # If retry fails, use original response, but don't cache what still needed a retry
+            partial = True
+    output_stats.record("markdown", parse_seconds, retried=retried)
+    
+    return build_analysis_result(cache_key, suggestions, cover_letter, match, local_match, reasoning,
+                                 cacheable=not partial)
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    """Analyze job description and resume, return suggestions and cover letter"""
+    try:
+        try:
+            job_description, resume_text, selected_model = get_analysis_inputs()
+        except AnalysisInputError as e:
+            return jsonify({'error': str(e)}), 400
+        except UploadBusyError as e:
+            return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
+        
+        # Return a cached analysis for identical inputs without calling the provider
+        cache_key = analysis_cache_key(job_description, resume_text, selected_model)
+        if analysis_cache is not None:
+            cached = analysis_cache.get(cache_key)
+            if cached is not None:
+                return jsonify(cached)
         
-        return jsonify({
-            'suggestions': suggestions.strip(),
-            'cover_letter': cover_letter.strip(),
-            'match': match
-        })
+        # Identical requests already in flight share one provider call
+        result = analysis_flight.do(
+            cache_key,
+            lambda: run_analysis(job_description, resume_text, selected_model, cache_key)
+        )
         
+        return jsonify(result)
+        
+    except ProviderUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """Analyze job description and resume, relaying the model output as Server-Sent Events"""
+    try:
+        job_description, resume_text, selected_model = get_analysis_inputs()
+    except AnalysisInputError as e:
+        return jsonify({'error': str(e)}), 400
+    except UploadBusyError as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+    
+    def generate():
+        tracker = SectionTracker()
+        reasoning = reasoning_filter.stream()
+        chunks = []
+        flight = None
+        try:
+            # Cached analyses are sent straight away as the final result, before any prompt preparation
+            cache_key = analysis_cache_key(job_description, resume_text, selected_model, stream=True)
+            cached = analysis_cache.get(cache_key) if analysis_cache is not None else None
+            if cached is not None:
+                yield format_sse('result', cached)
+                yield format_sse('done', {})
+                return
+            
+            # An identical analysis already in flight (a double submit) is awaited and sent as one result
+            future, leader = analysis_flight.join(cache_key)
+            if not leader:
+                yield format_sse('result', future.result())
+                yield format_sse('done', {})
+                return
+            flight = future
+            
+            prompt_job, prompt_resume, max_tokens, local_match = prepare_prompt_inputs(
+                job_description, resume_text, stream=True
+            )
+            user_prompt = build_user_prompt(prompt_job, prompt_resume)
+            
+            # Reasoning blocks are cut out before anything reaches the browser
+            for delta in stream_ai_api(user_prompt, selected_model, max_tokens=max_tokens):
+                delta = reasoning.feed(delta)
+                if not delta:
+                    continue
+                chunks.append(delta)
+                for event, payload in tracker.feed(delta):
+                    yield format_sse(event, payload)
+            delta = reasoning.flush()
+            chunks.append(delta)
+            for event, payload in tracker.feed(delta) + tracker.flush():
+                yield format_sse(event, payload)
+            
+            # Send the cleaned, fully parsed result once the model is done
+            started = time.perf_counter()
+            suggestions, cover_letter, match = parse_ai_response(''.join(chunks))
+            output_stats.record("stream", time.perf_counter() - started)
+            result = build_analysis_result(cache_key, suggestions, cover_letter, match, local_match,
+                                           reasoning.reasoning_text())
+            analysis_flight.settle(cache_key, flight, result)
+            yield format_sse('result', result)
+        except Exception as e:
+            if flight is not None:
+                analysis_flight.settle(cache_key, flight, error=e)
+            yield format_sse('error', {'error': f'An error occurred: {str(e)}'})
+        finally:
+            # The browser went away mid-stream; don't leave identical requests waiting
+            if flight is not None and not flight.done():
+                analysis_flight.settle(cache_key, flight, error=Exception("The analysis was cancelled"))
+        yield format_sse('done', {})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def start_background_services():
+    """Start the work that should only happen in a serving process, not on import
+
+    Called from __main__ and the ASGI lifespan startup, so tests importing the app stay offline
+    and don't fork workers; the extraction pool still forks lazily on the first upload.
+    """
+    # Pre-fork extraction workers in the serving process (not inside the workers themselves)
+    if multiprocessing.parent_process() is None:
+        try:
+            extraction_pool.start()
+        except Exception:
+            pass
+    
+    # Open provider connections ahead of the first analysis
+    if HTTP_WARM_CONNECTIONS:
+        try:
+            transport.warm_in_background([get_api_config(provider)["api_url"] for provider in get_provider_chain()])
+        except Exception:
+            pass
+
 if __name__ == '__main__':
+    start_background_services()
+    
     # Get port from environment variable (Railway provides this)
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
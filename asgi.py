@@ -0,0 +1,101 @@
+# Career Copilot ASGI Entry Point
+# Serves JSON /analyze requests on the async provider client so one worker process can hold
+# hundreds of concurrent provider waits. Everything else (file uploads, streaming, pages)
+# falls back to the regular Flask app.
+#
+# Run with: uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+import json
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as career_copilot
+from app import AnalysisInputError, ProviderUnavailableError
+
+flask_app = WsgiToAsgi(career_copilot.app)
+
+
+async def read_body(receive):
+    """Read the full request body"""
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def send_json(send, payload, status=200):
+    """Send a JSON response"""
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii'))
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def analyze(receive, send):
+    """Async /analyze for JSON (text input) requests"""
+    try:
+        try:
+            data = json.loads(await read_body(receive) or b'{}')
+            job_description, resume_text, selected_model = career_copilot.validate_analysis_inputs(
+                data.get('job_description', ''),
+                data.get('resume_text', ''),
+                data.get('ai_model', 'default')
+            )
+        except AnalysisInputError as e:
+            return await send_json(send, {'error': str(e)}, 400)
+        except (ValueError, AttributeError):
+            return await send_json(send, {'error': 'Request body must be a JSON object'}, 400)
+
+        # Return a cached analysis for identical inputs without calling the provider
+        cache_key = career_copilot.analysis_cache_key(job_description, resume_text, selected_model)
+        if career_copilot.analysis_cache is not None:
+            cached = career_copilot.analysis_cache.get(cache_key)
+            if cached is not None:
+                return await send_json(send, cached)
+
+        # Identical requests already in flight share one provider call
+        result = await career_copilot.analysis_flight.ado(
+            cache_key,
+            lambda: career_copilot.run_analysis_async(job_description, resume_text, selected_model, cache_key)
+        )
+        await send_json(send, result)
+
+    except ProviderUnavailableError as e:
+        await send_json(send, {'error': str(e)}, 503)
+    except Exception as e:
+        await send_json(send, {'error': f'An error occurred: {str(e)}'}, 500)
+
+
+async def lifespan(receive, send):
+    """Start background services on startup and close pooled async clients on shutdown"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            career_copilot.start_background_services()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await career_copilot.async_transport.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    if scope['type'] == 'http' and scope['path'] == '/analyze' and scope['method'] == 'POST':
+        headers = dict(scope.get('headers') or [])
+        if headers.get(b'content-type', b'').startswith(b'application/json'):
+            return await analyze(receive, send)
+
+    await flask_app(scope, receive, send)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Compare concurrent analysis capacity of one worker: sync call_ai_api on a thread pool
+vs. async acall_ai_api on a single event loop, against a local fake provider with fixed latency.
+
+Usage: python benchmarks/bench_async_capacity.py [--requests 200] [--latency 0.5] [--threads 8]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PERPLEXITY_API_KEY', 'benchmark')
+os.environ.setdefault('ANALYSIS_CACHE_DIR', '')
+
+import app as career_copilot
+from resilience import GuardRegistry
+
+RESPONSE = json.dumps({'choices': [{'message': {'content': 'ok'}}]}).encode('utf-8')
+
+
+def start_fake_provider(latency):
+    """Start a local provider that answers every completion after a fixed delay"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(RESPONSE)))
+            self.end_headers()
+            self.wfile.write(RESPONSE)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/chat/completions"
+
+
+def bench_sync(count, threads):
+    """Sync worker: each in-flight call occupies a thread"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: career_copilot.call_ai_api("prompt"), range(count)))
+    return time.perf_counter() - start
+
+
+def bench_async(count):
+    """Async worker: every call waits on one event loop"""
+    async def run():
+        try:
+            await asyncio.gather(*(career_copilot.acall_ai_api("prompt") for _ in range(count)))
+        finally:
+            await career_copilot.async_transport.aclose()
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.5, help='provider latency in seconds')
+    parser.add_argument('--threads', type=int, default=8, help='threads per sync worker')
+    args = parser.parse_args()
+
+    career_copilot.PERPLEXITY_API_URL = start_fake_provider(args.latency)
+    career_copilot.API_PROVIDER_CHAIN = ["perplexity"]
+    # Let the benchmark measure the worker, not the adaptive concurrency limit
+    career_copilot.provider_guards = GuardRegistry(initial_limit=args.requests, max_limit=args.requests)
+
+    sync_seconds = bench_sync(args.requests, args.threads)
+    async_seconds = bench_async(args.requests)
+
+    print(f"{args.requests} requests, {args.latency:.2f}s provider latency")
+    print(f"sync  ({args.threads} threads): {sync_seconds:6.2f}s  {args.requests / sync_seconds:7.1f} req/s  "
+          f"max in flight {args.threads}")
+    print(f"async (1 event loop): {async_seconds:6.2f}s  {args.requests / async_seconds:7.1f} req/s  "
+          f"max in flight {args.requests}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Compare the installed PDF extraction backends on pages/sec and text fidelity.
+
+Fidelity is the word-sequence similarity (0-1) between the extracted text and the ground truth in
+reading order, so it penalizes both lost words and interleaved columns. Pass --corpus DIR with
+resume.pdf + resume.txt (ground truth) pairs; without one a fixture corpus of single- and
+two-column resumes is generated.
+
+Usage: python benchmarks/bench_pdf_backends.py [--corpus DIR] [--files 20] [--pages 2] [--repeat 3]
+"""
+import argparse
+import difflib
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import available_pdf_backends, extract_pdf_pages, pdf_page_count
+
+WORDS = re.compile(r'\w+')
+
+
+def build_pdf(pages):
+    """Build a text PDF; pages is a list of lists of (x, y, text) runs"""
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    pages_id = 2 + 2 * len(pages)
+    for runs in pages:
+        ops = " ".join(
+            "BT /F1 10 Tf %d %d Td (%s) Tj ET" % (x, y, text.replace("(", "\\(").replace(")", "\\)"))
+            for x, y, text in runs
+        ).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(ops), ops))
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 1 0 R >> >> /Contents %d 0 R >>" % (pages_id, len(objects)))
+        page_ids.append(len(objects))
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>"
+                   % (b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    return bytes(out)
+
+
+def fixture_resume(index, page_count, columns):
+    """Return (pdf bytes, ground truth) for a synthetic resume with one or two text columns"""
+    pages = []
+    truth = []
+    for page in range(page_count):
+        runs = []
+        for column in range(columns):
+            x = 50 + column * 290
+            for line in range(50):
+                text = f"Candidate {index} page {page} column {column} item {line} shipped Python services on AWS"
+                if columns == 2:
+                    text = text[:48]
+                runs.append((x, 740 - line * 12, text))
+                truth.append(text)
+        # Two-column files are drawn row by row, the way many resume builders emit them
+        if columns == 2:
+            runs.sort(key=lambda run: (-run[1], run[0]))
+        pages.append(runs)
+    return build_pdf(pages), "\n".join(truth)
+
+
+def load_corpus(directory):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith('.pdf'):
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            data = f.read()
+        truth_path = os.path.join(directory, name[:-4] + '.txt')
+        truth = None
+        if os.path.exists(truth_path):
+            with open(truth_path, encoding='utf-8') as f:
+                truth = f.read()
+        corpus.append((data, truth))
+    return corpus
+
+
+def fidelity(text, truth):
+    return difflib.SequenceMatcher(None, WORDS.findall(text.lower()), WORDS.findall(truth.lower()),
+                                   autojunk=False).ratio()
+
+
+def bench(backend, corpus, repeat):
+    """Return (pages/sec, mean fidelity or None, failures)"""
+    pages = 0
+    failures = 0
+    extracted = []
+    # Import the library and warm its caches outside the timed loop
+    extract_pdf_pages(corpus[0][0], 0, 1, backend=backend)
+
+    start = time.perf_counter()
+    for run in range(repeat):
+        for data, truth in corpus:
+            try:
+                count = pdf_page_count(data, backend)
+                text = "\n".join(extract_pdf_pages(data, 0, count, backend=backend))
+            except Exception:
+                failures += 1
+                continue
+            pages += count
+            if run == 0 and truth is not None:
+                extracted.append((text, truth))
+    elapsed = time.perf_counter() - start
+
+    scores = [fidelity(text, truth) for text, truth in extracted]
+    return pages / elapsed, (sum(scores) / len(scores) if scores else None), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--corpus', help='directory of .pdf resumes with optional .txt ground truth')
+    parser.add_argument('--files', type=int, default=20, help='fixture resumes per layout')
+    parser.add_argument('--pages', type=int, default=2, help='pages per fixture resume')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+        if not corpus:
+            parser.error('no .pdf files found')
+    else:
+        corpus = [fixture_resume(i, args.pages, columns) for columns in (1, 2) for i in range(args.files)]
+
+    backends = available_pdf_backends()
+    print(f"{len(corpus)} files x {args.repeat}, backends installed: {', '.join(backends)}")
+    for backend in backends:
+        rate, score, failures = bench(backend, corpus, args.repeat)
+        score = f"{score:.3f}" if score is not None else "  n/a"
+        print(f"{backend:10s} {rate:9.1f} pages/s  fidelity {score}  failures {failures}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compare the single-pass section tokenizer with the regex searches it replaced.
+
+The legacy parser ran three lazy `.*?` searches with lookaheads over the whole response (plus a
+split() cascade on the retry path). Responses of --sizes KB are generated in three shapes: all
+headers present, the cover letter header missing, and every header repeated.
+
+Usage: python benchmarks/bench_section_parser.py [--sizes 100,300,600] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sections import split_sections
+
+MATCH = '{"match": {"score": 72, "strengths": ["Python", "AWS"], "gaps": ["Go"]}}'
+LINE = "- Quantify the impact of the platform migration with latency and cost numbers\n"
+
+
+def legacy_split(text):
+    """The three searches parse_ai_response used before the tokenizer"""
+    match = re.search(r"### Job Match Analysis(.*?)(?=### Resume Enhancement Suggestions|### Generated Cover Letter|$)",
+                      text, re.DOTALL)
+    suggestions = re.search(r"### Resume Enhancement Suggestions(.*?)(?=### Generated Cover Letter|$)", text, re.DOTALL)
+    cover_letter = re.search(r"### Generated Cover Letter(.*?)$", text, re.DOTALL)
+    return [section.group(1) if section else None for section in (match, suggestions, cover_letter)]
+
+
+def build_response(kilobytes, shape, repeats=20):
+    copies = repeats if shape == 'repeated' else 1
+    body = LINE * max(1, kilobytes * 1024 // len(LINE) // 2 // copies)
+    headers = ["### Job Match Analysis\n" + MATCH + "\n",
+               "### Resume Enhancement Suggestions\n" + body,
+               "### Generated Cover Letter\nDear Hiring Manager,\n" + body]
+    if shape == 'no_cover_letter':
+        headers[2] = body
+    elif shape == 'repeated':
+        headers = [header for header in headers for _ in range(repeats)]
+    return "".join(headers)
+
+
+def timed(fn, text, repeat):
+    fn(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='100,300,600', help='response sizes in KB')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'shape':16s} {'size':>7s} {'legacy ms':>10s} {'tokenizer ms':>13s}")
+    for shape in ('complete', 'no_cover_letter', 'repeated'):
+        for size in (int(value) for value in args.sizes.split(',')):
+            text = build_response(size, shape)
+            legacy = timed(legacy_split, text, args.repeat)
+            tokenizer = timed(split_sections, text, args.repeat)
+            print(f"{shape:16s} {len(text) // 1024:6d}K {legacy:10.2f} {tokenizer:13.2f}")
+
+
+if __name__ == '__main__':
+    main()
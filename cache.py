@@ -0,0 +1,190 @@
+# Career Copilot Result Cache
+# In-memory LRU + TTL cache with an optional disk-backed tier that survives restarts
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Normalize text for cache keys so whitespace-only differences hit the same entry"""
+    if not text:
+        return ""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_cache_key(*parts):
+    """Build a content-addressed SHA-256 key from the given parts"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL and an optional JSON-on-disk tier
+
+    The disk tier is swept at most every prune_interval seconds on write: expired files are
+    deleted, then the oldest ones until it fits in max_disk_bytes (0 disables the size cap).
+    """
+
+    def __init__(self, max_entries=256, ttl=24 * 60 * 60, disk_dir=None,
+                 max_disk_bytes=64 * 1024 * 1024, prune_interval=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir or None
+        self.max_disk_bytes = max_disk_bytes
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_pruned = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self.prune_disk()
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and self.ttl > 0 and time.time() - stored_at > self.ttl
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        """Load an entry from the disk tier, dropping it if it has expired"""
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self._expired(record.get('stored_at', 0)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return record
+
+    def _write_disk(self, key, record):
+        """Atomically write an entry to the disk tier"""
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _prune_due(self):
+        with self._lock:
+            now = time.time()
+            if now - self._last_prune < self.prune_interval:
+                return False
+            self._last_prune = now
+            return True
+
+    def prune_disk(self):
+        """Delete expired disk entries, then the oldest ones until the tier fits max_disk_bytes"""
+        with self._lock:
+            self._last_prune = time.time()
+        files = []
+        try:
+            names = os.listdir(self.disk_dir)
+        except OSError:
+            return 0
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            # Entries are written once with os.replace, so the mtime is when they were stored
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for stored_at, size, path in files:
+            if not self._expired(stored_at) and (not self.max_disk_bytes or total <= self.max_disk_bytes):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self.disk_pruned += removed
+        return removed
+
+    def _store(self, key, record):
+        """Insert into the memory tier, evicting the least recently used entries"""
+        self._entries[key] = record
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        """Return the cached value or None"""
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None:
+                if self._expired(record['stored_at']):
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return record['value']
+
+        if self.disk_dir:
+            record = self._read_disk(key)
+            if record is not None:
+                with self._lock:
+                    self._store(key, record)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return record['value']
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        """Cache a JSON-serializable value"""
+        record = {'stored_at': time.time(), 'value': value}
+        with self._lock:
+            self._store(key, record)
+        if self.disk_dir:
+            self._write_disk(key, record)
+            if self._prune_due():
+                self.prune_disk()
+
+    def stats(self):
+        """Report hit/miss counters for the metrics endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'disk_pruned': self.disk_pruned,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
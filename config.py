@@ -30,6 +30,7 @@ ANTHROPIC_API_KEY = ""  # Add your Anthropic API key here
 ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
 ANTHROPIC_DEFAULT_MODEL = "claude-3-sonnet-20240229"
 ANTHROPIC_PRO_MODEL = "claude-3-opus-20240229"
+ANTHROPIC_API_VERSION = "2023-06-01"
 
 # Custom API Settings (if using a custom endpoint)
 CUSTOM_API_KEY = ""  # Add your custom API key here
@@ -41,10 +42,99 @@ CUSTOM_PRO_MODEL = ""
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
 
+# File Extraction Settings (PDF/DOCX parsing runs in worker processes)
+EXTRACTION_WORKERS = 2  # Worker processes per web process, 0 parses on the request thread
+PDF_PAGES_PER_TASK = 4  # Page range size when a large PDF is split across workers
+PDF_PARALLEL_MIN_PAGES = 8  # PDFs with at least this many pages are extracted in parallel
+MAX_RESUME_PAGES = 30  # PDFs with more pages are rejected before extraction
+MAX_EXTRACTED_CHARS = 100000  # Extraction stops after this many characters
+EXTRACTION_TIMEOUT = 20  # Seconds allowed to extract one file; stuck workers are killed and replaced
+EXTRACTION_CPU_LIMIT = 15  # CPU seconds per extraction task (RLIMIT_CPU in the worker)
+EXTRACTION_MEMORY_LIMIT = 512 * 1024 * 1024  # Bytes a worker may allocate beyond its size at fork (RLIMIT_AS)
+# "auto" uses the fastest installed of "pymupdf", "pypdf2", "pypdf", "pdfminer" (pdfminer is much slower but
+# keeps multi-column layouts in reading order); the other installed backends are fallbacks if one fails
+PDF_BACKEND = "auto"
+DOCX_EXTRACTOR = "xml"  # "xml" streams the DOCX parts with lxml (tables, text boxes, headers), or "python-docx"
+
+# Upload Settings (uploads larger than the spool threshold are streamed to temp files)
+UPLOAD_SPOOL_THRESHOLD = 1024 * 1024  # Bytes of one upload kept in memory before spilling to disk
+UPLOAD_MEMORY_LIMIT = 32 * 1024 * 1024  # In-memory upload bytes across concurrent requests, 429 beyond
+SNIFF_SCAN_BYTES = 2 * 1024 * 1024  # Leading bytes inspected to identify the file type and image-only PDFs
+CHARSET_SAMPLE_BYTES = 64 * 1024  # Leading bytes of a .txt upload used to detect its encoding
+
+# Extraction Cache Settings (re-uploads of the same file skip parsing)
+EXTRACTION_CACHE_SIZE = 128  # Extracted resumes kept in memory
+EXTRACTION_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds before a cached extraction expires
+EXTRACTION_CACHE_DIR = os.getenv('EXTRACTION_CACHE_DIR', '')  # Optional disk tier, "" keeps it in memory
+
 # AI Model Settings
 MAX_TOKENS = 4000  # Maximum tokens for AI response
 TEMPERATURE = 0.6  # AI creativity level (0.0 to 1.0)
 
+# Token Budget Settings (enforced on the server before calling the AI API)
+CONTEXT_TOKEN_BUDGET = 16000  # Prompt + response tokens allowed per request
+MIN_RESPONSE_TOKENS = 1500  # Inputs are trimmed so at least this much is left for the response
+MAX_JOB_DESCRIPTION_CHARS = 10000  # Same limits as the character counters in the browser
+MAX_RESUME_CHARS = 15000
+
+# Text Normalization Settings (applied to both inputs before the prompt is built)
+# Rules: "ligatures", "repeated_lines" (PDF page headers/footers), "dehyphenation", "bullets", "whitespace"
+TEXT_NORMALIZATION_RULES = ["ligatures", "repeated_lines", "dehyphenation", "bullets", "whitespace"]
+
+# Resume Parsing Settings (each distinct resume is parsed once and cached like extractions)
+STRUCTURED_RESUME_PROMPT = True  # Send the compact structured profile when it is shorter than the resume text
+LOCAL_MATCH_PRESCORE = True  # Score skill/experience fit locally and return it as local_match
+
+# Response Cleaning Settings
+# Replace any built-in phrase list from scrubbing.PHRASE_LISTS by name, e.g.
+# {"retry_trigger": ["I'll provide", "I will provide"]}; matching is case-insensitive
+SCRUB_PHRASES = {}
+# <think> reasoning blocks are always cut out before parsing; for debugging, also return them as "reasoning"
+RETURN_REASONING = False
+
+# Structured Output Settings (/analyze without fan-out; streaming keeps the markdown sections)
+# "auto" uses JSON schema on OpenAI/Perplexity, tool calling on Anthropic and a strict JSON envelope
+# on custom providers; "json_schema", "tool" or "envelope" force a mode where supported; "off" parses markdown
+STRUCTURED_OUTPUT = "off"
+
+# Prompt Caching Settings
+# The system prompt and resume are sent as a stable prefix; Anthropic gets explicit
+# cache_control markers, OpenAI-compatible providers cache the prefix automatically
+PROMPT_CACHING_ENABLED = True
+
+# HTTP Transport Settings (shared by all API providers)
+HTTP_POOL_SIZE = 16  # Keep-alive connections kept open per provider host
+HTTP_CONNECT_TIMEOUT = 5  # Seconds to wait for the TCP/TLS connection
+HTTP_READ_TIMEOUT = 120  # Seconds to wait for the provider to send data
+HTTP_WARM_CONNECTIONS = True  # Open provider connections at startup
+ASYNC_POOL_SIZE = 200  # Connections per provider host for the async path (asgi.py)
+
+# Analysis Cache Settings (repeat submissions skip the AI API call)
+ANALYSIS_CACHE_ENABLED = True
+ANALYSIS_CACHE_SIZE = 256  # Maximum analyses kept in memory
+ANALYSIS_CACHE_TTL = 24 * 60 * 60  # Seconds before a cached analysis expires
+ANALYSIS_CACHE_DIR = os.getenv('ANALYSIS_CACHE_DIR', '')  # Optional disk tier (keeps generated letters), "" keeps it in memory
+ANALYSIS_CACHE_DISK_BYTES = 64 * 1024 * 1024  # Oldest disk entries are pruned beyond this size
+
+# Provider Failover Settings
+# Providers are tried in order; 429 and 5xx responses fail over automatically.
+# Providers without an API key are skipped.
+API_PROVIDER_CHAIN = ["perplexity", "openai", "anthropic"]
+HEDGE_AFTER_SECONDS = 0  # Fire the next provider if no first byte by then (set near p95), 0 disables
+FAILOVER_MAX_WORKERS = 32  # Threads for hedged provider calls
+
+# Circuit Breaker & Concurrency Settings (per provider and model)
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before requests fail fast with a 503
+CIRCUIT_RESET_TIMEOUT = 30  # Seconds before a trial request is let through again
+CONCURRENCY_INITIAL_LIMIT = 8  # Starting number of concurrent calls (adjusted up/down automatically)
+CONCURRENCY_MIN_LIMIT = 1
+CONCURRENCY_MAX_LIMIT = 64
+
+# Fan-out Settings (generate match, suggestions and cover letter as parallel AI calls)
+ANALYSIS_FANOUT = False  # Latency is bounded by the slowest section instead of their sum
+FANOUT_MAX_WORKERS = 24  # Threads shared by all in-flight fan-out section calls
+FANOUT_SECTION_MAX_TOKENS = {"match": 600, "suggestions": 1500, "cover_letter": 1500}
+
 # Cover Letter Generation Settings
 COVER_LETTER_STYLE = "professional"  # Options: "professional", "casual", "creative"
 COVER_LETTER_LENGTH = "medium"  # Options: "short", "medium", "long"
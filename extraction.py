@@ -0,0 +1,773 @@
+# Career Copilot Document Extraction
+# CPU-heavy PDF/DOCX parsing runs in a pre-forked process pool so web workers only do I/O
+
+import codecs
+import hashlib
+import importlib.util
+import io
+import math
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; workers then run without CPU and memory rlimits
+    resource = None
+
+import charset_normalizer
+
+from cache import ResultCache, make_cache_key
+
+# Bump when extraction output changes so cached text from older extractors is not reused
+EXTRACTION_VERSION = 3
+
+# Separates PDF pages in extracted text so normalization can find repeated headers and footers
+PAGE_BREAK = '\f'
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MARKUP_COMPATIBILITY_NAMESPACE = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+
+class ExtractionLimitError(Exception):
+    """Raised when an uploaded file exceeds the page, memory or time limits for extraction"""
+    pass
+
+
+class ExtractionTimeoutError(ExtractionLimitError):
+    """Raised when a file could not be parsed within the wall-clock or CPU-time limit"""
+    pass
+
+
+PARSE_TIMEOUT_MESSAGE = "Your resume could not be parsed in time. Please try a simpler PDF, a DOCX or a TXT file."
+
+
+class UploadBusyError(Exception):
+    """Raised when accepting another upload would exceed the in-memory upload budget"""
+    pass
+
+
+def _open_source(source):
+    """Worker functions accept either the file contents or the path of a spooled temp file"""
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+def _check_deadline(deadline):
+    if deadline is not None and time.time() > deadline:
+        raise ExtractionTimeoutError(PARSE_TIMEOUT_MESSAGE)
+
+
+def _address_space():
+    """Current virtual memory size of this process in bytes, or 0 if unknown"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _on_cpu_limit(signum, frame):
+    raise ExtractionTimeoutError(PARSE_TIMEOUT_MESSAGE)
+
+
+def _init_worker(memory_limit=0, pdf_backends=()):
+    """Import the parsers once per worker process and put the worker in its sandbox"""
+    import docx  # noqa: F401
+    from lxml import etree  # noqa: F401
+
+    for backend in pdf_backends:
+        try:
+            importlib.import_module(PDF_BACKENDS[backend][0])
+        except ImportError:
+            # Reported (and skipped) per file by the fallback in ExtractionPool.extract_pdf
+            pass
+
+    if resource is None:
+        return
+
+    # SIGXCPU turns an exhausted CPU-time limit into an exception in the running task
+    signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+    size = _address_space()
+    if memory_limit and size:
+        # The limit is headroom on top of what the worker inherited at fork
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = size + memory_limit
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _sandboxed(cpu_limit, fn, *args):
+    """Run one extraction task in a worker, limited to cpu_limit seconds of CPU time"""
+    previous = None
+    if cpu_limit and resource is not None:
+        # RLIMIT_CPU counts the worker's lifetime, so the limit is set relative to what it has used
+        previous = resource.getrlimit(resource.RLIMIT_CPU)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        limit = math.ceil(usage.ru_utime + usage.ru_stime) + cpu_limit
+        if previous[1] != resource.RLIM_INFINITY:
+            limit = min(limit, previous[1])
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, previous[1]))
+    try:
+        return fn(*args)
+    except MemoryError:
+        raise ExtractionLimitError("File is too large to parse") from None
+    finally:
+        if previous is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, previous)
+
+
+def _ping():
+    return True
+
+
+def _open_pypdf2(source):
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(_open_source(source))
+    return len(reader.pages), lambda index: reader.pages[index].extract_text()
+
+
+def _open_pypdf(source):
+    import pypdf
+
+    reader = pypdf.PdfReader(_open_source(source))
+    return len(reader.pages), lambda index: reader.pages[index].extract_text()
+
+
+def _open_pymupdf(source):
+    import fitz
+
+    if isinstance(source, str):
+        document = fitz.open(source)
+    else:
+        document = fitz.open(stream=source, filetype='pdf')
+    return document.page_count, lambda index: document[index].get_text()
+
+
+def _open_pdfminer(source):
+    from pdfminer.high_level import extract_text
+    from pdfminer.pdfpage import PDFPage
+
+    stream = _open_source(source)
+    page_count = sum(1 for _ in PDFPage.get_pages(stream))
+    return page_count, lambda index: extract_text(stream, page_numbers=[index]).rstrip('\f')
+
+
+# name -> (module, opener); an opener returns (page_count, page_text(index)).
+# Listed fastest first as measured by benchmarks/bench_pdf_backends.py, which is the "auto" order
+PDF_BACKENDS = {
+    'pymupdf': ('fitz', _open_pymupdf),
+    'pypdf2': ('PyPDF2', _open_pypdf2),
+    'pypdf': ('pypdf', _open_pypdf),
+    'pdfminer': ('pdfminer', _open_pdfminer)
+}
+
+
+def available_pdf_backends():
+    """Backends whose library is installed, in "auto" order"""
+    return [name for name, (module, _) in PDF_BACKENDS.items() if importlib.util.find_spec(module)]
+
+
+def pdf_backend_chain(preferred='auto'):
+    """The backend to use first, followed by the installed fallbacks"""
+    available = available_pdf_backends()
+    if preferred == 'auto':
+        return available
+    if preferred not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {preferred}")
+    return [preferred] + [name for name in available if name != preferred]
+
+
+def pdf_page_count(source, backend='pypdf2'):
+    """Number of pages in a PDF"""
+    return PDF_BACKENDS[backend][1](source)[0]
+
+
+def extract_pdf_pages(source, start, end, max_chars=None, deadline=None, backend='pypdf2'):
+    """Extract the text of pages [start, end) of a PDF
+
+    Stops early once max_chars have been extracted, and raises ExtractionTimeoutError if the
+    (wall-clock) deadline passes between pages.
+    """
+    page_count, page_text = PDF_BACKENDS[backend][1](source)
+    pages = []
+    extracted = 0
+    for index in range(start, min(end, page_count)):
+        _check_deadline(deadline)
+        text = page_text(index)
+        pages.append(text)
+        extracted += len(text)
+        if max_chars and extracted >= max_chars:
+            break
+    return pages
+
+
+def extract_pdf(source, backend=None):
+    """Extract the text of every page of a PDF with one backend (the first installed by default)"""
+    backend = backend or pdf_backend_chain()[0]
+    return join_pages(extract_pdf_pages(source, 0, pdf_page_count(source, backend), backend=backend))
+
+
+def extract_docx(source):
+    """Extract paragraph text from a DOCX"""
+    from docx import Document
+
+    doc = Document(_open_source(source))
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
+
+
+def _iter_part_paragraphs(part):
+    """Stream paragraph texts out of one WordprocessingML part, clearing parsed elements as it goes"""
+    from lxml import etree
+
+    paragraph = WORD_NAMESPACE + 'p'
+    text = WORD_NAMESPACE + 't'
+    tab = WORD_NAMESPACE + 'tab'
+    breaks = (WORD_NAMESPACE + 'br', WORD_NAMESPACE + 'cr')
+    # Text boxes are stored twice (DrawingML plus a VML fallback); only read the first copy
+    fallback = MARKUP_COMPATIBILITY_NAMESPACE + 'Fallback'
+
+    # Text boxes nest paragraphs inside paragraphs, so keep one buffer per open paragraph
+    buffers = []
+    in_fallback = 0
+    for event, elem in etree.iterparse(part, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            if tag == fallback:
+                in_fallback += 1
+            elif tag == paragraph and not in_fallback:
+                buffers.append([])
+            continue
+
+        if tag == fallback:
+            in_fallback -= 1
+        elif in_fallback:
+            pass
+        elif tag == text and buffers:
+            buffers[-1].append(elem.text or "")
+        elif tag == tab and buffers:
+            buffers[-1].append("\t")
+        elif tag in breaks and buffers:
+            buffers[-1].append("\n")
+        elif tag == paragraph:
+            yield "".join(buffers.pop())
+
+        # Drop finished paragraphs and tables so memory stays flat on long documents
+        if tag == paragraph or tag == WORD_NAMESPACE + 'tbl':
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None and parent.tag == WORD_NAMESPACE + 'body':
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+def _docx_part_names(names):
+    """Headers, then the main document (including tables and text boxes), then footers"""
+    headers = sorted(name for name in names if name.startswith('word/header') and name.endswith('.xml'))
+    footers = sorted(name for name in names if name.startswith('word/footer') and name.endswith('.xml'))
+    return headers + ['word/document.xml'] + footers
+
+
+def extract_docx_xml(source):
+    """Extract DOCX text by streaming the WordprocessingML parts with lxml iterparse
+
+    Unlike python-docx paragraphs, this picks up tables, text boxes, headers and footers.
+    """
+    import zipfile
+
+    lines = []
+    seen_parts = set()
+    with zipfile.ZipFile(_open_source(source)) as archive:
+        names = set(archive.namelist())
+        for name in _docx_part_names(names):
+            if name not in names:
+                continue
+            with archive.open(name) as part:
+                part_lines = list(_iter_part_paragraphs(part))
+            # Sections often repeat the same header and footer
+            key = tuple(part_lines)
+            if name != 'word/document.xml':
+                if key in seen_parts:
+                    continue
+                seen_parts.add(key)
+            lines.extend(part_lines)
+    return "\n".join(lines).strip()
+
+
+# Selectable with DOCX_EXTRACTOR; see benchmarks/bench_docx_extraction.py
+DOCX_EXTRACTORS = {
+    'xml': extract_docx_xml,
+    'python-docx': extract_docx
+}
+
+
+# Checked before any detection; UTF-32 first since its little-endian BOM starts with UTF-16's
+TEXT_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+)
+# Windows "ANSI" exports; preferred among the single-byte code pages that fit equally well
+FALLBACK_ENCODING = 'cp1252'
+
+
+def detect_encoding(sample, complete=True):
+    """Guess the encoding of a text upload from a prefix of its bytes
+
+    complete says whether the sample is the whole file; when it isn't, a multi-byte
+    character cut off at the end of the sample doesn't count against UTF-8.
+    """
+    for bom, encoding in TEXT_BOMS:
+        if sample.startswith(bom):
+            return encoding
+    # NULs are valid UTF-8 but in practice mean BOM-less UTF-16
+    if b'\x00' not in sample:
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=complete)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+
+    best = charset_normalizer.from_bytes(sample).best()
+    if best is None:
+        return FALLBACK_ENCODING
+    # Western resumes come out of Word as cp1252; cp1250/cp1254 etc. are indistinguishable on most text
+    if best.encoding != FALLBACK_ENCODING and FALLBACK_ENCODING in best.could_be_from_charset:
+        return FALLBACK_ENCODING
+    return best.encoding
+
+
+def decode_text(stream, max_chars=None, encoding=None, chunk_size=64 * 1024, sample_bytes=64 * 1024):
+    """Decode a text upload chunk by chunk, stopping once max_chars have been decoded
+
+    Without an explicit encoding it is detected from the first sample_bytes, which are then
+    decoded along with the rest of the stream so the file is only read once. Bytes the
+    detected encoding can't map are replaced rather than failing the upload.
+    """
+    sample = b''
+    if encoding is None:
+        sample = stream.read(sample_bytes)
+        encoding = detect_encoding(sample, complete=len(sample) < sample_bytes)
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    parts = []
+    decoded = 0
+    while True:
+        chunk = sample or stream.read(chunk_size)
+        sample = b''
+        text = decoder.decode(chunk, final=not chunk)
+        parts.append(text)
+        decoded += len(text)
+        if not chunk or (max_chars and decoded >= max_chars):
+            break
+    return cap_chars("".join(parts), max_chars)
+
+
+def cap_chars(text, max_chars):
+    """Hard limit on extracted characters"""
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars]
+    return text
+
+
+def join_pages(pages):
+    """Reassemble page texts in order"""
+    return PAGE_BREAK.join(pages).strip()
+
+
+class ExtractionPool:
+    """Sandboxed process pool for document parsing; large PDFs are split into page ranges extracted in parallel
+
+    Every file is held to max_pages, max_chars and a wall-clock timeout, and every task to
+    cpu_limit seconds of CPU time; workers get memory_limit bytes of headroom (0 disables a limit).
+    Workers still busy at the deadline are killed and replaced.
+    """
+
+    def __init__(self, workers=2, pages_per_task=4, parallel_min_pages=8,
+                 max_pages=0, max_chars=0, timeout=0, cpu_limit=0, memory_limit=0,
+                 docx_extractor='xml', pdf_backend='auto'):
+        if docx_extractor not in DOCX_EXTRACTORS:
+            raise ValueError(f"Unknown DOCX extractor: {docx_extractor}")
+        self.workers = workers
+        self.docx_extractor = docx_extractor
+        self.pdf_backends = pdf_backend_chain(pdf_backend)
+        self.pages_per_task = pages_per_task
+        self.parallel_min_pages = parallel_min_pages
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+        self._executor = None
+        self._lock = threading.Lock()
+        self.files = 0
+        self.parallel_files = 0
+        self.page_tasks = 0
+        self.rejected_pages = 0
+        self.timeouts = 0
+        self.recycled_pools = 0
+        self.backend_files = {}
+        self.backend_failures = {}
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def start(self):
+        """Fork the worker processes now so the first upload doesn't pay for it"""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Fork where available so workers inherit the already-imported parsers
+                if 'fork' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('fork')
+                else:
+                    context = multiprocessing.get_context()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit, self.pdf_backends)
+                )
+            return self._executor
+
+    def _recycle(self, executor):
+        """Kill the workers of a pool with a stuck or crashed task; the next call forks fresh ones"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.recycled_pools += 1
+
+        # A running task can't be cancelled, so its worker processes are terminated instead
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, parallel, tasks):
+        with self._lock:
+            self.files += 1
+            if parallel:
+                self.parallel_files += 1
+            self.page_tasks += tasks
+
+    def _count_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def _deadline(self):
+        return time.time() + self.timeout if self.timeout else None
+
+    def _check_pages(self, page_count):
+        if self.max_pages and page_count > self.max_pages:
+            with self._lock:
+                self.rejected_pages += 1
+            raise ExtractionLimitError(
+                f"File has {page_count} pages; at most {self.max_pages} pages are supported"
+            )
+
+    def _run(self, calls, deadline):
+        """Run (fn, args) calls in the sandboxed workers and return their results in order
+
+        If the pool breaks (a worker crashed, or was killed for another file's timeout) it is
+        replaced and the calls are retried once.
+        """
+        for attempt in range(2):
+            executor = self._get_executor()
+            futures = []
+            try:
+                futures = [executor.submit(_sandboxed, self.cpu_limit, fn, *args) for fn, args in calls]
+                results = []
+                for future in futures:
+                    remaining = None if deadline is None else max(deadline - time.time(), 0)
+                    results.append(future.result(timeout=remaining))
+                return results
+            except BrokenProcessPool:
+                self._recycle(executor)
+                if attempt:
+                    raise ExtractionLimitError("File could not be parsed") from None
+            except FutureTimeoutError:
+                self._count_timeout()
+                self._recycle(executor)
+                raise ExtractionTimeoutError(PARSE_TIMEOUT_MESSAGE) from None
+            except ExtractionTimeoutError:
+                # A worker hit its CPU limit or noticed the deadline between pages
+                self._count_timeout()
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def extract_pdf(self, source):
+        """Extract PDF text with the configured backend, falling back to the next one if it fails"""
+        deadline = self._deadline()
+        errors = []
+        for backend in self.pdf_backends:
+            try:
+                text = self._extract_pdf_with(backend, source, deadline)
+            except ExtractionLimitError:
+                raise
+            except Exception as e:
+                with self._lock:
+                    self.backend_failures[backend] = self.backend_failures.get(backend, 0) + 1
+                errors.append(f"{backend}: {e}")
+                continue
+            with self._lock:
+                self.backend_files[backend] = self.backend_files.get(backend, 0) + 1
+            return text
+        raise Exception("; ".join(errors) or "no PDF backend installed")
+
+    def _extract_pdf_with(self, backend, source, deadline):
+        """Extract PDF text with one backend, in parallel page ranges for large documents"""
+        if not self.enabled:
+            page_count = pdf_page_count(source, backend)
+            self._check_pages(page_count)
+            try:
+                pages = extract_pdf_pages(source, 0, page_count, self.max_chars, deadline, backend)
+            except ExtractionTimeoutError:
+                self._count_timeout()
+                raise
+            self._count(False, 1)
+            return cap_chars(join_pages(pages), self.max_chars)
+
+        page_count = self._run([(pdf_page_count, (source, backend))], deadline)[0]
+        self._check_pages(page_count)
+
+        if page_count < self.parallel_min_pages:
+            calls = [(extract_pdf_pages, (source, 0, page_count, self.max_chars, deadline, backend))]
+            pages = self._run(calls, deadline)[0]
+            self._count(False, 1)
+            return cap_chars(join_pages(pages), self.max_chars)
+
+        ranges = [(start, start + self.pages_per_task) for start in range(0, page_count, self.pages_per_task)]
+        calls = [(extract_pdf_pages, (source, start, end, self.max_chars, deadline, backend)) for start, end in ranges]
+
+        pages = []
+        for page_range in self._run(calls, deadline):
+            pages.extend(page_range)
+        self._count(True, len(calls))
+        return cap_chars(join_pages(pages), self.max_chars)
+
+    def extract_docx(self, source):
+        """Extract DOCX text in a worker process"""
+        self._count(False, 1)
+        extract = DOCX_EXTRACTORS[self.docx_extractor]
+        if not self.enabled:
+            return cap_chars(extract(source), self.max_chars)
+        return cap_chars(self._run([(extract, (source,))], self._deadline())[0], self.max_chars)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self):
+        """Report how much extraction work went to the pool"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'files': self.files,
+                'parallel_files': self.parallel_files,
+                'page_tasks': self.page_tasks,
+                'rejected_pages': self.rejected_pages,
+                'timeouts': self.timeouts,
+                'recycled_pools': self.recycled_pools,
+                'pdf_backends': {
+                    backend: {
+                        'files': self.backend_files.get(backend, 0),
+                        'failures': self.backend_failures.get(backend, 0)
+                    }
+                    for backend in self.pdf_backends
+                }
+            }
+
+
+class UploadMemoryBudget:
+    """Cap on upload bytes held in memory across concurrent requests"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak = 0
+        self.rejections = 0
+
+    def acquire(self, size):
+        """Reserve size bytes or raise UploadBusyError if the budget is exhausted"""
+        with self._lock:
+            if self.max_bytes and self.in_use + size > self.max_bytes:
+                self.rejections += 1
+                raise UploadBusyError("Too many uploads in progress, please try again shortly")
+            self.in_use += size
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self, size):
+        with self._lock:
+            self.in_use = max(self.in_use - size, 0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_bytes': self.max_bytes,
+                'in_use_bytes': self.in_use,
+                'peak_bytes': self.peak,
+                'rejections': self.rejections
+            }
+
+
+class UploadSpool:
+    """Upload contents kept in memory up to a threshold, then spilled to a temp file on disk
+
+    Contents are hashed as they are written. Once written, the spool also reads like a file,
+    so Werkzeug can use it as the stream of a multipart file part.
+    """
+
+    def __init__(self, threshold=1024 * 1024, memory_budget=None):
+        self.threshold = threshold
+        self.memory_budget = memory_budget
+        self.size = 0
+        self.path = None
+        self._buffer = io.BytesIO()
+        self._file = None
+        self._reader = None
+        self._reserved = 0
+        self._digest = hashlib.sha256()
+
+    def write(self, chunk):
+        self._digest.update(chunk)
+        if self._file is None and self.size + len(chunk) > self.threshold:
+            self._rollover()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            if self.memory_budget is not None:
+                self.memory_budget.acquire(len(chunk))
+                self._reserved += len(chunk)
+            self._buffer.write(chunk)
+        self.size += len(chunk)
+
+    def _rollover(self):
+        """Move the buffered bytes to a temp file and give back their memory reservation"""
+        fd, self.path = tempfile.mkstemp(prefix='upload-')
+        self._file = os.fdopen(fd, 'wb')
+        self._file.write(self._buffer.getbuffer())
+        self._buffer = io.BytesIO()
+        self._release()
+
+    def _release(self):
+        if self.memory_budget is not None and self._reserved:
+            self.memory_budget.release(self._reserved)
+        self._reserved = 0
+
+    def hexdigest(self):
+        """SHA-256 of everything written so far"""
+        return self._digest.hexdigest()
+
+    def seek(self, offset, whence=0):
+        if self._reader is None:
+            self._reader = self.open()
+        return self._reader.seek(offset, whence)
+
+    def read(self, size=-1):
+        if self._reader is None:
+            self._reader = self.open()
+        return self._reader.read(size)
+
+    def source(self):
+        """The file contents if still in memory, otherwise the temp file path"""
+        if self._file is not None:
+            self._file.flush()
+            return self.path
+        return self._buffer.getvalue()
+
+    def open(self):
+        """A readable binary stream over the contents"""
+        if self._file is not None:
+            self._file.flush()
+            return open(self.path, 'rb')
+        return io.BytesIO(self._buffer.getbuffer())
+
+    def close(self):
+        self._release()
+        self._buffer = io.BytesIO()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_upload(file, threshold=1024 * 1024, memory_budget=None, chunk_size=64 * 1024):
+    """Stream an uploaded file into an UploadSpool, computing its SHA-256 in the same pass"""
+    spool = UploadSpool(threshold=threshold, memory_budget=memory_budget)
+    stream = getattr(file, 'stream', file)
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    return spool, spool.hexdigest()
+
+
+class ExtractionCache:
+    """Extracted text keyed by the SHA-256 of the uploaded file, so re-uploads skip parsing"""
+
+    def __init__(self, max_entries=128, ttl=7 * 24 * 60 * 60, disk_dir=None):
+        self._cache = ResultCache(max_entries=max_entries, ttl=ttl, disk_dir=disk_dir)
+        self._lock = threading.Lock()
+        self.seconds_saved = 0.0
+
+    @staticmethod
+    def _key(digest, file_type):
+        return make_cache_key('extraction', EXTRACTION_VERSION, file_type, digest)
+
+    def get(self, digest, file_type):
+        """Return cached text or None"""
+        record = self._cache.get(self._key(digest, file_type))
+        if record is None:
+            return None
+        with self._lock:
+            self.seconds_saved += record['seconds']
+        return record['text']
+
+    def set(self, digest, file_type, text, seconds):
+        """Cache extracted text along with how long extraction took"""
+        self._cache.set(self._key(digest, file_type), {'text': text, 'seconds': seconds})
+
+    def stats(self):
+        """Report hit ratio and parsing time saved"""
+        stats = self._cache.stats()
+        with self._lock:
+            stats['seconds_saved'] = round(self.seconds_saved, 3)
+        return stats
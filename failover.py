@@ -0,0 +1,159 @@
+# Career Copilot Provider Failover
+# Walk a chain of AI providers, failing over on 429/5xx and hedging slow first bytes
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class ProviderError(Exception):
+    """An AI provider call that failed before returning a usable response"""
+
+    def __init__(self, provider, status_code, message):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+
+    @property
+    def retryable(self):
+        """Rate limits, server errors and network failures are worth sending to the next provider"""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class FailoverCaller:
+    """Call providers in chain order with automatic failover and optional latency hedging"""
+
+    def __init__(self, executor, hedge_after=0):
+        self.executor = executor
+        self.hedge_after = hedge_after
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.wins = {}
+        self.errors = {}
+
+    def _record(self, counter, provider):
+        with self._lock:
+            counter[provider] = counter.get(provider, 0) + 1
+
+    def call(self, providers, attempt, discard=None):
+        """Return the first successful attempt(provider) result
+
+        attempt() should return as soon as the provider has sent its first byte.
+        discard(result) is called on results from losing hedged attempts.
+        """
+        with self._lock:
+            self.calls += 1
+
+        if self.hedge_after and len(providers) > 1:
+            return self._call_hedged(providers, attempt, discard)
+        return self._call_sequential(providers, attempt)
+
+    def _call_sequential(self, providers, attempt):
+        """Try each provider in turn, moving on only for retryable failures"""
+        last_error = None
+        for index, provider in enumerate(providers):
+            try:
+                result = attempt(provider)
+            except ProviderError as e:
+                self._record(self.errors, provider)
+                last_error = e
+                if not e.retryable:
+                    raise
+                if index + 1 < len(providers):
+                    with self._lock:
+                        self.failovers += 1
+                continue
+            self._record(self.wins, provider)
+            return result
+        raise last_error
+
+    async def acall(self, providers, attempt):
+        """Async variant of call(): await attempt(provider) along the chain with failover"""
+        with self._lock:
+            self.calls += 1
+
+        last_error = None
+        for index, provider in enumerate(providers):
+            try:
+                result = await attempt(provider)
+            except ProviderError as e:
+                self._record(self.errors, provider)
+                last_error = e
+                if not e.retryable:
+                    raise
+                if index + 1 < len(providers):
+                    with self._lock:
+                        self.failovers += 1
+                continue
+            self._record(self.wins, provider)
+            return result
+        raise last_error
+
+    def _call_hedged(self, providers, attempt, discard):
+        """Race the next provider against a slow one and keep whichever answers first"""
+        pending = {}
+        next_index = 0
+        last_error = None
+
+        def launch():
+            nonlocal next_index
+            provider = providers[next_index]
+            next_index += 1
+            pending[self.executor.submit(attempt, provider)] = (provider, next_index > 1)
+
+        launch()
+        try:
+            while pending:
+                can_hedge = next_index < len(providers)
+                done, _ = wait(list(pending), timeout=self.hedge_after if can_hedge else None,
+                               return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # Nobody has answered within the threshold: fire the same request at the next provider
+                    with self._lock:
+                        self.hedges += 1
+                    launch()
+                    continue
+
+                for future in done:
+                    provider, is_backup = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except ProviderError as e:
+                        self._record(self.errors, provider)
+                        last_error = e
+                        if e.retryable and next_index < len(providers):
+                            with self._lock:
+                                self.failovers += 1
+                            launch()
+                        continue
+
+                    self._record(self.wins, provider)
+                    if is_backup:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return result
+
+            raise last_error
+        finally:
+            # Cancel the losers, also when an attempt raised something unexpected; anything that
+            # still answers later is discarded so its response and permit are released
+            for loser in pending:
+                if not loser.cancel() and discard is not None:
+                    loser.add_done_callback(
+                        lambda f: discard(f.result()) if not f.exception() else None
+                    )
+
+    def stats(self):
+        """Report failover and hedging counters for the metrics endpoint"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'failovers': self.failovers,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'wins': dict(self.wins),
+                'errors': dict(self.errors)
+            }
@@ -0,0 +1,157 @@
+# Career Copilot Text Normalization
+# Strip extraction debris from resume and job description text before it is sent to the model
+
+import re
+import threading
+from collections import Counter
+
+from extraction import PAGE_BREAK
+from tokens import estimate_tokens
+
+LIGATURES = str.maketrans({
+    'ﬀ': 'ff',
+    'ﬁ': 'fi',
+    'ﬂ': 'fl',
+    'ﬃ': 'ffi',
+    'ﬄ': 'ffl',
+    'ﬅ': 'st',
+    'ﬆ': 'st'
+})
+
+# Bullet glyphs, including the private-use code points Symbol/Wingdings bullets extract as
+BULLET_CHARS = '•●▪■◦‣⁃∙·➢➤✓✔►▸\uf0b7\uf0a7\uf076\uf0d8'
+# ASCII markers only count as bullets when followed by a space, so "-5%" is left alone
+BULLET_LINE = re.compile(rf'^[ \t]*(?:(?:[{BULLET_CHARS}]|[*\-–](?=[ \t]))[ \t]*)+(?=\S)', re.MULTILINE)
+BULLET_ONLY_LINE = re.compile(rf'^[ \t]*[{BULLET_CHARS}][ \t]*\n[ \t]*(?=\S)', re.MULTILINE)
+
+HYPHENATED_BREAK = re.compile(r'([A-Za-z]{2,})-[ \t]*[\n' + PAGE_BREAK + r'][ \t]*([a-z]{2,})')
+SOFT_HYPHEN = '\u00ad'
+
+UNICODE_SPACES = re.compile('[\u00a0\u2000-\u200a\u202f\u205f\u3000\t]')
+ZERO_WIDTH = re.compile('[\u200b-\u200d\u2060\ufeff]')
+SPACE_RUNS = re.compile(r' {2,}')
+TRAILING_SPACES = re.compile(r' +$', re.MULTILINE)
+BLANK_LINE_RUNS = re.compile(r'\n{3,}')
+
+# Lines in this many leading/trailing positions of a page are header/footer candidates
+EDGE_LINES = 3
+DIGITS = re.compile(r'\d+')
+# "3", "Page 3", "3 of 5", "- 3 -": the only edge lines whose digits vary from page to page
+PAGE_NUMBER = re.compile(r'^[-–\s]*(?:page\s*)?\d+(?:\s*(?:of|/)\s*\d+)?[-–\s]*$')
+
+
+def map_ligatures(text):
+    """Replace typographic ligature glyphs with their letters"""
+    return text.translate(LIGATURES)
+
+
+def strip_repeated_lines(text):
+    """Drop header/footer lines that repeat at the top or bottom of most pages"""
+    pages = text.split(PAGE_BREAK)
+    if len(pages) < 2:
+        return text
+
+    def signature(line):
+        # "Page 2 of 3" and "Page 3 of 3" are the same footer; any other line must repeat exactly
+        line = line.strip().lower()
+        return DIGITS.sub('#', line) if PAGE_NUMBER.match(line) else line
+
+    counts = Counter()
+    for page in pages:
+        lines = [line for line in page.split('\n') if line.strip()]
+        edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+        counts.update({signature(line) for line in edges})
+
+    threshold = max(2, (len(pages) + 1) // 2)
+    repeated = {line for line, count in counts.items() if count >= threshold}
+    if not repeated:
+        return text
+
+    cleaned = []
+    for page in pages:
+        lines = page.split('\n')
+        content = [index for index, line in enumerate(lines) if line.strip()]
+        edges = set(content[:EDGE_LINES] + content[-EDGE_LINES:])
+        cleaned.append('\n'.join(
+            line for index, line in enumerate(lines)
+            if index not in edges or signature(line) not in repeated
+        ))
+    return PAGE_BREAK.join(cleaned)
+
+
+def dehyphenate(text):
+    """Rejoin words split across line (or page) breaks and drop soft hyphens"""
+    return HYPHENATED_BREAK.sub(r'\1\2', text.replace(SOFT_HYPHEN, ''))
+
+
+def normalize_bullets(text):
+    """Turn every bullet glyph (and orphaned bullets on their own line) into a single '- '"""
+    text = BULLET_ONLY_LINE.sub('- ', text)
+    return BULLET_LINE.sub('- ', text)
+
+
+def collapse_whitespace(text):
+    """Collapse space runs, trailing spaces, page breaks and extra blank lines"""
+    text = ZERO_WIDTH.sub('', UNICODE_SPACES.sub(' ', text))
+    text = text.replace('\r\n', '\n').replace('\r', '\n').replace(PAGE_BREAK, '\n')
+    text = TRAILING_SPACES.sub('', SPACE_RUNS.sub(' ', text))
+    return BLANK_LINE_RUNS.sub('\n\n', text).strip()
+
+
+# Applied in this order; TEXT_NORMALIZATION_RULES selects a subset
+RULES = {
+    'ligatures': map_ligatures,
+    'repeated_lines': strip_repeated_lines,
+    'dehyphenation': dehyphenate,
+    'bullets': normalize_bullets,
+    'whitespace': collapse_whitespace
+}
+
+
+class TextNormalizer:
+    """Run the normalization rules over prompt inputs and track the tokens each one saves"""
+
+    def __init__(self, rules=None):
+        rules = list(RULES) if rules is None else list(rules)
+        unknown = [name for name in rules if name not in RULES]
+        if unknown:
+            raise ValueError(f"Unknown normalization rules: {', '.join(unknown)}")
+        # Keep the pipeline order regardless of how the rules were listed
+        self.rules = [name for name in RULES if name in rules]
+        self._lock = threading.Lock()
+        self.texts = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.tokens_saved = {name: 0 for name in self.rules}
+
+    def normalize(self, text):
+        """Return the normalized text"""
+        if not text:
+            return text
+
+        tokens_in = estimate_tokens(text)
+        saved = {}
+        for name in self.rules:
+            before = estimate_tokens(text)
+            text = RULES[name](text)
+            saved[name] = before - estimate_tokens(text)
+        text = text.replace(PAGE_BREAK, '\n')
+
+        with self._lock:
+            self.texts += 1
+            self.tokens_in += tokens_in
+            self.tokens_out += estimate_tokens(text)
+            for name, tokens in saved.items():
+                self.tokens_saved[name] += tokens
+        return text
+
+    def stats(self):
+        """Report tokens saved in total and per rule"""
+        with self._lock:
+            return {
+                'texts': self.texts,
+                'tokens_in': self.tokens_in,
+                'tokens_out': self.tokens_out,
+                'saved_ratio': round(1 - self.tokens_out / self.tokens_in, 3) if self.tokens_in else 0.0,
+                'tokens_saved': dict(self.tokens_saved)
+            }
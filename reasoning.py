@@ -0,0 +1,112 @@
+# Career Copilot Reasoning Filter
+# Cut <think>...</think> reasoning blocks out of model output before it is parsed or relayed
+
+import threading
+
+OPEN_TAG = '<think>'
+CLOSE_TAG = '</think>'
+
+
+def _partial_tag_length(text, tag):
+    """Length of the longest start of tag that text ends with, so a tag split across chunks is held back"""
+    for length in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:length]):
+            return length
+    return 0
+
+
+class ReasoningStream:
+    """Separate the answer from reasoning blocks across a stream of deltas, in a single pass
+
+    A block left open at the end (a truncated response) is treated as reasoning.
+    """
+
+    def __init__(self, on_close=None):
+        self._on_close = on_close
+        self._buffer = ''
+        self._inside = False
+        self._block = []
+        self._closed = False
+        self.blocks = []
+        self.tag_bytes = 0
+
+    def feed(self, text):
+        """Consume a delta and return the answer text it contains"""
+        answer = []
+        buffer = self._buffer + text
+        position = 0
+        while True:
+            tag = CLOSE_TAG if self._inside else OPEN_TAG
+            index = buffer.find(tag, position)
+            if index == -1:
+                ready = len(buffer) - _partial_tag_length(buffer, tag)
+                (self._block if self._inside else answer).append(buffer[position:ready])
+                self._buffer = buffer[max(ready, position):]
+                return ''.join(answer)
+            (self._block if self._inside else answer).append(buffer[position:index])
+            position = index + len(tag)
+            self.tag_bytes += len(tag)
+            if self._inside:
+                self._end_block()
+            self._inside = not self._inside
+
+    def _end_block(self):
+        self.blocks.append(''.join(self._block))
+        self._block = []
+
+    def flush(self):
+        """Return whatever answer text is still held back and report the stream as finished"""
+        rest, self._buffer = self._buffer, ''
+        if self._inside:
+            self._block.append(rest)
+            self._end_block()
+            self._inside = False
+            rest = ''
+        if not self._closed:
+            self._closed = True
+            if self._on_close is not None:
+                self._on_close(self)
+        return rest
+
+    def reasoning_text(self):
+        """The reasoning blocks, separated by blank lines"""
+        return '\n\n'.join(block.strip() for block in self.blocks if block.strip())
+
+
+class ReasoningFilter:
+    """Strip reasoning blocks from complete responses and streams, counting what was dropped"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.with_reasoning = 0
+        self.blocks = 0
+        self.bytes_dropped = 0
+
+    def _record(self, stream):
+        dropped = sum(len(block.encode('utf-8')) for block in stream.blocks) + stream.tag_bytes
+        with self._lock:
+            self.responses += 1
+            self.with_reasoning += bool(stream.blocks)
+            self.blocks += len(stream.blocks)
+            self.bytes_dropped += dropped
+
+    def stream(self):
+        """A ReasoningStream whose totals are recorded here when it is flushed"""
+        return ReasoningStream(on_close=self._record)
+
+    def strip(self, text):
+        """Return (answer, reasoning) for a complete response"""
+        stream = self.stream()
+        answer = stream.feed(text or '') + stream.flush()
+        return answer, stream.reasoning_text()
+
+    def stats(self):
+        """Report how many responses carried reasoning and how many bytes it took"""
+        with self._lock:
+            return {
+                'responses': self.responses,
+                'with_reasoning': self.with_reasoning,
+                'blocks': self.blocks,
+                'bytes_dropped': self.bytes_dropped
+            }
@@ -0,0 +1,183 @@
+# Career Copilot Provider Resilience
+# Per provider/model circuit breakers and AIMD concurrency limits that fail fast during brownouts
+
+import threading
+import time
+
+from failover import ProviderError
+
+
+class ProviderUnavailableError(ProviderError):
+    """Raised without calling the provider when its circuit is open or its concurrency limit is reached"""
+
+    def __init__(self, provider, message):
+        super().__init__(provider, None, message)
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures, half-open trial calls after a cool-down"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, half_open_max_calls=1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go through right now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._half_open_calls = 0
+
+            if self.state == self.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    return False
+                self._half_open_calls += 1
+
+            return True
+
+    def record(self, success):
+        """Record a call outcome; None means the outcome says nothing about provider health"""
+        with self._lock:
+            if success is None:
+                if self.state == self.HALF_OPEN:
+                    self._half_open_calls = max(self._half_open_calls - 1, 0)
+                return
+
+            if success:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: grow by ~1 per window of successes, halve on overload"""
+
+    def __init__(self, initial_limit=8, min_limit=1, max_limit=64, backoff=0.5):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Take a slot without waiting; False means the caller should fail fast"""
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, success):
+        """Give the slot back and adjust the limit from the outcome"""
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+            if success is True:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            elif success is False:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+
+
+class Permit:
+    """A slot held on a provider guard until the call finishes"""
+
+    def __init__(self, guard):
+        self._guard = guard
+        self._released = False
+
+    def release(self, success):
+        """Report the outcome once: True, False (provider overloaded/failed) or None (neutral)"""
+        if self._released:
+            return
+        self._released = True
+        self._guard.limiter.release(success)
+        self._guard.breaker.record(success)
+
+
+class ProviderGuard:
+    """Circuit breaker plus concurrency limiter for one provider and model"""
+
+    def __init__(self, provider, model, breaker, limiter):
+        self.provider = provider
+        self.model = model
+        self.breaker = breaker
+        self.limiter = limiter
+
+    def acquire(self):
+        """Return a Permit or raise ProviderUnavailableError without touching the network"""
+        label = f"{self.provider.title()} ({self.model})"
+        if not self.breaker.allow():
+            raise ProviderUnavailableError(
+                self.provider, f"{label} is temporarily unavailable after repeated failures. Please try again shortly."
+            )
+        if not self.limiter.try_acquire():
+            self.breaker.record(None)
+            raise ProviderUnavailableError(
+                self.provider, f"{label} is at capacity right now. Please try again shortly."
+            )
+        return Permit(self)
+
+    def stats(self):
+        return {
+            'state': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'times_opened': self.breaker.times_opened,
+            'limit': int(self.limiter.limit),
+            'in_flight': self.limiter.in_flight,
+            'rejected': self.limiter.rejected
+        }
+
+
+class GuardRegistry:
+    """Lazily created guards keyed on (provider, model)"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, initial_limit=8, min_limit=1, max_limit=64):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._guards = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider, model):
+        key = (provider, model)
+        with self._lock:
+            guard = self._guards.get(key)
+            if guard is None:
+                guard = ProviderGuard(
+                    provider,
+                    model,
+                    CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                    AdaptiveLimiter(self.initial_limit, self.min_limit, self.max_limit)
+                )
+                self._guards[key] = guard
+            return guard
+
+    def stats(self):
+        """Report breaker state and current concurrency limit per provider/model"""
+        with self._lock:
+            guards = list(self._guards.values())
+        return {f"{guard.provider}/{guard.model}": guard.stats() for guard in guards}
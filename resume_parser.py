@@ -0,0 +1,472 @@
+# Career Copilot Resume Parsing
+# Turn extracted resume text into structured sections once, for compact prompts and local match scoring
+
+import re
+import threading
+import time
+
+from cache import ResultCache, make_cache_key
+
+# Bump when the parsed structure changes so cached profiles from older parsers are not reused
+RESUME_PARSER_VERSION = 2
+
+SECTION_ALIASES = {
+    'summary': (
+        'summary', 'professional summary', 'career summary', 'profile', 'professional profile',
+        'objective', 'career objective', 'about me', 'about'
+    ),
+    'experience': (
+        'experience', 'work experience', 'professional experience', 'relevant experience',
+        'employment', 'employment history', 'work history', 'career history'
+    ),
+    'education': (
+        'education', 'education and training', 'academic background', 'qualifications',
+        'academic qualifications'
+    ),
+    'skills': (
+        'skills', 'technical skills', 'core skills', 'key skills', 'core competencies', 'competencies',
+        'technologies', 'tools', 'skills and tools', 'tech stack', 'skills and technologies'
+    )
+}
+HEADING_TO_SECTION = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# Recognized as section boundaries and kept verbatim
+OTHER_HEADINGS = {
+    'projects', 'personal projects', 'certifications', 'certificates', 'licenses and certifications',
+    'awards', 'honors and awards', 'achievements', 'publications', 'languages', 'volunteering',
+    'volunteer experience', 'interests', 'activities', 'courses', 'training', 'references'
+}
+
+EMAIL = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE = re.compile(r'\+?\d[\d\s().-]{7,}\d')
+URL = re.compile(r'(?:https?://|www\.)\S+|\b(?:linkedin\.com|github\.com|gitlab\.com)/\S+', re.IGNORECASE)
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+DATE = r'(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{4}|\d{1,2}/\d{4}|\d{4})'
+DATE_RANGE = re.compile(
+    rf'({DATE})\s*(?:-|–|—|to|until)\s*({DATE}|present|current|now|today)',
+    re.IGNORECASE
+)
+YEAR = re.compile(r'\b(?:19|20)\d{2}\b')
+BULLET = re.compile(r'^\s*[-*•]\s+')
+HEADER_SEPARATOR = re.compile(r'\s+[|•·@–—-]\s+|\s+at\s+|,\s+')
+CONTACT_SEPARATORS = re.compile(r'\s*[|•·]\s*(?:[|•·,]\s*)*')
+
+DEGREE = re.compile(
+    r'\b(?:bachelor|master|doctor|ph\.?\s?d|mba|b\.?\s?sc?|m\.?\s?sc?|b\.?\s?a|m\.?\s?a|b\.?\s?eng|m\.?\s?eng|'
+    r'b\.?\s?tech|m\.?\s?tech|associate|diploma|certificate)\b',
+    re.IGNORECASE
+)
+INSTITUTION = re.compile(r'\b(?:university|college|institute|school|academy|polytechnic)\b', re.IGNORECASE)
+
+# Common skills looked for in job descriptions when pre-scoring a match locally
+SKILL_LEXICON = (
+    'python', 'java', 'javascript', 'typescript', 'golang', 'rust', 'c++', 'c#', 'ruby', 'php', 'kotlin',
+    'swift', 'scala', 'sql', 'nosql', 'html', 'css', 'react', 'angular', 'vue', 'node.js', 'django',
+    'flask', 'fastapi', 'spring', 'rails', '.net', 'graphql', 'rest', 'grpc', 'microservices',
+    'postgresql', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'kafka', 'rabbitmq', 'spark', 'hadoop',
+    'airflow', 'dbt', 'snowflake', 'bigquery', 'aws', 'azure', 'gcp', 'docker', 'kubernetes',
+    'terraform', 'ansible', 'linux', 'git', 'ci/cd', 'jenkins', 'github actions', 'machine learning',
+    'deep learning', 'nlp', 'computer vision', 'pytorch', 'tensorflow', 'scikit-learn', 'pandas',
+    'numpy', 'tableau', 'power bi', 'excel', 'statistics', 'data analysis', 'data modeling', 'etl',
+    'figma', 'ux', 'seo', 'salesforce', 'sap', 'jira', 'agile', 'scrum', 'kanban', 'devops',
+    'security', 'networking', 'project management', 'product management', 'stakeholder management',
+    'budgeting', 'forecasting', 'negotiation', 'leadership', 'mentoring', 'communication',
+    'customer service', 'sales', 'marketing', 'recruiting', 'accounting', 'copywriting'
+)
+REQUIRED_YEARS = re.compile(r'(\d{1,2})\s*\+?\s*(?:years|yrs)', re.IGNORECASE)
+
+
+def _heading_key(line):
+    """Normalized form of a possible section heading"""
+    key = line.strip().strip('#:').strip().lower().replace('&', 'and')
+    return re.sub(r'\s+', ' ', key)
+
+
+def _is_bullet(line):
+    return bool(BULLET.match(line))
+
+
+def _contains_term(text, term):
+    """Whole-term match that treats "c++", ".net" and "node.js" as words"""
+    return re.search(rf'(?<![a-z0-9]){re.escape(term)}(?![a-z0-9+#])', text) is not None
+
+
+def parse_date(text):
+    """Parse a resume date into (year, month); month is None when only a year is given"""
+    text = text.strip().lower()
+    if text in ('present', 'current', 'now', 'today'):
+        return None
+    if '/' in text:
+        month, year = (int(part) for part in text.split('/'))
+        # "13/2021" is not a month; keep the year alone rather than an impossible date
+        return year, month if 1 <= month <= 12 else None
+    parts = text.split()
+    if len(parts) == 2:
+        return int(parts[1]), MONTHS.get(parts[0][:3])
+    return int(text), None
+
+
+def _format_date(date):
+    if date is None:
+        return 'present'
+    year, month = date
+    return f"{year}-{month:02d}" if month else str(year)
+
+
+def _months_between(start, end, today):
+    end = end or today
+    start_month = start[1] or 1
+    end_month = end[1] or 12
+    return max((end[0] - start[0]) * 12 + end_month - start_month + 1, 0)
+
+
+def _split_sections(lines):
+    """Return (header lines, [(section, heading, lines)]) in document order"""
+    header = []
+    sections = []
+    for line in lines:
+        key = _heading_key(line)
+        if len(key) <= 40 and (key in HEADING_TO_SECTION or key in OTHER_HEADINGS):
+            sections.append((HEADING_TO_SECTION.get(key, 'other'), line.strip().strip('#:').strip(), []))
+        elif sections:
+            sections[-1][2].append(line)
+        else:
+            header.append(line)
+    return header, sections
+
+
+def _parse_contact(header):
+    """Pull name, email, phone and links out of the lines above the first section"""
+    text = '\n'.join(header)
+    contact = {
+        'name': None,
+        'email': None,
+        'phone': None,
+        'links': [url.rstrip('.,;|') for url in URL.findall(text)]
+    }
+    email = EMAIL.search(text)
+    if email:
+        contact['email'] = email.group(0)
+    phone = PHONE.search(EMAIL.sub('', URL.sub('', text)))
+    if phone:
+        contact['phone'] = phone.group(0).strip()
+
+    headline = []
+    for line in header:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        # Whatever is left once the contact details are taken out of the line
+        remainder = PHONE.sub('', URL.sub('', EMAIL.sub('', stripped)))
+        remainder = CONTACT_SEPARATORS.sub(' | ', remainder).strip(' |,•·-')
+        if not remainder:
+            continue
+        if contact['name'] is None and len(remainder.split()) <= 5:
+            contact['name'] = remainder
+        else:
+            headline.append(remainder)
+    return contact, headline
+
+
+def _join_details(lines):
+    """Bullet lines, with wrapped continuation lines folded into the bullet they belong to"""
+    details = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if _is_bullet(stripped) or not details:
+            details.append(BULLET.sub('', stripped))
+        else:
+            details[-1] += ' ' + stripped
+    return details
+
+
+def _looks_like_entry_header(line):
+    stripped = line.strip()
+    return bool(stripped) and not _is_bullet(stripped) and len(stripped) <= 80 and not stripped.endswith('.')
+
+
+def _parse_experience(lines, today):
+    """Split an experience section into entries anchored on their date ranges"""
+    date_lines = [index for index, line in enumerate(lines) if DATE_RANGE.search(line)]
+    if not date_lines:
+        return []
+
+    # Each entry's header is its date line plus up to two title/company lines just above it
+    starts = []
+    previous = -1
+    for index in date_lines:
+        start = index
+        while start - 1 > previous and index - (start - 1) <= 2 and _looks_like_entry_header(lines[start - 1]):
+            start -= 1
+        starts.append(start)
+        previous = index
+
+    # Text ahead of the first entry wouldn't fit any entry; leave the section verbatim instead
+    if any(line.strip() for line in lines[:starts[0]]):
+        return []
+
+    entries = []
+    for number, (start, date_index) in enumerate(zip(starts, date_lines)):
+        end = starts[number + 1] if number + 1 < len(starts) else len(lines)
+        ranges = list(DATE_RANGE.finditer(lines[date_index]))
+        start_date = parse_date(ranges[0].group(1))
+        end_date = parse_date(ranges[-1].group(2))
+
+        # A second range or text after the dates ("2019 - 2020 and 2021 - Present") would be
+        # folded into the organization; keep such an entry's lines as written instead
+        if len(ranges) > 1 or lines[date_index][ranges[-1].end():].strip(' |,()–—-.'):
+            entries.append({
+                'title': None,
+                'organization': None,
+                'start': _format_date(start_date),
+                'end': _format_date(end_date),
+                'months': sum(_months_between(parse_date(dates.group(1)), parse_date(dates.group(2)), today)
+                              for dates in ranges),
+                'details': [],
+                'raw': [line.strip() for line in lines[start:end] if line.strip()]
+            })
+            continue
+
+        header = [lines[index] for index in range(start, date_index + 1)]
+        header[-1] = DATE_RANGE.sub('', header[-1])
+        parts = []
+        for line in header:
+            parts.extend(part.strip(' |,()') for part in HEADER_SEPARATOR.split(line.strip()))
+        parts = [part for part in parts if part]
+
+        entries.append({
+            'title': parts[0] if parts else None,
+            'organization': ', '.join(parts[1:]) or None,
+            'start': _format_date(start_date),
+            'end': _format_date(end_date),
+            'months': _months_between(start_date, end_date, today),
+            'details': _join_details(lines[date_index + 1:end]),
+            'raw': None
+        })
+    return entries
+
+
+def _parse_education(lines):
+    """Group education lines into degree / institution / year entries"""
+    entries = []
+    current = None
+    for line in lines:
+        stripped = BULLET.sub('', line.strip())
+        if not stripped:
+            continue
+        degree = DEGREE.search(stripped)
+        institution = INSTITUTION.search(stripped)
+        if current is None or (degree and current['degree']) or (institution and current['institution']):
+            if degree or institution or current is None:
+                current = {'degree': None, 'institution': None, 'years': [], 'details': []}
+                entries.append(current)
+        if degree and not current['degree']:
+            current['degree'] = YEAR.sub('', stripped).strip(' |,()–-')
+        elif institution and not current['institution']:
+            current['institution'] = YEAR.sub('', stripped).strip(' |,()–-')
+        else:
+            current['details'].append(stripped)
+        current['years'].extend(int(year) for year in YEAR.findall(stripped))
+    return entries
+
+
+def _parse_skills(lines):
+    """Split a skills section into individual skills, dropping "Category:" labels"""
+    skills = []
+    seen = set()
+    for line in lines:
+        line = BULLET.sub('', line.strip())
+        if ':' in line:
+            line = line.split(':', 1)[1]
+        for item in re.split(r'[,;|•·]|\s{2,}', line):
+            item = item.strip(' .()')
+            if not item or item.lower() in seen:
+                continue
+            seen.add(item.lower())
+            skills.append(item)
+    return skills
+
+
+def parse_resume(text, today=None):
+    """Parse resume text into contact, summary, experience, education, skills and other sections"""
+    today = today or (time.localtime().tm_year, time.localtime().tm_mon)
+    header, sections = _split_sections(text.split('\n'))
+    contact, headline = _parse_contact(header)
+
+    profile = {
+        'contact': contact,
+        'headline': headline,
+        'summary': None,
+        'experience': [],
+        'education': [],
+        'skills': [],
+        'other': []
+    }
+    for section, heading, lines in sections:
+        body = '\n'.join(lines).strip()
+        parsed = None
+        if section == 'summary':
+            profile['summary'] = ' '.join(line.strip() for line in lines if line.strip())
+            continue
+        elif section == 'experience':
+            parsed = _parse_experience(lines, today)
+        elif section == 'education':
+            parsed = _parse_education(lines)
+        elif section == 'skills':
+            parsed = _parse_skills(lines)
+
+        if parsed:
+            profile[section].extend(parsed)
+        elif body:
+            # Sections that don't parse (or aren't parsed) are kept verbatim
+            profile['other'].append({'heading': heading, 'text': body})
+    return profile
+
+
+def experience_months(profile):
+    """Total months of experience, not double counting overlapping roles"""
+    spans = []
+    for entry in profile['experience']:
+        start = entry['start'].split('-')
+        start_index = int(start[0]) * 12 + (int(start[1]) if len(start) > 1 else 1)
+        spans.append((start_index, start_index + entry['months']))
+
+    total = 0
+    covered_until = None
+    for start, end in sorted(spans):
+        if covered_until is None or start >= covered_until:
+            total += end - start
+            covered_until = end
+        elif end > covered_until:
+            total += end - covered_until
+            covered_until = end
+    return total
+
+
+def render_profile(profile):
+    """Render a parsed resume as compact prompt text"""
+    contact = profile['contact']
+    lines = []
+    if contact['name']:
+        lines.append(contact['name'])
+    details = [value for value in (contact['email'], contact['phone']) if value] + contact['links']
+    if details:
+        lines.append(' | '.join(details))
+    if profile['headline']:
+        lines.append(' | '.join(profile['headline']))
+    if profile['summary']:
+        lines.append(f"Summary: {profile['summary']}")
+
+    if profile['experience']:
+        lines.append("Experience:")
+        for entry in profile['experience']:
+            if entry['raw']:
+                lines.extend(entry['raw'])
+                continue
+            heading = [part for part in (entry['title'], entry['organization']) if part]
+            heading.append(f"{entry['start']}–{entry['end']}")
+            lines.append(' | '.join(heading))
+            lines.extend(f"- {detail}" for detail in entry['details'])
+
+    if profile['education']:
+        lines.append("Education:")
+        for entry in profile['education']:
+            parts = [entry['degree'], entry['institution']]
+            if entry['years']:
+                parts.append('–'.join(str(year) for year in sorted(set(entry['years']))))
+            parts.extend(entry['details'])
+            lines.append(' | '.join(part for part in parts if part))
+
+    if profile['skills']:
+        lines.append(f"Skills: {', '.join(profile['skills'])}")
+
+    for section in profile['other']:
+        lines.append(f"{section['heading']}:\n{section['text']}")
+    return '\n'.join(lines)
+
+
+def compact_resume(profile, text):
+    """The rendered profile when it is shorter than the resume text, otherwise the text itself"""
+    rendered = render_profile(profile)
+    return rendered if len(rendered) < len(text) else text
+
+
+def prescore_match(profile, resume_text, job_description):
+    """Score resume/job fit locally from skill overlap and years of experience
+
+    Returns the same shape as the model's match object (score, strengths, gaps) plus the
+    matched/missing skills, so it can stand in when the model's match block is missing.
+    """
+    job = job_description.lower()
+    resume = resume_text.lower()
+
+    wanted = [term for term in SKILL_LEXICON if _contains_term(job, term)]
+    wanted += [skill.lower() for skill in profile['skills']
+               if skill.lower() not in wanted and _contains_term(job, skill.lower())]
+    matched = [term for term in wanted if _contains_term(resume, term)]
+    missing = [term for term in wanted if term not in matched]
+
+    years = round(experience_months(profile) / 12, 1)
+    required = max((int(value) for value in REQUIRED_YEARS.findall(job_description)), default=0)
+
+    if not wanted:
+        return None
+    coverage = len(matched) / len(wanted)
+    seniority = min(years / required, 1.0) if required else 1.0
+    score = round(100 * (0.8 * coverage + 0.2 * seniority))
+
+    strengths = []
+    if matched:
+        strengths.append(f"Mentions {', '.join(matched[:6])} from the job description")
+    if years and (not required or years >= required):
+        strengths.append(f"{years:g} years of dated experience")
+    gaps = []
+    if missing:
+        gaps.append(f"No mention of {', '.join(missing[:6])}")
+    if required and years < required:
+        gaps.append(f"{years:g} years of dated experience vs. {required}+ requested")
+
+    return {
+        'score': score,
+        'strengths': strengths,
+        'gaps': gaps,
+        'matched_skills': matched,
+        'missing_skills': missing,
+        'years_experience': years,
+        'required_years': required or None
+    }
+
+
+class ResumeParser:
+    """Parse each distinct resume once and reuse the structured profile across requests"""
+
+    def __init__(self, max_entries=128, ttl=7 * 24 * 60 * 60, disk_dir=None):
+        self._cache = ResultCache(max_entries=max_entries, ttl=ttl, disk_dir=disk_dir)
+        self._lock = threading.Lock()
+        self.seconds = 0.0
+
+    def parse(self, text):
+        """Return the structured profile for resume text, parsing it only the first time"""
+        # Keyed on the SHA-256 of the text, which is one key per upload digest for files
+        key = make_cache_key('resume', RESUME_PARSER_VERSION, text)
+        profile = self._cache.get(key)
+        if profile is None:
+            started = time.perf_counter()
+            profile = parse_resume(text)
+            with self._lock:
+                self.seconds += time.perf_counter() - started
+            self._cache.set(key, profile)
+        return profile
+
+    def stats(self):
+        """Report cache hits and time spent parsing"""
+        stats = self._cache.stats()
+        with self._lock:
+            stats['parse_seconds'] = round(self.seconds, 3)
+        return stats
@@ -0,0 +1,160 @@
+# Career Copilot Response Scrubbing
+# Find the model's explanatory phrases ("Here's a cover letter...") in one case-folded copy of each text
+
+import threading
+import time
+
+# Built-in phrase lists; SCRUB_PHRASES in config.py replaces any of them by name
+PHRASE_LISTS = {
+    # Preamble before the letter itself; the text is cut at the first greeting after the last hit
+    'cover_letter_preamble': [
+        "Here's a cover letter",
+        "Here is a cover letter",
+        "The cover letter should",
+        "This cover letter",
+        "I'll write a cover letter",
+        "Let me create a cover letter",
+        "Here's what the cover letter should include",
+        "The cover letter would",
+        "This is a cover letter",
+        "Below is a cover letter",
+        "I'll provide",
+        "I'll write",
+        "Here's what I'll do",
+        "I will provide",
+        "I will write",
+        "The cover letter will",
+        "This will be a cover letter"
+    ],
+    # A letter that mentions any of these is a description of a letter and is dropped
+    'cover_letter_description': [
+        "I'll provide specific, actionable advice",
+        "I'll write a complete, professional cover letter",
+        "addresses the hiring manager directly",
+        "demonstrates understanding of the role",
+        "highlights relevant experience",
+        "shows enthusiasm and cultural fit",
+        "ends with a strong call to action"
+    ],
+    # Preamble before the suggestions; the text is cut at the first line of advice after the last hit
+    'suggestions_preamble': [
+        "I'll provide specific, actionable advice",
+        "I'll write specific, actionable advice",
+        "Here's what I'll do",
+        "I will provide",
+        "I will write",
+        "Here's the advice",
+        "The suggestions are",
+        "I'll give you"
+    ],
+    # Short suggestions that mention any of these only describe the advice
+    'suggestions_description': [
+        "I'll provide specific, actionable advice",
+        "keyword optimization suggestions",
+        "quantifying achievements recommendations",
+        "strategic positioning advice",
+        "format and structure improvements"
+    ],
+    # Sections still containing these after cleaning trigger the retry prompt
+    'retry_trigger': [
+        "I'll provide",
+        "I'll write",
+        "Here's what I'll do",
+        "I will provide"
+    ]
+}
+
+
+def compile_phrases(phrases):
+    """Lowercase and de-duplicate a phrase list once, longest first so it wins at a shared position"""
+    return tuple(sorted({phrase.lower() for phrase in phrases if phrase}, key=len, reverse=True))
+
+
+def fold_case(text):
+    """One lowercased copy of text whose offsets line up with the original"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    # A few characters ("İ") grow when lowercased; leave those as they are
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+class ResponseScrubber:
+    """Match the phrase lists against the cleaned sections and count the hits per list
+
+    Each text is lowercased once and every phrase is found with str.find in that copy.
+    """
+
+    def __init__(self, phrase_lists=None):
+        phrase_lists = dict(phrase_lists or {})
+        unknown = [name for name in phrase_lists if name not in PHRASE_LISTS]
+        if unknown:
+            raise ValueError(f"Unknown phrase lists: {', '.join(unknown)}")
+        self.phrases = {
+            name: compile_phrases(phrase_lists.get(name, default))
+            for name, default in PHRASE_LISTS.items()
+        }
+        self._lock = threading.Lock()
+        self.hits = {name: 0 for name in PHRASE_LISTS}
+        self.seconds = 0.0
+
+    def _record(self, name, hits, started):
+        with self._lock:
+            self.hits[name] += hits
+            self.seconds += time.perf_counter() - started
+
+    def _hit_ends(self, name, text):
+        """End offsets of every phrase occurrence, searched in a single case-folded copy of text"""
+        folded = fold_case(text)
+        ends = {}
+        for phrase in self.phrases[name]:
+            start = folded.find(phrase)
+            while start != -1:
+                # Longer phrases come first, so a shorter one never replaces them at the same start
+                ends.setdefault(start, start + len(phrase))
+                start = folded.find(phrase, start + 1)
+        return sorted(ends.values())
+
+    def mentions(self, name, text):
+        """True if text contains any phrase from the list"""
+        started = time.perf_counter()
+        found = False
+        if text:
+            folded = fold_case(text)
+            found = any(phrase in folded for phrase in self.phrases[name])
+        self._record(name, found, started)
+        return found
+
+    def strip_preamble(self, name, text, is_content_line):
+        """Drop everything before the first content line that follows the last phrase hit
+
+        The rest of the line a phrase ends on counts as a line of its own. Hits without a
+        content line after them are ignored, and the text is returned unchanged if none has one.
+        """
+        started = time.perf_counter()
+        hit_ends = self._hit_ends(name, text) if text else []
+
+        # Scan back from the last hit; each scan stops where the previous one started, so every
+        # line is read at most twice
+        limit = len(text)
+        cut = None
+        for end in reversed(hit_ends):
+            position = end
+            while position < limit and cut is None:
+                line_end = text.find('\n', position)
+                if line_end == -1:
+                    line_end = len(text)
+                if is_content_line(text[position:line_end].strip()):
+                    cut = position
+                position = line_end + 1
+            if cut is not None:
+                break
+            limit = end
+
+        self._record(name, len(hit_ends), started)
+        return text if cut is None else text[cut:]
+
+    def stats(self):
+        """Report phrase hits per list and time spent scrubbing"""
+        with self._lock:
+            return {'hits': dict(self.hits), 'seconds': round(self.seconds, 4)}
@@ -0,0 +1,193 @@
+# Career Copilot Response Sections
+# Split a model response into its match, suggestions and cover letter sections in one pass,
+# and pull the match JSON out of its section
+
+import json
+import math
+import re
+
+# Section headers the model is instructed to emit, mapped to response keys
+SECTION_HEADERS = {
+    'job match analysis': 'match',
+    'resume enhancement suggestions': 'suggestions',
+    'generated cover letter': 'cover_letter'
+}
+
+# Shorter names models use when they paraphrase a header; only trusted on "#" header lines
+SECTION_ALIASES = {
+    'match analysis': 'match',
+    'job match': 'match',
+    'resume suggestions': 'suggestions',
+    'resume enhancements': 'suggestions',
+    'suggestions': 'suggestions',
+    'cover letter': 'cover_letter'
+}
+
+# "### Header", "## 2. Header:", "**Header**", "__Header__" or a bare "Header" line; "#" lines may
+# carry a suffix that starts with a non-letter, as in "### Job Match Analysis (Score: 82/100)"
+HEADER_LINE = re.compile(
+    r'^[ \t]*(?P<hashes>#{1,6})?[ \t]*(?:\d\.[ \t]*)?(?:\*\*|__)?[ \t]*'
+    r'(?P<name>[A-Za-z][A-Za-z ]*?)[ \t]*:?[ \t]*(?:\*\*|__)?[ \t]*:?[ \t]*(?P<suffix>[^A-Za-z \t].*?)?[ \t]*$'
+)
+# The start of a line that could still grow into a header
+PARTIAL_HEADER = re.compile(
+    r'^[ \t]*(?P<hashes>#{1,6})?[ \t]*(?:\d\.?[ \t]*)?(?:\*\*?|__?)?[ \t]*'
+    r'(?P<name>[A-Za-z ]*?)[ \t]*:?[ \t]*(?:\*\*?|__?)?[ \t]*:?(?:[ \t]*(?P<suffix>[^A-Za-z \t].*))?$'
+)
+# Longer lines can't be headers, so most lines are rejected without running the pattern
+MAX_HEADER_LENGTH = 60
+
+
+def match_section_header(line):
+    """Return the section key if the line is one of the known section headers"""
+    if len(line) > MAX_HEADER_LENGTH or not line.strip():
+        return None
+    header = HEADER_LINE.match(line)
+    if not header:
+        return None
+    name = ' '.join(header.group('name').lower().split())
+    if not header.group('hashes'):
+        return None if header.group('suffix') else SECTION_HEADERS.get(name)
+    return SECTION_HEADERS.get(name) or SECTION_ALIASES.get(name)
+
+
+def could_be_section_header(partial_line):
+    """Whether an unfinished line may still turn out to be a section header"""
+    if len(partial_line) > MAX_HEADER_LENGTH:
+        return False
+    header = PARTIAL_HEADER.match(partial_line)
+    if not header:
+        return False
+    prefix = ' '.join(header.group('name').lower().split())
+    names = list(SECTION_HEADERS) + (list(SECTION_ALIASES) if header.group('hashes') else [])
+    if header.group('suffix'):
+        # Past the name, so only a complete name on a "#" line can still be a header
+        return bool(header.group('hashes')) and prefix in names
+    return any(name.startswith(prefix) for name in names)
+
+
+class ResponseSections:
+    """Raw text of each section in a model response; None when its header never appeared"""
+
+    __slots__ = ('preamble', 'match', 'suggestions', 'cover_letter')
+
+    def __init__(self, preamble='', match=None, suggestions=None, cover_letter=None):
+        self.preamble = preamble
+        self.match = match
+        self.suggestions = suggestions
+        self.cover_letter = cover_letter
+
+    @property
+    def found(self):
+        """True if at least one section header was recognized"""
+        return any(value is not None for value in (self.match, self.suggestions, self.cover_letter))
+
+    def __repr__(self):
+        return (f"ResponseSections(match={self.match!r:.40}, suggestions={self.suggestions!r:.40}, "
+                f"cover_letter={self.cover_letter!r:.40})")
+
+
+def split_sections(text):
+    """Scan the response once, line by line, and return its ResponseSections
+
+    Text before the first header is kept as the preamble. A header that repeats continues
+    its section rather than starting it over.
+    """
+    parts = {'preamble': [], 'match': None, 'suggestions': None, 'cover_letter': None}
+    current = parts['preamble']
+    position = 0
+    length = len(text)
+    while position < length:
+        end = text.find('\n', position)
+        if end == -1:
+            end = length
+        line = text[position:end]
+        section = match_section_header(line)
+        if section:
+            if parts[section] is None:
+                parts[section] = []
+            current = parts[section]
+        else:
+            current.append(line)
+        position = end + 1
+
+    return ResponseSections(
+        preamble='\n'.join(parts['preamble']).strip(),
+        **{key: '\n'.join(lines).strip() if lines is not None else None
+           for key, lines in parts.items() if key != 'preamble'}
+    )
+
+
+JSON_TOKENS = re.compile(r'\\.|[{}"]', re.DOTALL)
+# Candidate objects are only parsed when they open like the match block
+MATCH_OPENING = re.compile(r'\{\s*"(?:match|score)"\s*:')
+# Nested candidates are re-parsed one by one, so cap the attempts to keep the work linear
+MAX_JSON_ATTEMPTS = 16
+
+
+def iter_json_objects(text):
+    """Yield (start, end) spans of balanced {...} objects, innermost first, in a single scan
+
+    Braces inside JSON strings (including escaped quotes) are ignored. Quotes only open a
+    string inside an object, so apostrophes and quotes in the surrounding prose don't matter.
+    """
+    opened = []
+    in_string = False
+    # Only braces, quotes and escape pairs matter, so everything else is skipped by the regex engine
+    for token in JSON_TOKENS.finditer(text):
+        char = token.group()
+        if in_string:
+            if char == '"':
+                in_string = False
+        elif char == '{':
+            opened.append(token.start())
+        elif char == '}':
+            if opened:
+                yield opened.pop(), token.end()
+        elif char == '"' and opened:
+            in_string = True
+
+
+def validate_match(value):
+    """Return the match object normalized to {score, strengths, gaps}, or None if it doesn't fit"""
+    if not isinstance(value, dict):
+        return None
+    score = value.get('score')
+    if isinstance(score, str):
+        try:
+            score = float(score.strip().rstrip('%'))
+        except ValueError:
+            return None
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not math.isfinite(score):
+        return None
+
+    if score == int(score):
+        score = int(score)
+    match = {'score': max(0, min(100, score))}
+    for key in ('strengths', 'gaps'):
+        items = value.get(key) or []
+        if isinstance(items, str):
+            items = [items]
+        if not isinstance(items, list):
+            return None
+        match[key] = [str(item).strip() for item in items if str(item).strip()]
+    return match
+
+
+def extract_match(text):
+    """Find the {"match": {...}} object (or a bare {"score": ...} object) in text and validate it"""
+    attempts = 0
+    for start, end in iter_json_objects(text):
+        if not MATCH_OPENING.match(text, start):
+            continue
+        attempts += 1
+        try:
+            value = json.loads(text[start:end])
+        except json.JSONDecodeError:
+            value = None
+        if isinstance(value, dict) and 'match' in value:
+            value = value['match']
+        match = validate_match(value)
+        if match is not None or attempts >= MAX_JSON_ATTEMPTS:
+            return match
+    return None
@@ -0,0 +1,79 @@
+# Career Copilot Request Coalescing
+# Collapse identical in-flight requests onto a single provider call
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers with the same key share its result"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.collapsed = 0
+
+    def join(self, key):
+        """Return (future, leader) for key; the leader must settle() the future when its call ends
+
+        For callers that can't wrap their work in a single function, such as a streaming response.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.collapsed += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def settle(self, key, future, result=None, error=None):
+        """Publish the leader's result (or error) to the waiting callers and free the key"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def do(self, key, fn):
+        """Call fn() for this key, or wait for the identical call already in flight"""
+        future, leader = self.join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.settle(key, future, error=e)
+            raise
+        self.settle(key, future, result)
+        return result
+
+    async def ado(self, key, coro_fn):
+        """Async variant of do(): await coro_fn() or the identical call already in flight"""
+        future, leader = self.join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self.settle(key, future, error=e)
+            raise
+        self.settle(key, future, result)
+        return result
+
+    def stats(self):
+        """Report how many requests were collapsed onto an in-flight call"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'collapsed': self.collapsed
+            }
@@ -0,0 +1,215 @@
+# Career Copilot Upload Sniffing
+# Identify what an upload really is from its bytes, and reject hopeless files before any parsing
+
+import re
+import threading
+import time
+import zipfile
+import zlib
+
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+RTF_MAGIC = b'{\\rtf'
+IMAGE_MAGICS = (
+    b'\x89PNG\r\n\x1a\n',
+    b'\xff\xd8\xff',
+    b'GIF87a',
+    b'GIF89a',
+    b'II*\x00',
+    b'MM\x00*'
+)
+TEXT_BOMS = (b'\xef\xbb\xbf', b'\xff\xfe', b'\xfe\xff')
+
+# PDF tokens, matched on raw and decompressed stream bytes
+PDF_OBJECT = re.compile(rb'\d+\s+\d+\s+obj\b')
+PDF_STREAM = re.compile(rb'>>\s*stream\r?\n')
+# \b keeps an indirect '/Length 12 0 R' from backtracking into a direct length of 1
+PDF_LENGTH = re.compile(rb'/Length\s+(\d+)\b(?!\s+\d+\s+R)')
+PDF_TEXT_EVIDENCE = re.compile(rb'/Font\b|\bT[Jj]\b|\bBT\b')
+PDF_IMAGE = re.compile(rb'/Subtype\s*/Image\b')
+PDF_IMAGE_DRAW = re.compile(rb'\bDo\b')
+
+# Decompress at most this much of each stream when looking for text operators
+MAX_STREAM_BYTES = 256 * 1024
+
+REJECTION_MESSAGES = {
+    'empty': "The uploaded file is empty.",
+    'encrypted': "This PDF is password protected. Please upload an unprotected copy.",
+    'image_only': "This PDF looks like a scanned image with no selectable text. Please upload a text-based PDF, DOCX or TXT file.",
+    'legacy_doc': "Word 97-2003 (.doc) and password-protected Word files can't be read. Please save it as DOCX or PDF.",
+    'not_word': "This archive is not a Word document. Please upload a PDF, DOCX or TXT file.",
+    'rtf': "RTF files aren't supported. Please save it as DOCX, PDF or TXT.",
+    'image': "This is an image, not a document. Please upload a PDF, DOCX or TXT file.",
+    'binary': "This file type isn't recognized. Please upload a PDF, DOCX or TXT file."
+}
+
+
+class UploadRejectedError(Exception):
+    """Raised when sniffing shows an upload can't yield resume text"""
+
+    def __init__(self, reason):
+        self.reason = reason
+        super().__init__(REJECTION_MESSAGES[reason])
+
+
+def _pdf_streams(data):
+    """Yield (dictionary, raw stream bytes) for each complete stream object in data"""
+    position = 0
+    while True:
+        match = PDF_STREAM.search(data, position)
+        if not match:
+            return
+        objects = [obj.end() for obj in PDF_OBJECT.finditer(data, max(position, match.start() - 4096), match.start())]
+        dictionary = data[objects[-1] if objects else match.start():match.end()]
+
+        start = match.end()
+        length = PDF_LENGTH.search(dictionary)
+        end = start + int(length.group(1)) if length else data.find(b'endstream', start)
+        if end < 0 or end > len(data):
+            return
+        yield dictionary, data[start:end]
+        position = end
+
+
+def _decoded_stream(dictionary, raw):
+    """Stream contents for the filters worth looking inside, or None"""
+    if b'/Filter' not in dictionary:
+        return raw
+    if re.search(rb'/Filter\s*\[?\s*/FlateDecode\s*\]?', dictionary):
+        try:
+            return zlib.decompressobj().decompress(raw, MAX_STREAM_BYTES)
+        except zlib.error:
+            return None
+    return None
+
+
+def inspect_pdf(head, tail, whole_file):
+    """Return 'encrypted', 'image_only' or None for a PDF, from its first and last bytes
+
+    A PDF is judged image-only when it draws images and no font or text operator turns up
+    in the scanned bytes, which must be the whole file or at least two page content streams.
+    """
+    if b'/Encrypt' in tail or b'/Encrypt' in head:
+        return 'encrypted'
+
+    images = 0
+    content_streams = 0
+    for dictionary, raw in _pdf_streams(head):
+        if PDF_IMAGE.search(dictionary):
+            images += 1
+            continue
+        if PDF_TEXT_EVIDENCE.search(dictionary):
+            return None
+        decoded = _decoded_stream(dictionary, raw)
+        if decoded is None:
+            continue
+        if PDF_TEXT_EVIDENCE.search(decoded):
+            return None
+        if PDF_IMAGE_DRAW.search(decoded):
+            content_streams += 1
+
+    # Fonts declared outside streams (uncompressed object syntax)
+    if re.search(rb'/Font\b', head):
+        return None
+    if images and (whole_file or content_streams >= 2):
+        return 'image_only'
+    return None
+
+
+def _looks_like_utf16(head):
+    """BOM-less UTF-16 text has its NULs in every other byte, on one side only"""
+    even, odd = head[0::2].count(0), head[1::2].count(0)
+    return min(even, odd) == 0 and max(even, odd) >= len(head) // 4
+
+
+def _looks_like_text(head):
+    """Text has no NUL bytes (UTF-16 aside) and decodes as UTF-8 or a legacy 8-bit encoding"""
+    if head.startswith(TEXT_BOMS):
+        return True
+    if b'\x00' in head:
+        return _looks_like_utf16(head)
+    try:
+        head.decode('utf-8')
+        return True
+    except UnicodeDecodeError as e:
+        # Cut mid-character at the end of the sample, or a legacy 8-bit encoding
+        return e.start >= len(head) - 3 or not re.search(rb'[\x00-\x08\x0e-\x1f]', head)
+
+
+class UploadSniffer:
+    """Identify the real container type of an upload from its header bytes and reject hopeless files"""
+
+    def __init__(self, scan_bytes=2 * 1024 * 1024, tail_bytes=4096):
+        self.scan_bytes = scan_bytes
+        self.tail_bytes = tail_bytes
+        self._lock = threading.Lock()
+        self.sniffed = 0
+        self.rerouted = 0
+        self.rejected = {}
+        self.seconds = 0.0
+
+    def _identify(self, stream, size):
+        head = stream.read(self.scan_bytes)
+        if not head:
+            raise UploadRejectedError('empty')
+
+        # The PDF header may be preceded by junk within the first kilobyte
+        if PDF_MAGIC in head[:1024]:
+            tail = b''
+            if size > len(head):
+                stream.seek(max(size - self.tail_bytes, 0))
+                tail = stream.read(self.tail_bytes)
+            rejection = inspect_pdf(head, tail, whole_file=size <= len(head))
+            if rejection:
+                raise UploadRejectedError(rejection)
+            return 'pdf'
+
+        if head.startswith(ZIP_MAGIC):
+            stream.seek(0)
+            try:
+                with zipfile.ZipFile(stream) as archive:
+                    names = set(archive.namelist())
+            except zipfile.BadZipFile:
+                raise UploadRejectedError('binary') from None
+            if 'word/document.xml' not in names:
+                raise UploadRejectedError('not_word')
+            return 'docx'
+
+        if head.startswith(OLE2_MAGIC):
+            raise UploadRejectedError('legacy_doc')
+        if head.startswith(RTF_MAGIC):
+            raise UploadRejectedError('rtf')
+        if head.startswith(IMAGE_MAGICS):
+            raise UploadRejectedError('image')
+        if _looks_like_text(head[:64 * 1024]):
+            return 'txt'
+        raise UploadRejectedError('binary')
+
+    def sniff(self, stream, size, claimed_type=None):
+        """Return 'pdf', 'docx' or 'txt' for a seekable binary stream, or raise UploadRejectedError"""
+        started = time.perf_counter()
+        try:
+            file_type = self._identify(stream, size)
+        except UploadRejectedError as e:
+            with self._lock:
+                self.sniffed += 1
+                self.rejected[e.reason] = self.rejected.get(e.reason, 0) + 1
+                self.seconds += time.perf_counter() - started
+            raise
+        with self._lock:
+            self.sniffed += 1
+            if claimed_type and claimed_type != file_type:
+                self.rerouted += 1
+            self.seconds += time.perf_counter() - started
+        return file_type
+
+    def stats(self):
+        """Report sniffing volume, rerouted uploads and rejections by reason"""
+        with self._lock:
+            return {
+                'sniffed': self.sniffed,
+                'rerouted': self.rerouted,
+                'rejected': dict(self.rejected),
+                'avg_ms': round(self.seconds / self.sniffed * 1000, 3) if self.sniffed else 0.0
+            }
@@ -17,6 +17,10 @@ document.addEventListener('DOMContentLoaded', function() {
     const matchGapsEl = document.getElementById('match-gaps');
     const errorMessage = document.getElementById('error-message');
     const errorText = document.getElementById('error-text');
+    const submitButton = form.querySelector('button[type="submit"]');
+
+    // True while an analysis request is pending, so double clicks and Ctrl/Cmd+Enter don't resubmit
+    let analysisPending = false;
 
     // Smooth scrolling for navigation links
     function initSmoothScrolling() {
@@ -132,6 +136,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Add submit event listener to the form
     form.addEventListener('submit', async function(event) {
         event.preventDefault(); // Prevent default form submission
+        if (analysisPending) {
+            return;
+        }
         
         // Show loading indicator with animation
         loadingIndicator.classList.remove('hidden');
@@ -163,8 +170,10 @@ document.addEventListener('DOMContentLoaded', function() {
         // Check which resume method is selected
         const selectedMethod = document.querySelector('input[name="resume_method"]:checked').value;
         
+        analysisPending = true;
+        submitButton.disabled = true;
         try {
-            let response;
+            let fetchOptions;
             
             if (selectedMethod === 'file') {
                 // Handle file upload
@@ -192,11 +201,10 @@ document.addEventListener('DOMContentLoaded', function() {
                 formData.append('resume_file', resumeFile);
                 formData.append('ai_model', selectedModel);
                 
-                // Make API request with file upload
-                response = await fetch('/analyze', {
+                fetchOptions = {
                     method: 'POST',
                     body: formData
-                });
+                };
                 
             } else {
                 // Handle text input
@@ -208,8 +216,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     return;
                 }
                 
-                // Make API request with JSON
-                response = await fetch('/analyze', {
+                fetchOptions = {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
@@ -219,67 +226,27 @@ document.addEventListener('DOMContentLoaded', function() {
                         resume_text: resumeText,
                         ai_model: selectedModel
                     })
-                });
-            }
-            
-            // Check if response is ok
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+                };
             }
             
-            // Parse JSON response
-            const data = await response.json();
-            
-            // Populate the result divs with animation
-            if (data.suggestions) {
-                resumeSuggestionsDiv.innerHTML = formatText(data.suggestions);
-                resumeSuggestionsDiv.style.transform = 'translateY(20px)';
-                resumeSuggestionsDiv.style.opacity = '0';
-                setTimeout(() => {
-                    resumeSuggestionsDiv.style.transition = 'all 0.6s ease-out';
-                    resumeSuggestionsDiv.style.transform = 'translateY(0)';
-                    resumeSuggestionsDiv.style.opacity = '1';
-                }, 100);
-            } else {
-                resumeSuggestionsDiv.innerHTML = '<p class="text-gray-500 italic text-lg">No suggestions generated.</p>';
-            }
-            
-            if (data.cover_letter) {
-                coverLetterDiv.innerHTML = formatText(data.cover_letter);
-                coverLetterDiv.style.transform = 'translateY(20px)';
-                coverLetterDiv.style.opacity = '0';
-                setTimeout(() => {
-                    coverLetterDiv.style.transition = 'all 0.6s ease-out';
-                    coverLetterDiv.style.transform = 'translateY(0)';
-                    coverLetterDiv.style.opacity = '1';
-                }, 200);
+            // Stream the analysis when the browser supports it, otherwise wait for the full result
+            let data;
+            if (window.ReadableStream && window.TextDecoder) {
+                data = await streamAnalysis(fetchOptions);
             } else {
-                coverLetterDiv.innerHTML = '<p class="text-gray-500 italic text-lg">No cover letter generated.</p>';
-            }
-            
-            // Render match insights if available
-            if (data.match) {
-                const { score, strengths = [], gaps = [] } = data.match;
-                if (typeof score === 'number' && matchScoreEl && matchBarEl) {
-                    const pct = Math.max(0, Math.min(100, Math.round(score)));
-                    matchScoreEl.textContent = pct + '%';
-                    matchBarEl.style.width = pct + '%';
-                    matchBarEl.classList.toggle('bg-green-500', pct >= 70);
-                    matchBarEl.classList.toggle('bg-yellow-500', pct >= 40 && pct < 70);
-                    matchBarEl.classList.toggle('bg-red-500', pct < 40);
-                }
-                if (matchStrengthsEl) {
-                    matchStrengthsEl.innerHTML = strengths.length
-                        ? strengths.map(s => `<li>${s}</li>`).join('')
-                        : '<li class="italic text-gray-500">No clear strengths identified</li>';
-                }
-                if (matchGapsEl) {
-                    matchGapsEl.innerHTML = gaps.length
-                        ? gaps.map(g => `<li>${g}</li>`).join('')
-                        : '<li class="italic text-gray-500">No major gaps detected</li>';
+                const response = await fetch('/analyze', fetchOptions);
+                
+                // Check if response is ok
+                if (!response.ok) {
+                    const errorData = await response.json();
+                    throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
                 }
+                
+                // Parse JSON response
+                data = await response.json();
             }
+            
+            renderResults(data);
 
             // Scroll to results
             setTimeout(() => {
@@ -292,9 +259,131 @@ document.addEventListener('DOMContentLoaded', function() {
         } finally {
             // Hide loading indicator
             loadingIndicator.classList.add('hidden');
+            analysisPending = false;
+            submitButton.disabled = false;
         }
     });
     
+    // Render the final analysis result
+    function renderResults(data) {
+        // Populate the result divs with animation
+        if (data.suggestions) {
+            resumeSuggestionsDiv.innerHTML = formatText(data.suggestions);
+            resumeSuggestionsDiv.style.transform = 'translateY(20px)';
+            resumeSuggestionsDiv.style.opacity = '0';
+            setTimeout(() => {
+                resumeSuggestionsDiv.style.transition = 'all 0.6s ease-out';
+                resumeSuggestionsDiv.style.transform = 'translateY(0)';
+                resumeSuggestionsDiv.style.opacity = '1';
+            }, 100);
+        } else {
+            resumeSuggestionsDiv.innerHTML = '<p class="text-gray-500 italic text-lg">No suggestions generated.</p>';
+        }
+        
+        if (data.cover_letter) {
+            coverLetterDiv.innerHTML = formatText(data.cover_letter);
+            coverLetterDiv.style.transform = 'translateY(20px)';
+            coverLetterDiv.style.opacity = '0';
+            setTimeout(() => {
+                coverLetterDiv.style.transition = 'all 0.6s ease-out';
+                coverLetterDiv.style.transform = 'translateY(0)';
+                coverLetterDiv.style.opacity = '1';
+            }, 200);
+        } else {
+            coverLetterDiv.innerHTML = '<p class="text-gray-500 italic text-lg">No cover letter generated.</p>';
+        }
+        
+        // Render match insights if available, falling back to the locally computed score
+        const match = data.match || data.local_match;
+        if (match) {
+            const { score, strengths = [], gaps = [] } = match;
+            if (typeof score === 'number' && matchScoreEl && matchBarEl) {
+                const pct = Math.max(0, Math.min(100, Math.round(score)));
+                matchScoreEl.textContent = pct + '%';
+                matchBarEl.style.width = pct + '%';
+                matchBarEl.classList.toggle('bg-green-500', pct >= 70);
+                matchBarEl.classList.toggle('bg-yellow-500', pct >= 40 && pct < 70);
+                matchBarEl.classList.toggle('bg-red-500', pct < 40);
+            }
+            if (matchStrengthsEl) {
+                matchStrengthsEl.innerHTML = strengths.length
+                    ? strengths.map(s => `<li>${s}</li>`).join('')
+                    : '<li class="italic text-gray-500">No clear strengths identified</li>';
+            }
+            if (matchGapsEl) {
+                matchGapsEl.innerHTML = gaps.length
+                    ? gaps.map(g => `<li>${g}</li>`).join('')
+                    : '<li class="italic text-gray-500">No major gaps detected</li>';
+            }
+        }
+    }
+    
+    // Call the streaming endpoint and render each section as the model writes it
+    async function streamAnalysis(fetchOptions) {
+        const response = await fetch('/analyze/stream', fetchOptions);
+        
+        // Check if response is ok
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const sectionText = { suggestions: '', cover_letter: '' };
+        const sectionDivs = { suggestions: resumeSuggestionsDiv, cover_letter: coverLetterDiv };
+        let buffer = '';
+        let result = null;
+        
+        function handleEvent(eventName, payload) {
+            if (eventName === 'section') {
+                // First content is on its way - swap the spinner for live output
+                loadingIndicator.classList.add('hidden');
+                if (sectionDivs[payload.section]) {
+                    sectionDivs[payload.section].innerHTML = '';
+                }
+            } else if (eventName === 'delta') {
+                if (payload.section in sectionText) {
+                    sectionText[payload.section] += payload.text;
+                    sectionDivs[payload.section].innerHTML = formatText(sectionText[payload.section]);
+                }
+            } else if (eventName === 'result') {
+                result = payload;
+            } else if (eventName === 'error') {
+                throw new Error(payload.error);
+            }
+        }
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            // Server-Sent Events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let eventName = 'message';
+                let dataLine = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) {
+                        eventName = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        dataLine += line.slice(5).trim();
+                    }
+                });
+                handleEvent(eventName, dataLine ? JSON.parse(dataLine) : {});
+            }
+        }
+        
+        if (!result) {
+            throw new Error('The analysis stream ended unexpectedly.');
+        }
+        return result;
+    }
+    
     // Function to show error messages
     function showError(message) {
         errorText.textContent = message;
@@ -475,7 +564,7 @@ document.addEventListener('DOMContentLoaded', function() {
     document.addEventListener('keydown', function(e) {
         // Ctrl/Cmd + Enter to submit form
         if ((e.ctrlKey || e.metaKey) && e.key === 'Enter') {
-            if (form.checkValidity()) {
+            if (form.checkValidity() && !analysisPending) {
                 form.dispatchEvent(new Event('submit'));
             }
         }
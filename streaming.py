@@ -0,0 +1,106 @@
+# Career Copilot Streaming Helpers
+# Relay provider token streams to the browser as Server-Sent Events
+
+import json
+
+from sections import could_be_section_header, match_section_header
+
+
+def iter_provider_deltas(response, provider, on_usage=None):
+    """Yield text deltas from a streaming chat completion response
+
+    on_usage(usage) is called once at the end with the usage block, if the provider sent one.
+    """
+    usage = {}
+
+    # SSE is always UTF-8, whatever charset (if any) the provider declares
+    for raw_line in response.iter_lines():
+        raw_line = raw_line.decode('utf-8', errors='replace')
+        if not raw_line.startswith('data:'):
+            continue
+
+        payload = raw_line[len('data:'):].strip()
+        if payload == '[DONE]':
+            break
+
+        try:
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            continue
+
+        if provider == "anthropic":
+            if event.get('type') == 'content_block_delta':
+                text = event.get('delta', {}).get('text')
+                if text:
+                    yield text
+            elif event.get('type') == 'message_start':
+                usage.update(event.get('message', {}).get('usage') or {})
+            elif event.get('type') == 'message_delta':
+                usage.update(event.get('usage') or {})
+            elif event.get('type') == 'message_stop':
+                break
+        else:
+            if event.get('usage'):
+                usage = event['usage']
+            choices = event.get('choices') or []
+            if choices:
+                text = (choices[0].get('delta') or {}).get('content')
+                if text:
+                    yield text
+
+    if usage and on_usage is not None:
+        on_usage(usage)
+
+
+class SectionTracker:
+    """Split a stream of deltas into per-section text, detecting headers across chunk boundaries"""
+
+    def __init__(self):
+        self.section = None
+        self._line = ""
+        self._line_flushed = 0
+
+    def feed(self, text):
+        """Consume a delta and return a list of (event, payload) tuples"""
+        events = []
+        self._line += text
+
+        # Handle every completed line
+        while '\n' in self._line:
+            line, self._line = self._line.split('\n', 1)
+            section = match_section_header(line)
+            if section and self._line_flushed == 0:
+                self.section = section
+                events.append(('section', {'section': section}))
+            else:
+                remainder = line[self._line_flushed:] + '\n'
+                events.append(('delta', {'section': self.section, 'text': remainder}))
+            self._line_flushed = 0
+
+        # Emit the partial line right away unless it may still become a header
+        if self._line.strip() and (self._line_flushed or not could_be_section_header(self._line)):
+            pending = self._line[self._line_flushed:]
+            if pending:
+                events.append(('delta', {'section': self.section, 'text': pending}))
+                self._line_flushed = len(self._line)
+
+        return events
+
+    def flush(self):
+        """Emit whatever is left of the final line"""
+        events = []
+        if self._line:
+            section = match_section_header(self._line)
+            if section and self._line_flushed == 0:
+                self.section = section
+                events.append(('section', {'section': section}))
+            elif self._line[self._line_flushed:]:
+                events.append(('delta', {'section': self.section, 'text': self._line[self._line_flushed:]}))
+        self._line = ""
+        self._line_flushed = 0
+        return events
+
+
+def format_sse(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
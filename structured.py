@@ -0,0 +1,159 @@
+# Career Copilot Structured Output
+# Ask the provider for the analysis as JSON and validate it instead of parsing markdown
+
+import json
+import threading
+
+from sections import validate_match
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "match": {
+            "type": "object",
+            "properties": {
+                "score": {"type": "number"},
+                "strengths": {"type": "array", "items": {"type": "string"}},
+                "gaps": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["score", "strengths", "gaps"],
+            "additionalProperties": False
+        },
+        "suggestions": {"type": "string"},
+        "cover_letter": {"type": "string"}
+    },
+    "required": ["match", "suggestions", "cover_letter"],
+    "additionalProperties": False
+}
+
+TOOL_NAME = "submit_analysis"
+
+# Modes each provider supports, best first; "auto" picks the first and anything else falls back to the envelope
+PROVIDER_MODES = {
+    'openai': ('json_schema', 'envelope'),
+    'perplexity': ('json_schema', 'envelope'),
+    'anthropic': ('tool', 'envelope'),
+    'custom': ('envelope',)
+}
+STRUCTURED_MODES = ('json_schema', 'tool', 'envelope')
+
+
+class StructuredOutputError(Exception):
+    """The response didn't match the analysis schema; text is what came back, for the markdown fallback
+
+    analysis holds the parsed result when the reply was schema-valid but unusable after cleaning.
+    """
+
+    def __init__(self, reason, text='', analysis=None):
+        super().__init__(f"Structured output rejected: {reason}")
+        self.reason = reason
+        self.text = text
+        self.analysis = analysis
+
+
+def structured_output_mode(provider, setting):
+    """The mode to request from provider for a STRUCTURED_OUTPUT setting, or None when it is off"""
+    if setting in (None, 'off'):
+        return None
+    if setting != 'auto' and setting not in STRUCTURED_MODES:
+        raise ValueError(f"Unknown structured output mode: {setting}")
+    supported = PROVIDER_MODES.get(provider, ('envelope',))
+    if setting == 'auto':
+        return supported[0]
+    return setting if setting in supported else 'envelope'
+
+
+def apply_structured_output(data, provider, mode):
+    """Add the provider's schema or tool options to a chat completion payload"""
+    if mode == 'json_schema':
+        json_schema = {"schema": ANALYSIS_SCHEMA}
+        # Perplexity takes the bare schema; OpenAI-compatible APIs want it named and strict
+        if provider != 'perplexity':
+            json_schema.update({"name": "career_analysis", "strict": True})
+        data["response_format"] = {"type": "json_schema", "json_schema": json_schema}
+    elif mode == 'tool':
+        data["tools"] = [{
+            "name": TOOL_NAME,
+            "description": "Submit the job match analysis, resume suggestions and cover letter",
+            "input_schema": ANALYSIS_SCHEMA
+        }]
+        data["tool_choice"] = {"type": "tool", "name": TOOL_NAME}
+    return data
+
+
+def structured_request_overhead(provider, mode):
+    """The schema or tool definition a structured request adds to the payload, as text for the token budget"""
+    options = apply_structured_output({}, provider, mode)
+    return json.dumps(options) if options else ''
+
+
+def tool_input(response):
+    """The arguments of the forced tool call in an Anthropic response, or None"""
+    for block in response.get('content') or []:
+        if block.get('type') == 'tool_use' and block.get('name') == TOOL_NAME:
+            return block.get('input')
+    return None
+
+
+def load_envelope(text):
+    """Deserialize the JSON object in a text response, tolerating code fences or stray text around it"""
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end < start:
+        raise StructuredOutputError('no_json', text)
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        raise StructuredOutputError('invalid_json', text) from None
+
+
+def validate_analysis(payload, text=''):
+    """Return (suggestions, cover_letter, match) from a payload, or raise StructuredOutputError"""
+    if not isinstance(payload, dict):
+        raise StructuredOutputError('not_object', text)
+
+    fields = []
+    for key in ('suggestions', 'cover_letter'):
+        value = payload.get(key)
+        # Some models send the suggestions as a list of bullet strings
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            value = '\n'.join(f"- {item.strip().lstrip('-•* ')}" for item in value)
+        if not isinstance(value, str) or not value.strip():
+            raise StructuredOutputError(f'missing_{key}', text)
+        fields.append(value)
+
+    match = validate_match(payload.get('match'))
+    if match is None:
+        raise StructuredOutputError('invalid_match', text)
+    return fields[0], fields[1], match
+
+
+class OutputModeStats:
+    """Retry rate, schema violations and parse time per output mode"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.modes = {}
+
+    def record(self, mode, parse_seconds, retried=False, violation=None):
+        """Count one analysis parsed in mode"""
+        with self._lock:
+            counts = self.modes.setdefault(mode, {'responses': 0, 'retries': 0, 'violations': {}, 'parse_seconds': 0.0})
+            counts['responses'] += 1
+            counts['retries'] += bool(retried)
+            counts['parse_seconds'] += parse_seconds
+            if violation:
+                counts['violations'][violation] = counts['violations'].get(violation, 0) + 1
+
+    def stats(self):
+        """Report per-mode counters with the retry rate and mean parse time"""
+        with self._lock:
+            return {
+                mode: {
+                    'responses': counts['responses'],
+                    'retries': counts['retries'],
+                    'retry_rate': round(counts['retries'] / counts['responses'], 3),
+                    'violations': dict(counts['violations']),
+                    'parse_ms': round(1000 * counts['parse_seconds'] / counts['responses'], 3)
+                }
+                for mode, counts in self.modes.items()
+            }
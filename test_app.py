@@ -5,7 +5,15 @@ Simple test script to verify Flask app is working correctly
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('PERPLEXITY_API_KEY', 'test')
 
+import io
+import threading
+import time
+
+import requests
+
+import app as career_copilot
 from app import app
 
 def test_app():
@@ -21,5 +29,196 @@ def test_app():
         print(f"Analyze route status: {response.status_code}")
         print(f"Analyze route returns JSON: {response.is_json}")
 
+        # Test the metrics route
+        response = client.get('/metrics')
+        print(f"Metrics route status: {response.status_code}")
+        print(f"Metrics include transport stats: {'transport' in response.get_json()}")
+
+def test_stream_reports_preparation_failures_as_events():
+    """Errors while preparing the prompt arrive as an SSE error event; cached results skip preparation"""
+    def broken(job_description, resume_text, stream=False):
+        raise ValueError("budget")
+
+    original = career_copilot.prepare_prompt_inputs, career_copilot.analysis_cache
+    career_copilot.prepare_prompt_inputs, career_copilot.analysis_cache = broken, None
+    try:
+        with app.test_client() as client:
+            response = client.post('/analyze/stream', json={'job_description': 'Engineer', 'resume_text': 'Jane'})
+            body = response.get_data(as_text=True)
+        assert response.mimetype == 'text/event-stream'
+        assert 'event: error' in body and 'budget' in body and 'event: done' in body
+
+        career_copilot.analysis_cache = career_copilot.ResultCache()
+        key = career_copilot.analysis_cache_key('Engineer', 'Jane', career_copilot.get_api_config()['default_model'],
+                                                stream=True)
+        career_copilot.analysis_cache.set(key, {'cover_letter': 'Dear team', 'match': None})
+        with app.test_client() as client:
+            body = client.post('/analyze/stream', json={'job_description': 'Engineer', 'resume_text': 'Jane'}).get_data(as_text=True)
+        assert 'event: result' in body and 'Dear team' in body and 'event: error' not in body
+    finally:
+        career_copilot.prepare_prompt_inputs, career_copilot.analysis_cache = original
+
+def test_fanout_merges_sections_and_survives_a_failed_call():
+    """Each section call gets its own system prompt; a failed section is left out of the merged text"""
+    replies = {
+        'match': '{"match": {"score": 70, "strengths": ["Python"], "gaps": ["Go"]}}',
+        'suggestions': '### Resume Enhancement Suggestions\n- Quantify the migration',
+        'cover_letter': None
+    }
+    calls = []
+
+    def fake_call(prompt, model=None, system_prompt=None, max_tokens=None, structured=False):
+        section = next(name for name, _, section_prompt in career_copilot.FANOUT_SECTIONS if section_prompt == system_prompt)
+        calls.append((section, max_tokens))
+        if replies[section] is None:
+            raise career_copilot.ProviderError('perplexity', 503, 'unavailable')
+        return {'choices': [{'message': {'content': replies[section]}}]}
+
+    original = career_copilot.call_ai_api
+    career_copilot.call_ai_api = fake_call
+    try:
+        merged, partial = career_copilot.call_ai_api_fanout("prompt", max_tokens=1000)
+        assert partial
+        assert sorted(section for section, _ in calls) == ['cover_letter', 'match', 'suggestions']
+        assert dict(calls)['match'] == min(career_copilot.FANOUT_SECTION_MAX_TOKENS['match'], 1000)
+        assert merged.startswith('### Job Match Analysis\n{"match"')
+        suggestions, cover_letter, match = career_copilot.parse_ai_response(merged)
+        assert match['score'] == 70 and 'Quantify the migration' in suggestions and cover_letter == ''
+
+        # The partial result is returned but never cached
+        original_settings = career_copilot.ANALYSIS_FANOUT, career_copilot.analysis_cache
+        career_copilot.ANALYSIS_FANOUT, career_copilot.analysis_cache = True, career_copilot.ResultCache()
+        try:
+            result = career_copilot.run_analysis("Engineer", "Jane Doe\nPython", None, "fanout-key")
+            assert result['match']['score'] == 70 and result['cover_letter'] == ''
+            assert career_copilot.analysis_cache.get("fanout-key") is None
+        finally:
+            career_copilot.ANALYSIS_FANOUT, career_copilot.analysis_cache = original_settings
+
+        replies.update(match=None, suggestions=None)
+        try:
+            career_copilot.call_ai_api_fanout("prompt")
+        except career_copilot.ProviderError as e:
+            assert e.status_code == 503
+        else:
+            raise AssertionError("expected ProviderError when every section fails")
+    finally:
+        career_copilot.call_ai_api = original
+
+def test_body_read_failures_count_against_the_breaker():
+    """A connection dropped while the body is read opens the circuit like any transport failure"""
+    class DroppedBody:
+        status_code = 200
+
+        def json(self):
+            raise requests.ConnectionError("connection reset by peer")
+
+        def close(self):
+            pass
+
+    guards = career_copilot.GuardRegistry(failure_threshold=1, reset_timeout=60)
+    original = career_copilot.transport.post, career_copilot.provider_guards
+    career_copilot.transport.post = lambda url, **kwargs: DroppedBody()
+    career_copilot.provider_guards = guards
+    try:
+        try:
+            career_copilot.call_ai_api("prompt", "sonar-reasoning")
+        except career_copilot.ProviderError as e:
+            assert "could not be read" in str(e)
+        else:
+            raise AssertionError("expected ProviderError")
+        try:
+            career_copilot.call_ai_api("prompt", "sonar-reasoning")
+        except career_copilot.ProviderUnavailableError:
+            pass
+        else:
+            raise AssertionError("expected the circuit to be open")
+    finally:
+        career_copilot.transport.post, career_copilot.provider_guards = original
+
+def test_cache_control_marks_the_stable_prefix():
+    """Anthropic gets cache_control on the system prompt and resume only; other providers get one prefix"""
+    prompt = career_copilot.build_user_prompt("Job description", "Resume")
+    _, headers, data = career_copilot.build_api_request(prompt, "claude", provider="anthropic")
+    assert data["system"][0]["cache_control"] == {"type": "ephemeral"}
+    blocks = data["messages"][0]["content"]
+    assert [("cache_control" in block) for block in blocks] == [True, False]
+    assert "[MY_RESUME]" in blocks[0]["text"] and "[JOB_DESCRIPTION]" in blocks[1]["text"]
+    assert headers["anthropic-version"]
+
+    _, _, data = career_copilot.build_api_request(prompt, "gpt-4", provider="openai")
+    user = data["messages"][1]["content"]
+    assert user.index("[MY_RESUME]") < user.index("[JOB_DESCRIPTION]")
+    assert "cache_control" not in str(data)
+
+def test_upload_budget_is_charged_while_the_body_is_parsed():
+    """Over-budget uploads get a 429 before the rest of the body is read; normal uploads are spooled once"""
+    def post_upload(size):
+        body = (b'--b\r\nContent-Disposition: form-data; name="job_description"\r\n\r\n\r\n'
+                b'--b\r\nContent-Disposition: form-data; name="resume_file"; filename="resume.txt"\r\n'
+                b'Content-Type: text/plain\r\n\r\n' + b'Jane Doe, Python developer\n' * (size // 27) +
+                b'\r\n--b--\r\n')
+        stream = io.BytesIO(body)
+        with app.test_client() as client:
+            response = client.post('/analyze', input_stream=stream, content_length=len(body),
+                                   content_type='multipart/form-data; boundary=b')
+        return response, stream.tell() / len(body)
+
+    original = career_copilot.upload_budget
+    career_copilot.upload_budget = budget = career_copilot.UploadMemoryBudget(max_bytes=4096)
+    try:
+        response, read_fraction = post_upload(1024 * 1024)
+        assert response.status_code == 429 and response.headers['Retry-After'] == '1'
+        assert read_fraction < 0.25
+        assert budget.stats()['rejections'] == 1 and budget.stats()['in_use_bytes'] == 0
+
+        # The file was extracted; only the empty job description is rejected
+        response, read_fraction = post_upload(2048)
+        assert response.status_code == 400 and 'required' in response.get_json()['error']
+        assert read_fraction == 1 and budget.stats()['in_use_bytes'] == 0
+    finally:
+        career_copilot.upload_budget = original
+
+def test_concurrent_stream_submits_share_one_provider_call():
+    """A double submit to /analyze/stream makes one provider call; the second request gets its result"""
+    calls = []
+
+    def fake_stream(prompt, model=None, max_tokens=None):
+        calls.append(model)
+        time.sleep(0.3)
+        yield "### Job Match Analysis\n"
+        yield '{"match": {"score": 72, "strengths": ["Python"], "gaps": []}}\n'
+
+    bodies = []
+
+    def submit():
+        with app.test_client() as client:
+            bodies.append(client.post('/analyze/stream', json={
+                'job_description': 'Platform engineer', 'resume_text': 'Jane Doe\nPython'
+            }).get_data(as_text=True))
+
+    original = career_copilot.stream_ai_api, career_copilot.analysis_cache
+    career_copilot.stream_ai_api, career_copilot.analysis_cache = fake_stream, None
+    try:
+        threads = [threading.Thread(target=submit) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+    finally:
+        career_copilot.stream_ai_api, career_copilot.analysis_cache = original
+
+    assert len(calls) == 1
+    assert all('event: result' in body and '"score": 72' in body for body in bodies)
+    assert sum('event: section' in body for body in bodies) == 1
+    assert career_copilot.analysis_flight.stats()['in_flight'] == 0
+
 if __name__ == '__main__':
     test_app()
+    test_stream_reports_preparation_failures_as_events()
+    test_fanout_merges_sections_and_survives_a_failed_call()
+    test_body_read_failures_count_against_the_breaker()
+    test_cache_control_marks_the_stable_prefix()
+    test_upload_budget_is_charged_while_the_body_is_parsed()
+    test_concurrent_stream_submits_share_one_provider_call()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the async /analyze path served by the ASGI entry point
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('PERPLEXITY_API_KEY', 'test')
+
+import httpx
+
+import app as career_copilot
+import asgi
+from transport import AsyncProviderTransport
+
+ANALYSIS = {
+    "match": {"score": 64, "strengths": ["Python"], "gaps": ["Kubernetes"]},
+    "suggestions": "- Lead with the payments migration",
+    "cover_letter": "Dear Hiring Manager,\n\n" + "I am excited to bring six years of Python services work to your team. " * 4
+}
+
+MARKDOWN = f"""### Job Match Analysis
+{json.dumps({"match": ANALYSIS["match"]})}
+
+### Resume Enhancement Suggestions
+{ANALYSIS["suggestions"]}
+
+### Generated Cover Letter
+{ANALYSIS["cover_letter"]}
+"""
+
+def post_json(payload):
+    """Drive asgi.app with one JSON POST /analyze and return (status, body)"""
+    body = json.dumps(payload).encode('utf-8')
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': '/analyze',
+             'headers': [(b'content-type', b'application/json')]}
+    asyncio.run(asgi.app(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+def run_with_provider(handler, structured_output):
+    """Serve provider calls from handler through httpx.MockTransport"""
+    original = (career_copilot.async_transport, career_copilot.analysis_cache, career_copilot.output_stats,
+                career_copilot.STRUCTURED_OUTPUT)
+    career_copilot.async_transport = AsyncProviderTransport(http_transport=httpx.MockTransport(handler))
+    career_copilot.analysis_cache = None
+    career_copilot.output_stats = career_copilot.OutputModeStats()
+    career_copilot.STRUCTURED_OUTPUT = structured_output
+    try:
+        return post_json({'job_description': 'Senior Python engineer', 'resume_text': 'Jane Doe\nPython developer'})
+    finally:
+        (career_copilot.async_transport, career_copilot.analysis_cache, career_copilot.output_stats,
+         career_copilot.STRUCTURED_OUTPUT) = original
+
+def test_async_analyze_parses_provider_replies():
+    """Markdown and structured replies both come back parsed; the request carries the right options"""
+    requests_seen = []
+
+    def handler(request):
+        data = json.loads(request.content)
+        requests_seen.append(data)
+        content = json.dumps(ANALYSIS) if 'response_format' in data else MARKDOWN
+        return httpx.Response(200, json={'choices': [{'message': {'content': content}}],
+                                         'usage': {'prompt_tokens': 10, 'completion_tokens': 5}})
+
+    for structured_output in ("off", "auto"):
+        status, result = run_with_provider(handler, structured_output)
+        assert status == 200
+        assert result['match'] == ANALYSIS['match']
+        assert 'payments migration' in result['suggestions']
+        assert result['cover_letter'].startswith("Dear Hiring Manager")
+
+    assert [('response_format' in data) for data in requests_seen] == [False, True]
+    assert requests_seen[0]['messages'][0]['content'] == career_copilot.SYSTEM_PROMPT
+
+def test_async_analyze_reports_provider_errors():
+    """A client error from the provider becomes a JSON 500; a bad body is a 400"""
+    status, result = run_with_provider(lambda request: httpx.Response(400, text="bad request"), "off")
+    assert status == 500 and '400' in result['error']
+
+    status, result = post_json({'job_description': 'Senior Python engineer'})
+    assert status == 400 and 'required' in result['error']
+
+def test_async_analyze_prepares_inputs_off_the_event_loop():
+    """Extraction and budgeting run in a worker thread so they don't stall other requests"""
+    threads = []
+    prepare = career_copilot.prepare_prompt_inputs
+
+    def recording_prepare(job_description, resume_text, stream=False):
+        threads.append(threading.current_thread())
+        return prepare(job_description, resume_text, stream)
+
+    def handler(request):
+        return httpx.Response(200, json={'choices': [{'message': {'content': MARKDOWN}}]})
+
+    career_copilot.prepare_prompt_inputs = recording_prepare
+    try:
+        status, result = run_with_provider(handler, "off")
+    finally:
+        career_copilot.prepare_prompt_inputs = prepare
+
+    assert status == 200 and result['match'] == ANALYSIS['match']
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+
+if __name__ == '__main__':
+    test_async_analyze_parses_provider_replies()
+    test_async_analyze_reports_provider_errors()
+    test_async_analyze_prepares_inputs_off_the_event_loop()
+    print("All ASGI tests passed")
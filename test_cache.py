@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the analysis result cache
+"""
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cache import ResultCache, make_cache_key, normalize_text
+
+def test_cache_key_ignores_whitespace_differences():
+    """Whitespace-only edits to the inputs should map to the same key"""
+    key_a = make_cache_key("perplexity", "sonar-reasoning", normalize_text("Senior  Python\nEngineer "))
+    key_b = make_cache_key("perplexity", "sonar-reasoning", normalize_text("Senior Python Engineer"))
+    key_c = make_cache_key("perplexity", "sonar-reasoning-pro", normalize_text("Senior Python Engineer"))
+    assert key_a == key_b
+    assert key_a != key_c
+
+def test_lru_eviction_and_ttl():
+    """Least recently used entries are evicted and expired entries are misses"""
+    cache = ResultCache(max_entries=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2 and stats["evictions"] == 1
+
+def test_disk_tier_survives_restart():
+    """A new cache instance pointed at the same directory serves earlier results"""
+    with tempfile.TemporaryDirectory() as disk_dir:
+        ResultCache(disk_dir=disk_dir).set("key", {"match": {"score": 80}})
+        restarted = ResultCache(disk_dir=disk_dir)
+        assert restarted.get("key") == {"match": {"score": 80}}
+        assert restarted.stats()["disk_hits"] == 1
+
+def test_disk_tier_pruned_by_age_and_size():
+    """A write-time sweep deletes expired files, then the oldest until the tier fits its size cap"""
+    with tempfile.TemporaryDirectory() as disk_dir:
+        cache = ResultCache(disk_dir=disk_dir, ttl=60, prune_interval=3600)
+        for age, key in [(120, "old"), (30, "a"), (20, "b"), (10, "c")]:
+            cache.set(key, "x" * 50)
+            stored_at = time.time() - age
+            os.utime(os.path.join(disk_dir, f"{key}.json"), (stored_at, stored_at))
+        size = max(os.path.getsize(os.path.join(disk_dir, name)) for name in os.listdir(disk_dir))
+
+        cache.max_disk_bytes, cache.prune_interval = 3 * size + 1, 0
+        cache.set("d", "x" * 50)
+        assert sorted(os.listdir(disk_dir)) == ["b.json", "c.json", "d.json"]
+        assert cache.stats()["disk_pruned"] == 2
+        assert ResultCache(disk_dir=disk_dir).get("old") is None
+
+if __name__ == '__main__':
+    test_cache_key_ignores_whitespace_differences()
+    test_lru_eviction_and_ttl()
+    test_disk_tier_survives_restart()
+    test_disk_tier_pruned_by_age_and_size()
+    print("All cache tests passed")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Tests for resume file extraction
+"""
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import extraction
+from extraction import (ExtractionCache, ExtractionLimitError, ExtractionPool, ExtractionTimeoutError, UploadBusyError,
+                        UploadMemoryBudget, decode_text, detect_encoding, extract_docx_xml, extract_pdf, read_upload)
+
+def make_pdf(pages):
+    """Build a minimal text PDF; pages is a list of lists of lines"""
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    pages_id = 2 + 2 * len(pages)
+    for lines in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+        stream = ("BT /F1 11 Tf 50 750 Td 14 TL " + " ".join(f"({line}) '" for line in escaped) + " ET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 1 0 R >> >> /Contents %d 0 R >>" % (pages_id, len(objects)))
+        page_ids.append(len(objects))
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>"
+                   % (b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    return bytes(out)
+
+def test_parallel_pdf_extraction_keeps_page_order():
+    """Page ranges extracted in different workers are reassembled in order"""
+    pdf = make_pdf([[f"Page {page} experience line {line}" for line in range(5)] for page in range(10)])
+    pool = ExtractionPool(workers=2, pages_per_task=3, parallel_min_pages=4)
+    try:
+        text = pool.extract_pdf(pdf)
+    finally:
+        pool.shutdown()
+
+    assert text == extract_pdf(pdf)
+    assert text.index("Page 0 ") < text.index("Page 5 ") < text.index("Page 9 ")
+    assert pool.stats()["parallel_files"] == 1
+    assert pool.stats()["page_tasks"] == 4
+
+def test_page_and_char_limits():
+    """PDFs over the page limit are rejected and extracted text is capped"""
+    pdf = make_pdf([[f"Page {page} line {line}" for line in range(5)] for page in range(6)])
+
+    pool = ExtractionPool(workers=0, max_pages=5)
+    try:
+        pool.extract_pdf(pdf)
+        assert False, "expected ExtractionLimitError"
+    except ExtractionLimitError as e:
+        assert "6 pages" in str(e)
+    assert pool.stats()["rejected_pages"] == 1
+
+    pool = ExtractionPool(workers=0, max_pages=6, max_chars=50)
+    assert len(pool.extract_pdf(pdf)) == 50
+
+def test_pdf_backend_fallback():
+    """A backend that fails on a file hands it to the next installed backend"""
+    def broken(source):
+        raise ValueError("unsupported xref")
+
+    extraction.PDF_BACKENDS['broken'] = ('json', broken)
+    try:
+        pool = ExtractionPool(workers=0, pdf_backend='broken')
+        assert pool.extract_pdf(make_pdf([["Fallback text"]])) == "Fallback text"
+        stats = pool.stats()['pdf_backends']
+        assert stats['broken'] == {'files': 0, 'failures': 1}
+        assert sum(backend['files'] for backend in stats.values()) == 1
+    finally:
+        del extraction.PDF_BACKENDS['broken']
+
+def spin():
+    """Stand-in for a parser stuck in a pathological PDF"""
+    while True:
+        pass
+
+def test_stuck_worker_is_killed_and_replaced():
+    """A task past the wall-clock deadline gets a timeout error and a fresh pool for the next file"""
+    pdf = make_pdf([["Still works"]])
+    pool = ExtractionPool(workers=1, timeout=0.5)
+    try:
+        started = time.time()
+        try:
+            pool._run([(spin, ())], pool._deadline())
+            assert False, "expected ExtractionTimeoutError"
+        except ExtractionTimeoutError as e:
+            assert "could not be parsed in time" in str(e)
+        assert time.time() - started < 5
+        assert pool.stats()["recycled_pools"] == 1
+
+        assert pool.extract_pdf(pdf) == "Still works"
+    finally:
+        pool.shutdown()
+
+def test_cpu_limit_interrupts_task():
+    """The per-task CPU rlimit stops a spinning parser without killing the worker"""
+    pool = ExtractionPool(workers=1, cpu_limit=1)
+    try:
+        try:
+            pool._run([(spin, ())], None)
+            assert False, "expected ExtractionTimeoutError"
+        except ExtractionTimeoutError:
+            pass
+        assert pool.stats()["recycled_pools"] == 0
+        assert pool.extract_pdf(make_pdf([["Next file"]])) == "Next file"
+    finally:
+        pool.shutdown()
+
+def test_upload_spooling_and_memory_budget():
+    """Large uploads spill to disk and in-memory bytes are capped across uploads"""
+    budget = UploadMemoryBudget(max_bytes=100)
+    data = "résumé ".encode("utf-8") * 40
+
+    spool, _ = read_upload(io.BytesIO(data), threshold=64, memory_budget=budget, chunk_size=16)
+    with spool:
+        assert isinstance(spool.source(), str)
+        assert budget.stats()["in_use_bytes"] == 0
+        with spool.open() as stream:
+            assert decode_text(stream, chunk_size=7) == data.decode("utf-8")
+            stream.seek(0)
+            assert decode_text(stream, max_chars=10, chunk_size=7) == data.decode("utf-8")[:10]
+
+    held, _ = read_upload(io.BytesIO(b"x" * 60), threshold=64, memory_budget=budget)
+    try:
+        read_upload(io.BytesIO(b"y" * 60), threshold=64, memory_budget=budget)
+        assert False, "expected UploadBusyError"
+    except UploadBusyError:
+        pass
+    held.close()
+    assert budget.stats()["in_use_bytes"] == 0
+    assert budget.stats()["rejections"] == 1
+
+def test_text_uploads_detect_their_encoding():
+    """Windows-1252 and UTF-16 text decode from a sniffed prefix; UTF-8 cut mid-character is still UTF-8"""
+    text = "José Pérez – “Senior” Engineer, Zürich\nPython, Go\n" * 20
+
+    for encoding, expected in [("cp1252", "cp1252"), ("utf-16", "utf-16"), ("utf-16-le", "utf_16_le"),
+                               ("utf-8-sig", "utf-8-sig")]:
+        data = text.encode(encoding)
+        assert detect_encoding(data[:256], complete=False) == expected
+        assert decode_text(io.BytesIO(data), sample_bytes=256, chunk_size=100).lstrip("\ufeff") == text
+
+    # The 5-byte sample ends inside "é"
+    data = text.encode("utf-8")
+    assert detect_encoding(data[:5], complete=False) == "utf-8"
+    assert decode_text(io.BytesIO(data), sample_bytes=5, chunk_size=7) == text
+    assert decode_text(io.BytesIO(data), max_chars=10, sample_bytes=5) == text[:10]
+
+def test_docx_xml_extraction_reads_tables_headers_and_text_boxes():
+    """The streaming DOCX extractor keeps the text python-docx paragraphs miss, once each"""
+    from docx import Document
+    from lxml import etree
+
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com"
+    doc.add_paragraph("Summary: backend engineer")
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Acme Corp"
+    table.cell(0, 1).text = "2019 - 2023"
+    box = doc.add_paragraph("Skills ")
+    box._p.append(etree.fromstring(
+        '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">'
+        '<mc:AlternateContent><mc:Choice Requires="wps"><w:drawing><w:txbxContent>'
+        '<w:p><w:r><w:t>Python, Go</w:t></w:r></w:p></w:txbxContent></w:drawing></mc:Choice>'
+        '<mc:Fallback><w:pict><w:txbxContent><w:p><w:r><w:t>Python, Go</w:t></w:r></w:p>'
+        '</w:txbxContent></w:pict></mc:Fallback></mc:AlternateContent></w:r>'
+    ))
+    buffer = io.BytesIO()
+    doc.save(buffer)
+
+    text = extract_docx_xml(buffer.getvalue())
+    assert text.startswith("Jane Doe | jane@example.com")
+    assert "Acme Corp\n2019 - 2023" in text
+    assert text.count("Python, Go") == 1
+
+def test_extraction_cache_keys_on_digest_and_type():
+    """Re-uploads hit by digest and file type, and each hit adds the parse time it skipped"""
+    digest = hashlib.sha256(b"resume bytes").hexdigest()
+    with tempfile.TemporaryDirectory() as disk_dir:
+        cache = ExtractionCache(disk_dir=disk_dir)
+        assert cache.get(digest, "pdf") is None
+        cache.set(digest, "pdf", "Jane Doe\nPython", 0.25)
+
+        assert cache.get(digest, "pdf") == "Jane Doe\nPython"
+        assert cache.get(digest, "docx") is None
+        assert cache.get(hashlib.sha256(b"other bytes").hexdigest(), "pdf") is None
+        assert ExtractionCache(disk_dir=disk_dir).get(digest, "pdf") == "Jane Doe\nPython"
+
+        cache.get(digest, "pdf")
+        stats = cache.stats()
+        assert stats["hits"] == 2 and stats["misses"] == 3
+        assert stats["seconds_saved"] == 0.5
+
+if __name__ == '__main__':
+    test_parallel_pdf_extraction_keeps_page_order()
+    test_page_and_char_limits()
+    test_pdf_backend_fallback()
+    test_stuck_worker_is_killed_and_replaced()
+    test_cpu_limit_interrupts_task()
+    test_upload_spooling_and_memory_budget()
+    test_text_uploads_detect_their_encoding()
+    test_docx_xml_extraction_reads_tables_headers_and_text_boxes()
+    test_extraction_cache_keys_on_digest_and_type()
+    print("All extraction tests passed")
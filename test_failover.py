@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for provider failover and hedging
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from failover import FailoverCaller, ProviderError
+
+def test_fails_over_on_rate_limit():
+    """A 429 from the primary sends the request to the next provider"""
+    def attempt(provider):
+        if provider == "perplexity":
+            raise ProviderError(provider, 429, "rate limited")
+        return provider
+
+    caller = FailoverCaller(executor=None)
+    assert caller.call(["perplexity", "openai"], attempt) == "openai"
+    assert caller.stats()["failovers"] == 1
+
+def test_client_errors_do_not_fail_over():
+    """A 400 means the request itself is bad, so it is raised straight away"""
+    def attempt(provider):
+        raise ProviderError(provider, 400, "bad request")
+
+    caller = FailoverCaller(executor=None)
+    try:
+        caller.call(["perplexity", "openai"], attempt)
+    except ProviderError as e:
+        assert e.provider == "perplexity"
+    else:
+        raise AssertionError("expected ProviderError")
+
+def test_hedges_slow_primary():
+    """A primary slower than the hedge threshold loses to the secondary"""
+    discarded = []
+
+    def attempt(provider):
+        if provider == "perplexity":
+            time.sleep(0.5)
+        return provider
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        caller = FailoverCaller(executor, hedge_after=0.05)
+        start = time.time()
+        assert caller.call(["perplexity", "openai"], attempt, discard=discarded.append) == "openai"
+        assert time.time() - start < 0.4
+    assert discarded == ["perplexity"]
+    assert caller.stats()["hedge_wins"] == 1
+
+def test_unexpected_error_still_discards_hedges():
+    """A hedged attempt that answers after the primary blew up is still discarded"""
+    discarded = []
+
+    def attempt(provider):
+        if provider == "perplexity":
+            time.sleep(0.1)
+            raise RuntimeError("malformed response")
+        time.sleep(0.2)
+        return provider
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        caller = FailoverCaller(executor, hedge_after=0.02)
+        try:
+            caller.call(["perplexity", "openai"], attempt, discard=discarded.append)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("expected RuntimeError")
+    assert discarded == ["openai"]
+
+if __name__ == '__main__':
+    test_fails_over_on_rate_limit()
+    test_client_errors_do_not_fail_over()
+    test_hedges_slow_primary()
+    test_unexpected_error_still_discards_hedges()
+    print("All failover tests passed")
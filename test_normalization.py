@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for prompt input normalization
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extraction import PAGE_BREAK
+from normalization import TextNormalizer, strip_repeated_lines
+
+PAGES = [
+    "Jane Doe  |  Resume\nSummary\nBackend engineer with a ﬁrst-class record in distri-\nbuted systems.\nPage 1 of 2",
+    "Jane Doe  |  Resume\nExperience\n•   Led the plat-\nform team\n●\nCut costs -5% year over year\nPage 2 of 2"
+]
+
+def test_rules_clean_extracted_pdf_text():
+    """Repeated headers/footers, hyphenation, ligatures, bullets and whitespace are normalized"""
+    normalizer = TextNormalizer()
+    text = normalizer.normalize(PAGE_BREAK.join(PAGES))
+
+    assert text == (
+        "Summary\nBackend engineer with a first-class record in distributed systems.\n"
+        "Experience\n- Led the platform team\n- Cut costs -5% year over year"
+    )
+
+    stats = normalizer.stats()
+    assert stats['tokens_saved']['repeated_lines'] > 0
+    assert stats['tokens_out'] < stats['tokens_in']
+
+def test_rules_can_be_selected():
+    """Only the configured rules run; page breaks always become line breaks"""
+    normalizer = TextNormalizer(rules=["ligatures"])
+    text = normalizer.normalize(PAGE_BREAK.join(PAGES))
+
+    assert PAGE_BREAK not in text
+    assert "Page 1 of 2" in text
+    assert "ﬁ" not in text
+    assert list(normalizer.stats()['tokens_saved']) == ["ligatures"]
+
+def test_only_page_numbers_match_across_digits():
+    """Date lines at page edges are content, not footers, even though they differ only in digits"""
+    pages = [
+        "Jane Doe\nAcme Corp\nSenior Engineer\nLed the payments team\n2019 - 2021\n1",
+        "Jane Doe\nGlobex\nEngineer\nBuilt the billing service\n2015 - 2019\n2"
+    ]
+    text = strip_repeated_lines(PAGE_BREAK.join(pages))
+
+    assert text.split(PAGE_BREAK) == [
+        "Acme Corp\nSenior Engineer\nLed the payments team\n2019 - 2021",
+        "Globex\nEngineer\nBuilt the billing service\n2015 - 2019"
+    ]
+
+if __name__ == '__main__':
+    test_rules_clean_extracted_pdf_text()
+    test_rules_can_be_selected()
+    test_only_page_numbers_match_across_digits()
+    print("All normalization tests passed")
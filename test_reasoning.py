@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for cutting reasoning blocks out of model output
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from reasoning import ReasoningFilter
+
+RESPONSE = ("<think>\nThe candidate knows Python.\n</think>\n### Job Match Analysis\n"
+            '{"match": {"score": 80}}\n<think>Now the letter.</think>### Generated Cover Letter\nDear team,')
+
+def test_strips_blocks_and_counts_dropped_bytes():
+    """Every block is removed in one pass; an unclosed block at the end is reasoning too"""
+    reasoning_filter = ReasoningFilter()
+    answer, reasoning = reasoning_filter.strip(RESPONSE)
+
+    assert answer == '\n### Job Match Analysis\n{"match": {"score": 80}}\n### Generated Cover Letter\nDear team,'
+    assert reasoning == "The candidate knows Python.\n\nNow the letter."
+    assert reasoning_filter.strip("Answer<think>cut off") == ("Answer", "cut off")
+    assert reasoning_filter.strip("No reasoning <b>here</b>") == ("No reasoning <b>here</b>", "")
+
+    stats = reasoning_filter.stats()
+    assert stats['responses'] == 3 and stats['with_reasoning'] == 2 and stats['blocks'] == 3
+    assert stats['bytes_dropped'] == len(RESPONSE) - len(answer) + len("<think>cut off")
+
+def test_stream_holds_back_split_tags():
+    """Tags split across deltas are recognized; the answer is relayed as it arrives"""
+    reasoning_filter = ReasoningFilter()
+    stream = reasoning_filter.stream()
+    relayed = [stream.feed(RESPONSE[i:i + 3]) for i in range(0, len(RESPONSE), 3)]
+    relayed.append(stream.flush())
+
+    assert ''.join(relayed) == reasoning_filter.strip(RESPONSE)[0]
+    assert "<" not in ''.join(relayed[:5])
+    assert stream.reasoning_text() == "The candidate knows Python.\n\nNow the letter."
+    assert reasoning_filter.stats()['blocks'] == 4
+
+if __name__ == '__main__':
+    test_strips_blocks_and_counts_dropped_bytes()
+    test_stream_holds_back_split_tags()
+    print("All reasoning tests passed")
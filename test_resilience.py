@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for circuit breakers and adaptive concurrency limits
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from resilience import AdaptiveLimiter, CircuitBreaker, GuardRegistry, ProviderUnavailableError
+
+def test_breaker_opens_and_recovers():
+    """Consecutive failures open the circuit; a successful half-open trial closes it"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.1)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # only one trial call at a time
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_limiter_backs_off_and_grows():
+    """Failures halve the limit, successes grow it back additively"""
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=8)
+    assert limiter.try_acquire()
+    limiter.release(False)
+    assert int(limiter.limit) == 2
+    for _ in range(10):
+        assert limiter.try_acquire()
+        limiter.release(True)
+    assert int(limiter.limit) > 2
+
+def test_guard_fails_fast_at_capacity():
+    """Requests beyond the concurrency limit are rejected without waiting"""
+    guard = GuardRegistry(initial_limit=1).get("perplexity", "sonar-reasoning")
+    permit = guard.acquire()
+    try:
+        guard.acquire()
+    except ProviderUnavailableError as e:
+        assert "at capacity" in str(e)
+    else:
+        raise AssertionError("expected ProviderUnavailableError")
+    permit.release(True)
+    guard.acquire().release(True)
+
+if __name__ == '__main__':
+    test_breaker_opens_and_recovers()
+    test_limiter_backs_off_and_grows()
+    test_guard_fails_fast_at_capacity()
+    print("All resilience tests passed")
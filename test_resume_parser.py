@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for structured resume parsing and local match scoring
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from resume_parser import (ResumeParser, compact_resume, parse_date, parse_resume, prescore_match,
+                           render_profile)
+
+RESUME = """Jane Doe
+Senior Backend Engineer
+jane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/janedoe
+
+Summary
+Backend engineer with 8 years building distributed systems and APIs.
+
+Work Experience
+Senior Software Engineer | Acme Corp
+Jan 2020 - Present
+- Led migration of monolith to Python microservices on AWS, cutting
+  latency by 40%.
+Software Engineer
+Globex, New York
+06/2016 – Dec 2019
+- Built Kafka pipelines processing 2M events/day.
+
+Education
+B.S. Computer Science
+University of California, Berkeley 2012 - 2016
+
+Skills
+Languages: Python, Go, SQL
+Cloud: AWS, Docker, Kubernetes
+
+Projects
+Open-source contributor to Flask."""
+
+def test_parses_sections_into_profile():
+    """Contact details, dated roles, education and skills are pulled out; unknown sections kept verbatim"""
+    profile = parse_resume(RESUME, today=(2024, 6))
+
+    assert profile['contact']['name'] == "Jane Doe"
+    assert profile['contact']['email'] == "jane.doe@example.com"
+    assert profile['contact']['links'] == ["linkedin.com/in/janedoe"]
+
+    first, second = profile['experience']
+    assert (first['title'], first['organization'], first['start'], first['end']) == \
+        ("Senior Software Engineer", "Acme Corp", "2020-01", "present")
+    assert first['details'][0].endswith("cutting latency by 40%.")
+    assert (second['start'], second['end'], second['months']) == ("2016-06", "2019-12", 43)
+
+    assert profile['education'][0]['institution'] == "University of California, Berkeley"
+    assert profile['skills'] == ["Python", "Go", "SQL", "AWS", "Docker", "Kubernetes"]
+    assert profile['other'] == [{'heading': "Projects", 'text': "Open-source contributor to Flask."}]
+
+def test_unparseable_sections_fall_back_to_text():
+    """A section with text before its first dated entry is kept as written"""
+    text = "Jane Doe\n\nExperience\nFreelance work for several clients.\nReferences on request.\nEngineer | Acme\n2020 - 2021"
+    profile = parse_resume(text, today=(2024, 6))
+
+    assert profile['experience'] == []
+    assert profile['other'][0]['text'].startswith("Freelance work")
+    assert "Freelance work" in compact_resume(profile, text)
+
+def test_headers_with_several_ranges_are_kept_as_written():
+    """An entry whose header has a second date range or trailing text keeps its raw lines"""
+    text = ("Jane Doe\n\nExperience\nSenior Engineer, Acme 2019 - 2020 and 2021 - Present\n- Ran the platform team\n"
+            "Engineer | Globex\n2016 - 2018\n- Built billing")
+    profile = parse_resume(text, today=(2024, 6))
+
+    rehired, previous = profile['experience']
+    assert rehired['raw'] == ["Senior Engineer, Acme 2019 - 2020 and 2021 - Present", "- Ran the platform team"]
+    assert (rehired['start'], rehired['end'], rehired['months']) == ("2019", "present", 24 + 42)
+    assert (previous['title'], previous['organization'], previous['raw']) == ("Engineer", "Globex", None)
+
+    rendered = render_profile(profile)
+    assert "Acme 2019 - 2020 and 2021 - Present" in rendered and "Acme  and" not in rendered
+    assert "Engineer | Globex | 2016–2018" in rendered
+
+def test_out_of_range_months_keep_only_the_year():
+    """A numeric month outside 1-12 is dropped, so the date counts as year-only"""
+    assert parse_date("06/2016") == (2016, 6)
+    assert parse_date("13/2021") == (2021, None)
+    assert parse_date("00/2021") == (2021, None)
+
+    profile = parse_resume("Jane Doe\n\nExperience\nEngineer | Acme\n13/2019 - 02/2021", today=(2024, 6))
+    assert (profile['experience'][0]['start'], profile['experience'][0]['months']) == ("2019", 26)
+
+def test_prescore_and_parse_once():
+    """Skill overlap and years feed the local score; the parser caches by resume text"""
+    parser = ResumeParser()
+    profile = parser.parse(RESUME)
+    assert parser.parse(RESUME) == profile
+    assert parser.stats()['hits'] == 1
+
+    match = prescore_match(profile, RESUME, "Need 10+ years of Python, Kubernetes and Terraform")
+    assert match['matched_skills'] == ["python", "kubernetes"]
+    assert match['missing_skills'] == ["terraform"]
+    assert match['required_years'] == 10
+    assert 0 < match['score'] < 100
+    assert prescore_match(profile, RESUME, "Friendly team, great snacks") is None
+
+if __name__ == '__main__':
+    test_parses_sections_into_profile()
+    test_unparseable_sections_fall_back_to_text()
+    test_headers_with_several_ranges_are_kept_as_written()
+    test_out_of_range_months_keep_only_the_year()
+    test_prescore_and_parse_once()
+    print("All resume parser tests passed")
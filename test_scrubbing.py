@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the response phrase scrubber
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scrubbing import ResponseScrubber
+
+def is_greeting(line):
+    return line.startswith(('Dear', 'To Whom It May Concern'))
+
+def test_preamble_is_cut_at_content_after_last_hit():
+    """Every hit is found in one pass; the cut lands on the first greeting after the last hit that has one"""
+    scrubber = ResponseScrubber()
+    text = ("HERE'S A COVER LETTER tailored to the role.\nDear Sir,\nI'll write more below.\n"
+            "Dear Hiring Manager,\nI am excited to apply.\nI will provide references on request.")
+
+    assert scrubber.strip_preamble('cover_letter_preamble', text, is_greeting) == \
+        "Dear Hiring Manager,\nI am excited to apply.\nI will provide references on request."
+    assert scrubber.strip_preamble('cover_letter_preamble', "Dear team,\nThanks", is_greeting) == \
+        "Dear team,\nThanks"
+    # The rest of the line a phrase ends on is a candidate line of its own
+    assert scrubber.strip_preamble('suggestions_preamble', "Here's the advice - Add metrics",
+                                   lambda line: line.startswith('-')) == " - Add metrics"
+    assert scrubber.stats()['hits']['cover_letter_preamble'] == 3
+
+def test_phrase_lists_are_configurable():
+    """Lists can be replaced by name; unknown names are rejected"""
+    scrubber = ResponseScrubber(phrase_lists={'retry_trigger': ["As an assistant"]})
+    assert scrubber.mentions('retry_trigger', "as an ASSISTANT, I think")
+    assert not scrubber.mentions('retry_trigger', "I'll provide the letter")
+    assert scrubber.mentions('cover_letter_description', "It highlights relevant experience")
+    assert not ResponseScrubber(phrase_lists={'retry_trigger': []}).mentions('retry_trigger', "I'll provide")
+
+    try:
+        ResponseScrubber(phrase_lists={'greetings': ["Dear"]})
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+if __name__ == '__main__':
+    test_preamble_is_cut_at_content_after_last_hit()
+    test_phrase_lists_are_configurable()
+    print("All scrubbing tests passed")
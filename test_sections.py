@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for splitting model responses into sections
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sections import extract_match, split_sections
+from streaming import SectionTracker
+
+RESPONSE = """Sure, here is the analysis.
+
+## 1. Job Match Analysis:
+{"match": {"score": 80, "strengths": ["Python"], "gaps": ["Go"]}}
+
+**RESUME ENHANCEMENT SUGGESTIONS**
+- Quantify the migration work
+### Experience
+- Lead with impact
+
+Generated Cover Letter
+Dear Hiring Manager,
+I am applying for the role.
+"""
+
+def test_header_variants_split_in_one_pass():
+    """Markdown, numbered, bold and bare headers in any casing all start their section"""
+    sections = split_sections(RESPONSE)
+
+    assert sections.found
+    assert sections.preamble == "Sure, here is the analysis."
+    assert sections.match.startswith('{"match"')
+    assert sections.suggestions == "- Quantify the migration work\n### Experience\n- Lead with impact"
+    assert sections.cover_letter.startswith("Dear Hiring Manager,")
+
+def test_missing_and_paraphrased_headers():
+    """Missing sections are None; short aliases only count on markdown header lines"""
+    sections = split_sections("### Cover Letter\nDear team,\n**Cover letter**\nThanks")
+    assert sections.match is None and sections.suggestions is None
+    assert sections.cover_letter == "Dear team,\n**Cover letter**\nThanks"
+
+    assert not split_sections("Just some text\nwith no headers").found
+
+    sections = split_sections("### Job Match Analysis (Score: 82/100)\n{}\n**Cover Letter** (draft)\nDear team,")
+    assert sections.match == "{}\n**Cover Letter** (draft)\nDear team,"
+
+def test_stream_tracker_holds_back_partial_headers():
+    """Partial lines are relayed at once unless they could still become a header"""
+    tracker = SectionTracker()
+    events = tracker.feed("**Generated Cov")
+    assert events == []
+    events = tracker.feed("er Letter**\nDear")
+    assert events == [('section', {'section': 'cover_letter'}),
+                      ('delta', {'section': 'cover_letter', 'text': 'Dear'})]
+    assert tracker.feed(" team, 12 ") == [('delta', {'section': 'cover_letter', 'text': ' team, 12 '})]
+
+    tracker = SectionTracker()
+    assert tracker.feed("## Job Match Analysis (Sco") == []
+    assert tracker.feed("re: 82/100)\n") == [('section', {'section': 'match'})]
+    assert tracker.feed("### Experience (2019") == [('delta', {'section': 'match', 'text': '### Experience (2019'})]
+
+def test_match_json_extraction_and_schema():
+    """Balanced objects are found around braces and quotes in strings; the schema is enforced"""
+    text = ('Thinking {about it}... {"match": {"score": "85%", "strengths": ["Ships {fast}", '
+            '"Says \\"hi\\""], "gaps": "Go"}} done')
+    assert extract_match(text) == {'score': 85, 'strengths': ['Ships {fast}', 'Says "hi"'], 'gaps': ['Go']}
+    assert extract_match('{"score": 140, "strengths": []}') == {'score': 100, 'strengths': [], 'gaps': []}
+    assert extract_match('{"match": {"strengths": ["no score"]}}') is None
+    assert extract_match('{"match": {"score": true}}') is None
+    assert extract_match('{"match": {"score": 70, "strengths": ["cut off"') is None
+
+def test_match_extraction_stays_linear_on_adversarial_input():
+    """Parse time grows linearly with input that made the old regexes backtrack"""
+    shapes = [
+        lambda n: '{"match": {' * n,
+        lambda n: '{"match": {"score": 1, "strengths": ["' + '}' * n,
+        lambda n: '{' * n + '}' * n,
+        lambda n: '{"score": ' * n + '50' + '}' * n,
+        lambda n: '"match": {' + '"x" ' * n
+    ]
+
+    def timed(text):
+        started = time.perf_counter()
+        extract_match(text)
+        return time.perf_counter() - started
+
+    for shape in shapes:
+        small = min(timed(shape(2000)) for _ in range(3))
+        large = min(timed(shape(32000)) for _ in range(3))
+        # 16x the input; a quadratic parser would take ~256x as long
+        assert large < max(small, 0.001) * 48, (shape(3), small, large)
+        assert large < 1.0
+
+if __name__ == '__main__':
+    test_header_variants_split_in_one_pass()
+    test_missing_and_paraphrased_headers()
+    test_stream_tracker_holds_back_partial_headers()
+    test_match_json_extraction_and_schema()
+    test_match_extraction_stays_linear_on_adversarial_input()
+    print("All section tests passed")
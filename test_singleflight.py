@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for in-flight request coalescing
+"""
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from singleflight import SingleFlight
+
+def test_identical_calls_share_one_execution():
+    """Concurrent callers with the same key run the function once"""
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"score": 80}
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("same", slow_call))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"score": 80}] * 4
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'collapsed': 3}
+
+if __name__ == '__main__':
+    test_identical_calls_share_one_execution()
+    print("All single-flight tests passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for upload type sniffing
+"""
+import io
+import os
+import sys
+import zlib
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sniffing import UploadRejectedError, UploadSniffer
+from test_extraction import make_pdf
+
+def make_scanned_pdf():
+    """A one-page PDF whose only content is an image"""
+    image = zlib.compress(b'\x80' * 3000)
+    content = zlib.compress(b"q 612 0 0 792 0 0 cm /Im0 Do Q")
+    objects = [
+        b"<< /Type /XObject /Subtype /Image /Width 50 /Height 60 /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream" % (len(image), image),
+        b"<< /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Page /Parent 4 0 R /Resources << /XObject << /Im0 1 0 R >> >> /Contents 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Catalog /Pages 4 0 R >>"
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    for number, body in enumerate(objects, 1):
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    return bytes(out + b"trailer\n<< /Root 5 0 R >>\n%%EOF\n")
+
+def sniff(sniffer, data, claimed_type=None):
+    try:
+        return sniffer.sniff(io.BytesIO(data), len(data), claimed_type)
+    except UploadRejectedError as e:
+        return e.reason
+
+def test_routes_on_real_container_type():
+    """Files are routed by their bytes, not their extension"""
+    from docx import Document
+
+    doc = Document()
+    doc.add_paragraph("Experience")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+
+    sniffer = UploadSniffer()
+    assert sniff(sniffer, make_pdf([["Jane Doe"]]), 'docx') == 'pdf'
+    assert sniff(sniffer, buffer.getvalue(), 'pdf') == 'docx'
+    assert sniff(sniffer, "José Pérez\nEngineer\n".encode('utf-8'), 'txt') == 'txt'
+    assert sniff(sniffer, "José Pérez\nEngineer\n".encode('utf-16-le'), 'txt') == 'txt'
+    assert sniffer.stats()['rerouted'] == 2
+
+def test_rejects_hopeless_files():
+    """Scans, encrypted PDFs, legacy Word files and images are rejected before parsing"""
+    sniffer = UploadSniffer()
+    encrypted = make_pdf([["secret"]]).replace(b"trailer\n<<", b"trailer\n<< /Encrypt 9 0 R")
+
+    assert sniff(sniffer, make_scanned_pdf(), 'pdf') == 'image_only'
+    assert sniff(sniffer, encrypted, 'pdf') == 'encrypted'
+    assert sniff(sniffer, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1' + b'\x00' * 512, 'docx') == 'legacy_doc'
+    assert sniff(sniffer, b'\x89PNG\r\n\x1a\n' + b'\x00' * 64, 'pdf') == 'image'
+    assert sniff(sniffer, bytes(range(256)) * 4, 'txt') == 'binary'
+    assert sniff(sniffer, b'', 'txt') == 'empty'
+    assert sniffer.stats()['rejected']['image_only'] == 1
+
+def test_indirect_stream_lengths_are_not_misread():
+    """An indirect /Length such as '12 0 R' falls back to endstream instead of being read as 1 byte"""
+    text = zlib.compress(b"BT /F1 11 Tf 50 750 Td (Jane Doe) Tj ET")
+    scan_with_text = make_scanned_pdf().replace(b"trailer\n", (
+        b"12 0 obj\n<< /Filter /FlateDecode /Length 13 0 R >>\nstream\n%s\nendstream\nendobj\n"
+        b"13 0 obj\n%d\nendobj\ntrailer\n" % (text, len(text))
+    ))
+
+    sniffer = UploadSniffer()
+    assert sniff(sniffer, scan_with_text, 'pdf') == 'pdf'
+
+if __name__ == '__main__':
+    test_routes_on_real_container_type()
+    test_rejects_hopeless_files()
+    test_indirect_stream_lengths_are_not_misread()
+    print("All sniffing tests passed")
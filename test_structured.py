@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for structured-output analysis
+"""
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('PERPLEXITY_API_KEY', 'test')
+
+from structured import (OutputModeStats, StructuredOutputError, apply_structured_output, load_envelope,
+                        structured_output_mode, tool_input, validate_analysis)
+
+ANALYSIS = {
+    "match": {"score": 78, "strengths": ["Python"], "gaps": ["Go"]},
+    "suggestions": "- Quantify the migration\n- Add Go side projects",
+    "cover_letter": "Dear Hiring Manager,\n\n" + "I would love to bring my backend experience to your team. " * 5
+}
+
+def rejection(fn, *args):
+    try:
+        fn(*args)
+    except StructuredOutputError as e:
+        return e.reason
+    return None
+
+def test_modes_and_payloads_per_provider():
+    """auto picks JSON schema or tool calling where supported and the envelope elsewhere"""
+    assert structured_output_mode('openai', 'auto') == 'json_schema'
+    assert structured_output_mode('anthropic', 'auto') == 'tool'
+    assert structured_output_mode('custom', 'auto') == 'envelope'
+    assert structured_output_mode('perplexity', 'tool') == 'envelope'
+    assert structured_output_mode('openai', 'off') is None
+
+    openai = apply_structured_output({}, 'openai', 'json_schema')
+    assert openai['response_format']['json_schema']['strict'] is True
+    perplexity = apply_structured_output({}, 'perplexity', 'json_schema')
+    assert set(perplexity['response_format']['json_schema']) == {'schema'}
+    anthropic = apply_structured_output({}, 'anthropic', 'tool')
+    assert anthropic['tool_choice'] == {'type': 'tool', 'name': anthropic['tools'][0]['name']}
+    assert apply_structured_output({}, 'custom', 'envelope') == {}
+
+def test_envelope_loading_and_schema_validation():
+    """Fenced JSON deserializes straight into the analysis; violations are reported by reason"""
+    text = "```json\n" + json.dumps(ANALYSIS) + "\n```"
+    suggestions, cover_letter, match = validate_analysis(load_envelope(text))
+    assert suggestions == ANALYSIS['suggestions'] and cover_letter == ANALYSIS['cover_letter']
+    assert match == ANALYSIS['match']
+
+    as_list = dict(ANALYSIS, suggestions=["Quantify the migration", "- Add Go"])
+    assert validate_analysis(as_list)[0] == "- Quantify the migration\n- Add Go"
+
+    assert rejection(load_envelope, "Sorry, I can't help") == 'no_json'
+    assert rejection(load_envelope, '{"match": ') == 'no_json'
+    assert rejection(load_envelope, '{"match": }') == 'invalid_json'
+    assert rejection(validate_analysis, dict(ANALYSIS, cover_letter="")) == 'missing_cover_letter'
+    assert rejection(validate_analysis, dict(ANALYSIS, match={"score": "high"})) == 'invalid_match'
+
+    tool_response = {'content': [{'type': 'text', 'text': 'Submitting.'},
+                                 {'type': 'tool_use', 'name': 'submit_analysis', 'input': ANALYSIS}]}
+    assert tool_input(tool_response) == ANALYSIS
+
+    stats = OutputModeStats()
+    stats.record('tool', 0.002)
+    stats.record('tool', 0.004, retried=True, violation='invalid_match')
+    assert stats.stats()['tool'] == {'responses': 2, 'retries': 1, 'retry_rate': 0.5,
+                                     'violations': {'invalid_match': 1}, 'parse_ms': 3.0}
+
+def test_second_call_only_on_schema_violation():
+    """A valid reply takes one provider call; a violation or an empty letter is re-asked once"""
+    import app
+
+    replies = []
+    calls = []
+
+    def fake_call(prompt, model=None, system_prompt=None, max_tokens=None, structured=False):
+        calls.append(structured)
+        return {'choices': [{'message': {'content': replies.pop(0)}}], 'structured_mode': 'json_schema'}
+
+    original = app.call_ai_api, app.analysis_cache, app.output_stats, app.STRUCTURED_OUTPUT
+    app.call_ai_api, app.analysis_cache, app.output_stats = fake_call, None, OutputModeStats()
+    app.STRUCTURED_OUTPUT = "auto"
+    try:
+        replies.append("<think>plan</think>" + json.dumps(ANALYSIS))
+        result = app.run_analysis("Python engineer", "Jane Doe\nPython", None, "key-1")
+        assert result['match'] == ANALYSIS['match'] and result['cover_letter'].startswith("Dear")
+        assert calls == [True]
+
+        replies.extend(['{"suggestions": "none"}', json.dumps(ANALYSIS)])
+        result = app.run_analysis("Python engineer", "Jane Doe\nPython", None, "key-2")
+        assert result['match'] == ANALYSIS['match']
+        assert calls == [True, True, True]
+
+        # A schema-valid letter that the cleaner drops is re-asked; if it stays empty the reply is kept
+        described = json.dumps(dict(ANALYSIS, cover_letter="This cover letter highlights relevant experience."))
+        replies.extend([described, json.dumps(ANALYSIS)])
+        assert app.run_analysis("Python engineer", "Jane Doe\nPython", None, "key-3")['cover_letter'].startswith("Dear")
+        replies.extend([described, described])
+        result = app.run_analysis("Python engineer", "Jane Doe\nPython", None, "key-4")
+        assert result['cover_letter'] == "" and result['match'] == ANALYSIS['match']
+        assert len(calls) == 7
+
+        stats = app.output_stats.stats()['json_schema']
+        assert stats['responses'] == 4 and stats['retries'] == 3
+        assert stats['violations'] == {'missing_cover_letter': 1, 'empty_cover_letter': 2}
+
+        # Streamed (markdown) results never share cache entries with structured ones
+        assert app.analysis_cache_key("jd", "cv", "m") != app.analysis_cache_key("jd", "cv", "m", stream=True)
+        app.STRUCTURED_OUTPUT = "off"
+        assert app.analysis_cache_key("jd", "cv", "m") == app.analysis_cache_key("jd", "cv", "m", stream=True)
+    finally:
+        app.call_ai_api, app.analysis_cache, app.output_stats, app.STRUCTURED_OUTPUT = original
+
+def test_budget_counts_the_system_prompt_and_schema_sent():
+    """Structured requests budget against their own system prompt plus the schema; streams against markdown"""
+    import app
+
+    seen = []
+
+    class RecordingBudget:
+        def fit(self, system_prompt, inputs):
+            seen.append(system_prompt)
+            return {name: text for name, text, _ in inputs}, 4000
+
+    original = app.token_budget, app.STRUCTURED_OUTPUT, app.API_PROVIDER
+    app.token_budget, app.STRUCTURED_OUTPUT, app.API_PROVIDER = RecordingBudget(), "auto", "openai"
+    try:
+        app.prepare_prompt_inputs("Python engineer", "Jane Doe\nPython")
+        app.prepare_prompt_inputs("Python engineer", "Jane Doe\nPython", stream=True)
+        app.STRUCTURED_OUTPUT = "off"
+        app.prepare_prompt_inputs("Python engineer", "Jane Doe\nPython")
+    finally:
+        app.token_budget, app.STRUCTURED_OUTPUT, app.API_PROVIDER = original
+
+    assert seen[0].startswith(app.STRUCTURED_SYSTEM_PROMPT) and '"json_schema"' in seen[0]
+    assert '"cover_letter"' in seen[0][len(app.STRUCTURED_SYSTEM_PROMPT):]
+    assert seen[1] == seen[2] == app.SYSTEM_PROMPT
+
+if __name__ == '__main__':
+    test_modes_and_payloads_per_provider()
+    test_envelope_loading_and_schema_validation()
+    test_second_call_only_on_schema_violation()
+    test_budget_counts_the_system_prompt_and_schema_sent()
+    print("All structured output tests passed")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for token budgeting
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tokens import TRUNCATION_MARKER, TokenBudget, UsageTracker, estimate_tokens
+
+def test_small_inputs_are_untouched():
+    """Inputs that fit keep their text and get the full response budget"""
+    budget = TokenBudget(context_budget=16000, max_response_tokens=4000)
+    fitted, max_tokens = budget.fit("system", [("resume", "Python developer", None), ("jd", "Hiring", None)])
+    assert fitted == {"resume": "Python developer", "jd": "Hiring"}
+    assert max_tokens == 4000
+
+def test_character_limits_are_enforced():
+    """The server enforces the same limits as the browser counters"""
+    budget = TokenBudget()
+    fitted, _ = budget.fit("system", [("resume", "x" * 20000, 15000)])
+    assert len(fitted["resume"]) <= 15000
+    assert fitted["resume"].endswith(TRUNCATION_MARKER)
+
+def test_lowest_priority_input_is_cut_first():
+    """When over budget the job description is trimmed before the resume"""
+    budget = TokenBudget(context_budget=3000, max_response_tokens=1000, min_response_tokens=500)
+    resume = "experience line\n" * 200
+    job_description = "requirement line\n" * 600
+    fitted, max_tokens = budget.fit("system", [("resume", resume, None), ("jd", job_description, None)])
+    assert fitted["resume"] == resume
+    assert len(fitted["jd"]) < len(job_description)
+    used = estimate_tokens("system") + 50 + estimate_tokens(fitted["resume"]) + estimate_tokens(fitted["jd"])
+    assert used + 500 <= 3000
+    assert 500 <= max_tokens <= 1000
+    assert budget.stats()["truncated_requests"] == 1
+
+def test_usage_counts_cache_reads_and_writes():
+    """Both usage shapes are totalled, with cache reads and writes counted as prompt tokens"""
+    tracker = UsageTracker()
+    tracker.record("anthropic", {"input_tokens": 100, "cache_read_input_tokens": 800,
+                                 "cache_creation_input_tokens": 100, "output_tokens": 50})
+    tracker.record("openai", {"prompt_tokens": 1000, "completion_tokens": 40,
+                              "prompt_tokens_details": {"cached_tokens": 768}})
+    tracker.record("openai", None)
+    stats = tracker.stats()
+    assert stats["anthropic"]["prompt_tokens"] == 1000
+    assert stats["anthropic"]["cached_prompt_tokens"] == 800 and stats["anthropic"]["cache_write_tokens"] == 100
+    assert stats["openai"]["requests"] == 1 and stats["openai"]["cached_prompt_tokens"] == 768
+    assert stats["openai"]["cached_ratio"] == 0.768
+
+if __name__ == '__main__':
+    test_small_inputs_are_untouched()
+    test_character_limits_are_enforced()
+    test_lowest_priority_input_is_cut_first()
+    test_usage_counts_cache_reads_and_writes()
+    print("All token budget tests passed")
@@ -0,0 +1,159 @@
+# Career Copilot Token Budgeting
+# Estimate prompt size and trim inputs so every call fits the context budget
+
+import math
+import threading
+
+# Rough average for English prose with OpenAI/Anthropic style BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = "\n[truncated]"
+
+
+def estimate_tokens(text, chars_per_token=CHARS_PER_TOKEN):
+    """Cheap token estimate for budgeting; errs slightly high for prose"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / chars_per_token)
+
+
+def truncate_text(text, max_chars):
+    """Cut text to at most max_chars, preferring to end on a line break"""
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= len(TRUNCATION_MARKER):
+        return ""
+
+    cut = text[:max_chars - len(TRUNCATION_MARKER)]
+    # Back off to the last line break if it doesn't lose too much
+    newline = cut.rfind('\n')
+    if newline > len(cut) * 0.8:
+        cut = cut[:newline]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+class TokenBudget:
+    """Fit prompt inputs into a context budget and size max_tokens from what remains"""
+
+    def __init__(self, context_budget=16000, max_response_tokens=4000, min_response_tokens=1500,
+                 prompt_overhead_tokens=50, chars_per_token=CHARS_PER_TOKEN):
+        self.context_budget = context_budget
+        self.max_response_tokens = max_response_tokens
+        self.min_response_tokens = min_response_tokens
+        self.prompt_overhead_tokens = prompt_overhead_tokens
+        self.chars_per_token = chars_per_token
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.truncated_requests = 0
+        self.tokens_trimmed = 0
+
+    def estimate(self, text):
+        return estimate_tokens(text, self.chars_per_token)
+
+    def fit(self, system_prompt, inputs):
+        """Trim inputs to the budget and return ({name: text}, max_tokens)
+
+        inputs is a list of (name, text, max_chars) ordered from most to least important;
+        the least important input is cut first when the budget is exceeded.
+        """
+        fitted = {}
+        trimmed = 0
+
+        # Enforce the hard per-input character limits first
+        for name, text, max_chars in inputs:
+            text = text or ""
+            if max_chars and len(text) > max_chars:
+                before = self.estimate(text)
+                text = truncate_text(text, max_chars)
+                trimmed += before - self.estimate(text)
+            fitted[name] = text
+
+        overhead = self.estimate(system_prompt) + self.prompt_overhead_tokens
+        available = self.context_budget - overhead - self.min_response_tokens
+        used = sum(self.estimate(text) for text in fitted.values())
+
+        # Every input keeps at least an even share of the budget
+        floor = max(available, 0) // (2 * max(len(inputs), 1))
+        for name, _, _ in reversed(inputs):
+            if used <= available:
+                break
+            tokens = self.estimate(fitted[name])
+            keep = max(tokens - (used - available), min(tokens, floor))
+            if keep >= tokens:
+                continue
+            text = truncate_text(fitted[name], keep * self.chars_per_token)
+            used -= tokens - self.estimate(text)
+            trimmed += tokens - self.estimate(text)
+            fitted[name] = text
+
+        max_tokens = self.context_budget - overhead - used
+        max_tokens = max(self.min_response_tokens, min(self.max_response_tokens, max_tokens))
+
+        with self._lock:
+            self.requests += 1
+            if trimmed > 0:
+                self.truncated_requests += 1
+                self.tokens_trimmed += trimmed
+
+        return fitted, max_tokens
+
+    def stats(self):
+        """Report how often inputs had to be trimmed"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'truncated_requests': self.truncated_requests,
+                'tokens_trimmed': self.tokens_trimmed
+            }
+
+
+class UsageTracker:
+    """Aggregate prompt and cached-token counts from provider usage blocks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._providers = {}
+
+    def record(self, provider, usage):
+        """Record one usage block (OpenAI/Perplexity or Anthropic shape)"""
+        if not usage:
+            return
+
+        if 'input_tokens' in usage:
+            # Anthropic reports cache reads/writes separately from uncached input
+            cached = usage.get('cache_read_input_tokens') or 0
+            cache_writes = usage.get('cache_creation_input_tokens') or 0
+            prompt_tokens = (usage.get('input_tokens') or 0) + cached + cache_writes
+            completion_tokens = usage.get('output_tokens') or 0
+        else:
+            details = usage.get('prompt_tokens_details') or {}
+            cached = details.get('cached_tokens') or 0
+            cache_writes = 0
+            prompt_tokens = usage.get('prompt_tokens') or 0
+            completion_tokens = usage.get('completion_tokens') or 0
+
+        with self._lock:
+            totals = self._providers.setdefault(provider, {
+                'requests': 0,
+                'prompt_tokens': 0,
+                'cached_prompt_tokens': 0,
+                'cache_write_tokens': 0,
+                'completion_tokens': 0
+            })
+            totals['requests'] += 1
+            totals['prompt_tokens'] += prompt_tokens
+            totals['cached_prompt_tokens'] += cached
+            totals['cache_write_tokens'] += cache_writes
+            totals['completion_tokens'] += completion_tokens
+
+    def stats(self):
+        """Report token usage and prompt cache hit ratio per provider"""
+        with self._lock:
+            result = {}
+            for provider, totals in self._providers.items():
+                result[provider] = dict(totals)
+                result[provider]['cached_ratio'] = (
+                    round(totals['cached_prompt_tokens'] / totals['prompt_tokens'], 3)
+                    if totals['prompt_tokens'] else 0.0
+                )
+            return result
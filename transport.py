@@ -0,0 +1,145 @@
+# Career Copilot HTTP Transport
+# Long-lived, pooled keep-alive sessions shared by every AI provider
+
+import asyncio
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ProviderTransport:
+    """Keep one pooled requests.Session per provider origin so calls reuse TCP/TLS connections"""
+
+    def __init__(self, pool_size=16, connect_timeout=5, read_timeout=120):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _origin(url):
+        """Return scheme://host[:port] for a provider URL"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session_for(self, url):
+        """Get (or lazily create) the pooled session for the origin of this URL"""
+        origin = self._origin(url)
+        session = self._sessions.get(origin)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[origin] = session
+        return session
+
+    def post(self, url, **kwargs):
+        """POST through the pooled session, always with connect/read timeouts"""
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        return self.session_for(url).post(url, **kwargs)
+
+    def warm(self, urls):
+        """Open a keep-alive connection to each provider so the first real call skips the handshake"""
+        for url in urls:
+            if not url:
+                continue
+            try:
+                response = self.session_for(url).head(
+                    self._origin(url), timeout=(self.connect_timeout, self.connect_timeout)
+                )
+                # Reading the (empty) body hands the connection back to the pool
+                response.content
+            except requests.RequestException:
+                # Warming is best effort; the first real request will connect instead
+                pass
+
+    def warm_in_background(self, urls):
+        """Warm connections without blocking application startup"""
+        thread = threading.Thread(target=self.warm, args=(list(urls),), daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        """Report how many requests were served over reused vs. freshly opened connections"""
+        total_requests = 0
+        new_connections = 0
+
+        with self._lock:
+            sessions = list(self._sessions.values())
+
+        for session in sessions:
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    total_requests += pool.num_requests
+                    new_connections += pool.num_connections
+
+        reused = max(total_requests - new_connections, 0)
+        return {
+            'sessions': len(sessions),
+            'requests': total_requests,
+            'new_connections': new_connections,
+            'reused_connections': reused,
+            'reuse_ratio': round(reused / total_requests, 3) if total_requests else 0.0
+        }
+
+
+class AsyncProviderTransport:
+    """Pooled httpx.AsyncClient per provider origin for the async analysis path"""
+
+    def __init__(self, pool_size=100, connect_timeout=5, read_timeout=120, http_transport=None):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # An httpx transport to send requests through instead of the network (e.g. httpx.MockTransport)
+        self.http_transport = http_transport
+        self._clients = {}
+        self.requests = 0
+
+    def client_for(self, url):
+        """Get (or lazily create) the client for the origin of this URL on the running event loop"""
+        # Clients are bound to the event loop that created them
+        key = (id(asyncio.get_running_loop()), ProviderTransport._origin(url))
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                ),
+                transport=self.http_transport
+            )
+            self._clients[key] = client
+        return client
+
+    async def post(self, url, **kwargs):
+        """POST through the pooled async client"""
+        self.requests += 1
+        return await self.client_for(url).post(url, **kwargs)
+
+    async def aclose(self):
+        """Close every client; call on event loop shutdown"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def stats(self):
+        return {
+            'clients': len(self._clients),
+            'requests': self.requests
+        }